@@ -0,0 +1,509 @@
+# -*- coding: utf-8 -*-
+"""
+    AsyncDWX_ZeroMQ_Connector_v2_0_1_RC8.py
+    --
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2017-2019, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+import asyncio
+import zmq
+import zmq.asyncio
+from pandas import Timestamp
+
+try:
+    from api.DWX_ZMQ_Requests import DWX_ZMQ_Request_Tracker
+    from api.DWX_ZMQ_Decoder import _DWX_ZMQ_DECODE_
+    from api.DWX_ZMQ_Tick_Store import DWX_ZMQ_Tick_Store
+    from api.DWX_ZMQ_Bar_Store import DWX_ZMQ_Bar_Store
+    from api.DWX_ZMQ_Topic_Router import DWX_ZMQ_Tick, DWX_ZMQ_Bar, _DWX_ZMQ_PARSE_SUB_
+except ImportError:
+    from DWX_ZMQ_Requests import DWX_ZMQ_Request_Tracker
+    from DWX_ZMQ_Decoder import _DWX_ZMQ_DECODE_
+    from DWX_ZMQ_Tick_Store import DWX_ZMQ_Tick_Store
+    from DWX_ZMQ_Bar_Store import DWX_ZMQ_Bar_Store
+    from DWX_ZMQ_Topic_Router import DWX_ZMQ_Tick, DWX_ZMQ_Bar, _DWX_ZMQ_PARSE_SUB_
+
+class AsyncDWX_ZeroMQ_Connector():
+
+    """
+    asyncio-native ZeroMQ -> MetaTrader Connector.
+
+    Same command surface as DWX_ZeroMQ_Connector, but commands are coroutines
+    returning the matching response, and ticks/rates are async iterators.
+    No threads: PULL and SUB are read by tasks on the running event loop.
+
+    Usage:
+
+        async with AsyncDWX_ZeroMQ_Connector() as _zmq:
+            _zmq._DWX_MTX_SUBSCRIBE_MARKETDATA_('EURUSD')
+            await _zmq._DWX_MTX_SEND_TRACKPRICES_REQUEST_(['EURUSD'])
+            async for _symbol, _timestamp, _bid, _ask in _zmq._DWX_ZMQ_TICKS_():
+                ...
+    """
+    def __init__(self,
+                 _ClientID='dwx-zeromq',    # Unique ID for this client
+                 _host='localhost',         # Host to connect to
+                 _protocol='tcp',           # Connection protocol
+                 _PUSH_PORT=32768,          # Port for Sending commands
+                 _PULL_PORT=32769,          # Port for Receiving responses
+                 _SUB_PORT=32770,           # Port for Subscribing for prices
+                 _delimiter=';',
+                 _pulldata_handlers = [],   # Handlers to process data received through PULL port.
+                 _subdata_handlers = [],    # Handlers to process data received through SUB port.
+                 _verbose=True,
+                 _response_timeout=10.0,    # Seconds a command waits for its response
+                 _queue_size=10000,         # Max undelivered items per tick/rate iterator
+                 _tick_capacity=100000,     # Ticks retained per symbol in _Market_Data_DB
+                 _max_bars=None):           # Bars retained per instrument in _Rates_DB (None = all)
+
+        ######################################################################
+
+        self._ACTIVE = False
+
+        self._ClientID = _ClientID
+        self._host = _host
+        self._protocol = _protocol
+
+        # ZeroMQ asyncio Context
+        self._ZMQ_CONTEXT = zmq.asyncio.Context()
+
+        # TCP Connection URL Template
+        self._URL = self._protocol + "://" + self._host + ":"
+
+        # Handlers for received data (pull and sub ports)
+        self._pulldata_handlers = _pulldata_handlers
+        self._subdata_handlers = _subdata_handlers
+
+        # Ports for PUSH, PULL and SUB sockets respectively
+        self._PUSH_PORT = _PUSH_PORT
+        self._PULL_PORT = _PULL_PORT
+        self._SUB_PORT = _SUB_PORT
+
+        # Create Sockets
+        self._PUSH_SOCKET = self._ZMQ_CONTEXT.socket(zmq.PUSH)
+        self._PUSH_SOCKET.setsockopt(zmq.SNDHWM, 1)
+
+        self._PULL_SOCKET = self._ZMQ_CONTEXT.socket(zmq.PULL)
+        self._PULL_SOCKET.setsockopt(zmq.RCVHWM, 1)
+
+        self._SUB_SOCKET = self._ZMQ_CONTEXT.socket(zmq.SUB)
+
+        self._PUSH_SOCKET.connect(self._URL + str(self._PUSH_PORT))
+        print("[INIT] Ready to send commands to METATRADER (PUSH): " + str(self._PUSH_PORT))
+
+        self._PULL_SOCKET.connect(self._URL + str(self._PULL_PORT))
+        print("[INIT] Listening for responses from METATRADER (PULL): " + str(self._PULL_PORT))
+
+        print("[INIT] Listening for market data from METATRADER (SUB): " + str(self._SUB_PORT))
+        self._SUB_SOCKET.connect(self._URL + str(self._SUB_PORT))
+
+        self._string_delimiter = _delimiter
+        self._main_string_delimiter = ':|:'
+
+        # Same stores as DWX_ZeroMQ_Connector
+        self._Market_Data_DB = DWX_ZMQ_Tick_Store(_tick_capacity)   # {SYMBOL: DWX_ZMQ_Tick_Buffer}
+        self._Rates_DB = DWX_ZMQ_Bar_Store(_max_bars)   # {(SYMBOL, TIMEFRAME): DWX_ZMQ_Bar_Buffer}
+        self._History_DB = {}       # {SYMBOL_TF: [{'time': TIME, 'open': OPEN_PRICE, ...}, ...]}
+        self.account_info_DB = {}   # {ACCOUNT_NUMBER: [{'currenttime': 'CURRENT_TIME', ...}]}
+
+        self.temp_order_dict = self._generate_default_order_dict()
+
+        self._verbose = _verbose
+        self._response_timeout = _response_timeout
+
+        # Commands in flight, resolved from the PULL task
+        self._requests = DWX_ZMQ_Request_Tracker(_prefix=self._ClientID,
+                                                 _timeout=None)
+
+        # Consumers of _DWX_ZMQ_TICKS_() / _DWX_ZMQ_RATES_(): [(TOPICS, QUEUE)]
+        self._queue_size = _queue_size
+        self._tick_queues = []
+        self._rate_queues = []
+        self._dropped = 0
+
+        # PULL / SUB reader tasks
+        self._tasks = []
+
+    ##########################################################################
+
+    async def __aenter__(self):
+        await self._DWX_ZMQ_START_()
+        return self
+
+    async def __aexit__(self, *_exc_info):
+        await self._DWX_ZMQ_SHUTDOWN_()
+
+    ##########################################################################
+
+    """
+    Start reading PULL / SUB on the running event loop
+    """
+    async def _DWX_ZMQ_START_(self):
+
+        self._ACTIVE = True
+
+        self._tasks = [asyncio.ensure_future(self._DWX_ZMQ_Pull_Loop_()),
+                       asyncio.ensure_future(self._DWX_ZMQ_Sub_Loop_())]
+
+    ##########################################################################
+
+    async def _DWX_ZMQ_SHUTDOWN_(self):
+
+        self._ACTIVE = False
+
+        for _task in self._tasks:
+            _task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        # Terminate context
+        self._ZMQ_CONTEXT.destroy(0)
+        print("\n++ [KERNEL] ZeroMQ Context Terminated.. shut down safely complete! :)")
+
+    ##########################################################################
+
+    """
+    Function to send a command and await its response.
+
+    Returns the response dict, or None if none arrived within _timeout
+    seconds (defaults to _response_timeout).
+    """
+    async def _DWX_ZMQ_SEND_REQUEST_(self, _msg, _action, _ticket=None, _symbol=None,
+                                     _command=None, _tagged=True, _timeout=None):
+
+        _future = asyncio.get_running_loop().create_future()
+
+        _request = self._requests._new_request_(_action, _ticket, _symbol, _command,
+                                                _future)
+
+        if _tagged:
+            _msg = "{};{}".format(_msg, _request._request_id)
+
+        if _timeout is None:
+            _timeout = self._response_timeout
+
+        try:
+            # Waits for room on the PUSH socket instead of dropping on zmq.Again
+            await asyncio.wait_for(self._PUSH_SOCKET.send_string(_msg), _timeout)
+            return await asyncio.wait_for(asyncio.shield(_future), _timeout)
+
+        except asyncio.TimeoutError:
+            self._requests._abandon_(_future)
+
+            if self._verbose:
+                print('\n[KERNEL] No response to {} within {}s'.format(_action, _timeout))
+
+        except asyncio.CancelledError:
+            # The caller's task was cancelled: a late response must not be
+            # matched to this request
+            self._requests._abandon_(_future)
+            raise
+
+        return None
+
+    ##########################################################################
+
+    # OPEN ORDER
+    async def _DWX_MTX_NEW_TRADE_(self, _order=None):
+
+        if _order is None:
+            _order = self._generate_default_order_dict()
+
+        return await self._DWX_MTX_SEND_COMMAND_(**_order)
+
+    # MODIFY ORDER
+    # _SL and _TP given in points. _price is only used for pending orders.
+    async def _DWX_MTX_MODIFY_TRADE_BY_TICKET_(self, _ticket, _SL, _TP, _price=0):
+
+        _order = dict(self.temp_order_dict)
+        _order.update({'_action': 'MODIFY', '_ticket': _ticket,
+                       '_SL': _SL, '_TP': _TP, '_price': _price})
+
+        return await self._DWX_MTX_SEND_COMMAND_(**_order)
+
+    # CLOSE ORDER
+    async def _DWX_MTX_CLOSE_TRADE_BY_TICKET_(self, _ticket):
+
+        _order = dict(self.temp_order_dict)
+        _order.update({'_action': 'CLOSE', '_ticket': _ticket})
+
+        return await self._DWX_MTX_SEND_COMMAND_(**_order)
+
+    # CLOSE PARTIAL
+    async def _DWX_MTX_CLOSE_PARTIAL_BY_TICKET_(self, _ticket, _lots):
+
+        _order = dict(self.temp_order_dict)
+        _order.update({'_action': 'CLOSE_PARTIAL', '_ticket': _ticket, '_lots': _lots})
+
+        return await self._DWX_MTX_SEND_COMMAND_(**_order)
+
+    # CLOSE MAGIC
+    async def _DWX_MTX_CLOSE_TRADES_BY_MAGIC_(self, _magic):
+
+        _order = dict(self.temp_order_dict)
+        _order.update({'_action': 'CLOSE_MAGIC', '_magic': _magic})
+
+        return await self._DWX_MTX_SEND_COMMAND_(**_order)
+
+    # CLOSE ALL TRADES
+    async def _DWX_MTX_CLOSE_ALL_TRADES_(self):
+
+        _order = dict(self.temp_order_dict)
+        _order['_action'] = 'CLOSE_ALL'
+
+        return await self._DWX_MTX_SEND_COMMAND_(**_order)
+
+    # GET OPEN TRADES
+    async def _DWX_MTX_GET_ALL_OPEN_TRADES_(self):
+
+        _order = dict(self.temp_order_dict)
+        _order['_action'] = 'GET_OPEN_TRADES'
+
+        return await self._DWX_MTX_SEND_COMMAND_(**_order)
+
+    # GET ACCOUNT INFORMATION
+    async def _DWX_MTX_GET_ACCOUNT_INFO_(self):
+
+        _order = dict(self.temp_order_dict)
+        _order['_action'] = 'GET_ACCOUNT_INFO'
+
+        return await self._DWX_MTX_SEND_COMMAND_(**_order)
+
+    # DEFAULT ORDER DICT
+    def _generate_default_order_dict(self):
+        return({'_action': 'OPEN',
+                  '_type': 0,
+                  '_symbol': 'EURUSD',
+                  '_price': 0.0,
+                  '_SL': 500, # SL/TP in POINTS, not pips.
+                  '_TP': 500,
+                  '_comment': self._ClientID,
+                  '_lots': 0.01,
+                  '_magic': 123456,
+                  '_ticket': 0})
+
+    ##########################################################################
+
+    async def _DWX_MTX_SEND_HIST_REQUEST_(self,
+                                          _symbol='EURUSD',
+                                          _timeframe=1440,
+                                          _start='2020.01.01 00:00:00',
+                                          _end=None,
+                                          _timeout=None):
+
+        if _end is None:
+            _end = Timestamp.now().strftime('%Y.%m.%d %H:%M:00')
+
+        _msg = "{};{};{};{};{}".format('HIST',
+                                       _symbol,
+                                       _timeframe,
+                                       _start,
+                                       _end)
+
+        return await self._DWX_ZMQ_SEND_REQUEST_(_msg, 'HIST', _symbol=_symbol,
+                                                 _timeout=_timeout)
+
+    ##########################################################################
+
+    async def _DWX_MTX_SEND_TRACKPRICES_REQUEST_(self,
+                                                 _symbols=['EURUSD']):
+        _msg = 'TRACK_PRICES'
+        for s in _symbols:
+          _msg = _msg + ";{}".format(s)
+
+        return await self._DWX_ZMQ_SEND_REQUEST_(_msg, 'TRACK_PRICES', _tagged=False)
+
+    ##########################################################################
+
+    async def _DWX_MTX_SEND_TRACKRATES_REQUEST_(self,
+                                                _instruments=[('EURUSD_M1', 'EURUSD',1)]):
+        _msg = 'TRACK_RATES'
+        for i in _instruments:
+          _msg = _msg + ";{};{}".format(i[1], i[2])
+
+        return await self._DWX_ZMQ_SEND_REQUEST_(_msg, 'TRACK_RATES', _tagged=False)
+
+    ##########################################################################
+
+    async def _DWX_MTX_SEND_COMMAND_(self, _action='OPEN', _type=0,
+                                     _symbol='EURUSD', _price=0.0,
+                                     _SL=50, _TP=50, _comment="Python-to-MT",
+                                     _lots=0.01, _magic=123456, _ticket=0):
+
+        _msg = "{};{};{};{};{};{};{};{};{};{};{}".format('TRADE',_action,_type,
+                                                         _symbol,_price,
+                                                         _SL,_TP,_comment,
+                                                         _lots,_magic,
+                                                         _ticket)
+
+        return await self._DWX_ZMQ_SEND_REQUEST_(_msg, _action,
+                                                 _ticket=(_ticket if _action in ('MODIFY', 'CLOSE', 'CLOSE_PARTIAL') else None),
+                                                 _symbol=_symbol,
+                                                 _command={'_action': _action, '_type': _type,
+                                                           '_symbol': _symbol, '_price': _price,
+                                                           '_SL': _SL, '_TP': _TP, '_comment': _comment,
+                                                           '_lots': _lots, '_magic': _magic,
+                                                           '_ticket': _ticket})
+
+    ##########################################################################
+
+    async def _DWX_ZMQ_HEARTBEAT_(self):
+        return await self._DWX_ZMQ_SEND_REQUEST_("HEARTBEAT;", 'HEARTBEAT', _tagged=False)
+
+    ##########################################################################
+
+    """
+    Subscribe / unsubscribe the SUB socket (local, nothing is sent to MetaTrader)
+    """
+    def _DWX_MTX_SUBSCRIBE_MARKETDATA_(self, _symbol='EURUSD'):
+
+        self._SUB_SOCKET.setsockopt_string(zmq.SUBSCRIBE, _symbol)
+        print("[KERNEL] Subscribed to {} BID/ASK updates. See self._Market_Data_DB.".format(_symbol))
+
+    def _DWX_MTX_UNSUBSCRIBE_MARKETDATA_(self, _symbol):
+
+        self._SUB_SOCKET.setsockopt_string(zmq.UNSUBSCRIBE, _symbol)
+        print("\n**\n[KERNEL] Unsubscribing from " + _symbol + "\n**\n")
+
+    def _DWX_MTX_UNSUBSCRIBE_ALL_MARKETDATA_REQUESTS_(self):
+
+        for _symbol in list(self._Market_Data_DB.keys()) + self._Rates_DB._instruments_():
+            self._DWX_MTX_UNSUBSCRIBE_MARKETDATA_(_symbol=_symbol)
+
+    ##########################################################################
+
+    """
+    Async iterators over the SUB feed.
+
+    _DWX_ZMQ_TICKS_() yields (SYMBOL, TIMESTAMP, BID, ASK) and
+    _DWX_ZMQ_RATES_() yields (INSTRUMENT, TIME, OPEN, HIGH, LOW, CLOSE,
+    TICKVOL, SPREAD, REALVOL), optionally filtered by symbol / instrument.
+    A consumer more than _queue_size items behind loses its oldest items.
+    """
+    async def _DWX_ZMQ_TICKS_(self, _symbols=None):
+
+        async for _item in self._DWX_ZMQ_Iterate_(self._tick_queues, _symbols):
+            yield _item
+
+    async def _DWX_ZMQ_RATES_(self, _instruments=None):
+
+        async for _item in self._DWX_ZMQ_Iterate_(self._rate_queues, _instruments):
+            yield _item
+
+    async def _DWX_ZMQ_Iterate_(self, _consumers, _topics):
+
+        _entry = (set(_topics) if _topics is not None else None,
+                  asyncio.Queue(self._queue_size))
+
+        _consumers.append(_entry)
+
+        try:
+            while True:
+                yield await _entry[1].get()
+        finally:
+            _consumers.remove(_entry)
+
+    ##########################################################################
+
+    def _DWX_ZMQ_Publish_(self, _consumers, _topic, _item):
+
+        for _topics, _queue in _consumers:
+
+            if _topics is not None and _topic not in _topics:
+                continue
+
+            if _queue.full():
+                _queue.get_nowait()
+                self._dropped += 1
+
+            _queue.put_nowait(_item)
+
+    ##########################################################################
+
+    async def _DWX_ZMQ_Pull_Loop_(self):
+
+        while self._ACTIVE:
+
+            msg = await self._PULL_SOCKET.recv_string()
+
+            if msg == '':
+                continue
+
+            try:
+                _data = _DWX_ZMQ_DECODE_(msg)
+
+                if '_action' in _data and _data['_action'] == 'HIST':
+                    if '_data' in _data.keys():
+                        self._History_DB[_data['_symbol']] = _data['_data']
+                    else:
+                        print('No data found. MT4 often needs multiple requests when accessing data of symbols without open charts.')
+                        print('message: ' + msg)
+
+                elif '_action' in _data and _data['_action'] == 'GET_ACCOUNT_INFORMATION':
+                    if '_data' in _data.keys():
+                        self.account_info_DB.setdefault(_data['account_number'], []).extend(_data['_data'])
+
+                # Wake up the coroutine awaiting this response
+                self._requests._resolve_(_data)
+
+                for hnd in self._pulldata_handlers:
+                    _ret = hnd.onPullData(_data)
+                    if asyncio.iscoroutine(_ret):
+                        await _ret
+
+                if self._verbose:
+                    print(_data)
+
+            except Exception as ex:
+                _exstr = "Exception Type {0}. Args:\n{1!r}"
+                _msg = _exstr.format(type(ex).__name__, ex.args)
+                print(_msg)
+
+    ##########################################################################
+
+    async def _DWX_ZMQ_Sub_Loop_(self):
+
+        while self._ACTIVE:
+
+            msg = await self._SUB_SOCKET.recv_string()
+
+            if msg == '':
+                continue
+
+            try:
+                # Same parsing as DWX_ZeroMQ_Connector
+                _item = _DWX_ZMQ_PARSE_SUB_(msg, self._main_string_delimiter,
+                                            self._string_delimiter)
+                _timestamp = str(Timestamp.now('UTC'))[:-6]
+
+                if type(_item) is DWX_ZMQ_Tick:
+                    self._Market_Data_DB._append_(_item.symbol, _item.bid, _item.ask, _item.time)
+                    self._DWX_ZMQ_Publish_(self._tick_queues, _item.symbol,
+                                           (_item.symbol, _timestamp, _item.bid, _item.ask))
+
+                elif type(_item) is DWX_ZMQ_Bar:
+                    self._Rates_DB._append_(_item.symbol, _item.timeframe, _item[3:])
+                    self._DWX_ZMQ_Publish_(self._rate_queues, _item.instrument,
+                                           (_item.instrument,) + _item[3:])
+
+                if self._verbose:
+                    print("\n[" + msg.replace(self._main_string_delimiter, "] " + _timestamp + " ", 1))
+
+                for hnd in self._subdata_handlers:
+                    _ret = hnd.onSubData(msg)
+                    if asyncio.iscoroutine(_ret):
+                        await _ret
+
+            except ValueError:
+                pass # Malformed message, passing iteration.
+
+##############################################################################
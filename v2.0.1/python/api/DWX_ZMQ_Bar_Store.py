@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+"""
+    DWX_ZMQ_Bar_Store.py
+    --
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+import numpy as np
+from pandas import DataFrame, Timestamp, concat, to_datetime
+
+##############################################################################
+
+# One OHLC bar, as published by the EA: time is the bar open time in seconds
+# since epoch (MetaTrader server time).
+BAR_DTYPE = np.dtype([('time', np.int64),
+                      ('open', np.float64),
+                      ('high', np.float64),
+                      ('low', np.float64),
+                      ('close', np.float64),
+                      ('tick_volume', np.int64),
+                      ('spread', np.int32),
+                      ('real_volume', np.int64)])
+
+# Timeframe text used in instrument names (see GetTimeframeText() in the EA)
+# -> minutes, as sent in HIST and TRACK_RATES commands.
+TIMEFRAMES = {'M1': 1, 'M5': 5, 'M15': 15, 'M30': 30, 'H1': 60, 'H4': 240,
+              'D1': 1440, 'W1': 10080, 'MN1': 43200}
+
+# MetaTrader datetime format used by HIST commands
+_MT_TIME_FORMAT = '%Y.%m.%d %H:%M:%S'
+
+##############################################################################
+
+def _split_instrument_(_instrument):
+
+    # 'EURUSD_M1' -> ('EURUSD', 'M1'). Symbols may contain '_' themselves.
+    _symbol, _, _timeframe = _instrument.rpartition('_')
+
+    if _symbol == '' or _timeframe not in TIMEFRAMES:
+        raise ValueError('Not a SYMBOL_TIMEFRAME instrument: {}'.format(_instrument))
+
+    return _symbol, _timeframe
+
+##############################################################################
+
+class DWX_ZMQ_Bar_Buffer():
+
+    """
+    Bars of one instrument, sorted by open time with one bar per time.
+
+    Backed by a structured NumPy array (BAR_DTYPE) that grows by doubling, so
+    appending the latest bar is amortized O(1). A bar with the same time as
+    the last one replaces it (the EA re-publishes the current bar after a
+    restart or re-subscription). If _max_bars is set, only the latest
+    _max_bars bars are retained (storage is capped at 2 x _max_bars and
+    compacted when full, keeping appends amortized O(1)).
+    """
+    def __init__(self, _max_bars=None, _initial_size=1024):
+
+        self._max_bars = _max_bars
+        self._data = np.zeros(_initial_size if _max_bars is None
+                              else min(_initial_size, 2 * _max_bars), dtype=BAR_DTYPE)
+        self._size = 0
+
+    ##########################################################################
+
+    def _append_(self, _bar):
+
+        """
+        _bar: (TIME, OPEN, HIGH, LOW, CLOSE, TICKVOL, SPREAD, REALVOL)
+        """
+        _time = _bar[0]
+
+        if self._size > 0:
+
+            _last = self._data['time'][self._size - 1]
+
+            if _time == _last:
+                self._data[self._size - 1] = _bar
+                return
+
+            # Out of order (rare): merge it in, keeping times unique
+            if _time < _last:
+                self._merge_(np.array([tuple(_bar)], dtype=BAR_DTYPE))
+                return
+
+        if self._size == len(self._data):
+            self._reserve_(self._size + 1)
+
+        self._data[self._size] = _bar
+        self._size += 1
+
+    ##########################################################################
+
+    def _merge_(self, _bars):
+
+        """
+        Merge an array of BAR_DTYPE bars (e.g. a HIST response) into the
+        buffer. Where times clash, the bars being merged win.
+        """
+        _all = np.concatenate([np.asarray(_bars, dtype=BAR_DTYPE), self._bars_()])
+
+        # np.unique keeps the first occurrence, i.e. the new bar
+        _times, _index = np.unique(_all['time'], return_index=True)
+        _merged = _all[_index]
+
+        if self._max_bars is not None:
+            _merged = _merged[-self._max_bars:]
+
+        self._data = np.zeros(max(len(_merged), 1) * 2 if self._max_bars is None
+                              else 2 * self._max_bars, dtype=BAR_DTYPE)
+        self._data[:len(_merged)] = _merged
+        self._size = len(_merged)
+
+    ##########################################################################
+
+    def _reserve_(self, _needed):
+
+        if self._max_bars is not None and _needed > 2 * self._max_bars:
+
+            # Full: keep the latest bars, shifting them down in place
+            _keep = self._max_bars - 1
+            self._data[:_keep] = self._data[self._size - _keep:self._size]
+            self._size = _keep
+            return
+
+        _new_size = max(2 * len(self._data), _needed, 1)
+
+        if self._max_bars is not None:
+            _new_size = min(_new_size, 2 * self._max_bars)
+
+        _data = np.zeros(_new_size, dtype=BAR_DTYPE)
+        _data[:self._size] = self._data[:self._size]
+        self._data = _data
+
+    ##########################################################################
+
+    def _first_(self):
+
+        # Index of the oldest retained bar
+        if self._max_bars is None:
+            return 0
+
+        return max(0, self._size - self._max_bars)
+
+    ##########################################################################
+
+    def __len__(self):
+        return self._size - self._first_()
+
+    ##########################################################################
+
+    def _bars_(self, _start=None, _end=None):
+
+        """
+        Read-only view of the bars with _start <= time <= _end (seconds since
+        epoch, either bound optional), oldest first. Copy it to keep it.
+        """
+        _bars = self._data[self._first_():self._size]
+        _times = _bars['time']
+
+        _i = 0 if _start is None else int(np.searchsorted(_times, _start, side='left'))
+        _j = len(_bars) if _end is None else int(np.searchsorted(_times, _end, side='right'))
+
+        _view = _bars[_i:_j]
+        _view.flags.writeable = False
+
+        return _view
+
+    ##########################################################################
+
+    def _latest_(self):
+        return self._data[self._size - 1].copy() if self._size > 0 else None
+
+    ##########################################################################
+
+    def _to_dataframe_(self, _start=None, _end=None):
+
+        _bars = self._bars_(_start, _end)
+
+        _df = DataFrame({_name: _bars[_name] for _name in BAR_DTYPE.names[1:]},
+                        index=to_datetime(_bars['time'], unit='s'))
+        _df.index.name = 'time'
+
+        return _df
+
+##############################################################################
+
+class DWX_ZMQ_Bar_Store():
+
+    """
+    OHLC bars received through TRACK_RATES feeds (or merged from HIST
+    responses), one DWX_ZMQ_Bar_Buffer per (SYMBOL, TIMEFRAME), e.g.
+    ('EURUSD', 'M1') for the 'EURUSD_M1' instrument.
+    """
+    def __init__(self, _max_bars=None):
+
+        self._max_bars = _max_bars
+
+        # {(SYMBOL, TIMEFRAME): DWX_ZMQ_Bar_Buffer}
+        self._buffers = {}
+
+    ##########################################################################
+
+    def _buffer_(self, _symbol, _timeframe):
+
+        _key = (_symbol, _timeframe)
+        _buffer = self._buffers.get(_key)
+
+        if _buffer is None:
+            _buffer = self._buffers[_key] = DWX_ZMQ_Bar_Buffer(self._max_bars)
+
+        return _buffer
+
+    ##########################################################################
+
+    def _append_(self, _symbol, _timeframe, _bar):
+        self._buffer_(_symbol, _timeframe)._append_(_bar)
+
+    def _merge_(self, _symbol, _timeframe, _bars):
+        self._buffer_(_symbol, _timeframe)._merge_(_bars)
+
+    ##########################################################################
+
+    def _on_rate_(self, _instrument, _fields):
+
+        """
+        Store one rate message from the SUB socket, e.g. 'EURUSD_M1' and
+        [TIME, OPEN, HIGH, LOW, CLOSE, TICKVOL, SPREAD, REALVOL] as strings.
+        Returns the (SYMBOL, TIMEFRAME) key.
+        """
+        _symbol, _timeframe = _split_instrument_(_instrument)
+
+        self._buffer_(_symbol, _timeframe)._append_(
+            (int(_fields[0]), float(_fields[1]), float(_fields[2]),
+             float(_fields[3]), float(_fields[4]), int(_fields[5]),
+             int(_fields[6]), int(_fields[7])))
+
+        return _symbol, _timeframe
+
+    ##########################################################################
+
+    def __getitem__(self, _key):
+        return self._buffers[_key]
+
+    def __contains__(self, _key):
+        return _key in self._buffers
+
+    def __iter__(self):
+        return iter(list(self._buffers))
+
+    def __len__(self):
+        return len(self._buffers)
+
+    def keys(self):
+        return list(self._buffers)
+
+    def _instruments_(self):
+
+        # ['EURUSD_M1', ...], as used for SUB topics
+        return [_symbol + '_' + _timeframe for _symbol, _timeframe in self._buffers]
+
+    ##########################################################################
+
+    def _bars_(self, _symbol, _timeframe, _start=None, _end=None):
+        return self._buffers[(_symbol, _timeframe)]._bars_(_start, _end)
+
+    def _to_dataframe_(self, _symbol, _timeframe, _start=None, _end=None):
+        return self._buffers[(_symbol, _timeframe)]._to_dataframe_(_start, _end)
+
+    ##########################################################################
+
+    def _to_panel_(self, _field='close', _keys=None, _start=None, _end=None):
+
+        """
+        One column of _field per instrument (all stored ones if _keys is None),
+        aligned on bar time, e.g. closes of 50 symbols for a vectorized
+        indicator. Missing bars are NaN.
+        """
+        _keys = self.keys() if _keys is None else _keys
+
+        _columns = []
+
+        for _symbol, _timeframe in _keys:
+            _bars = self._buffers[(_symbol, _timeframe)]._bars_(_start, _end)
+            _columns.append(DataFrame({_symbol + '_' + _timeframe: _bars[_field]},
+                                      index=to_datetime(_bars['time'], unit='s')))
+
+        if len(_columns) == 0:
+            return DataFrame()
+
+        _panel = concat(_columns, axis=1, sort=True)
+        _panel.index.name = 'time'
+
+        return _panel
+
+##############################################################################
+
+def _hist_to_bars_(_data):
+
+    """
+    Convert the '_data' list of a HIST response, e.g.
+    [{'time': '2019.01.02 00:00', 'open': 1.14, ...}, ...], into a sorted
+    BAR_DTYPE array.
+    """
+    _bars = np.zeros(len(_data), dtype=BAR_DTYPE)
+
+    if len(_data) == 0:
+        return _bars
+
+    _times = to_datetime([_bar['time'] for _bar in _data], format='%Y.%m.%d %H:%M')
+    _bars['time'] = _times.values.astype('datetime64[s]').astype(np.int64)
+
+    for _name in BAR_DTYPE.names[1:]:
+        _bars[_name] = [_bar[_name] for _bar in _data]
+
+    return np.sort(_bars, order='time')
+
+##############################################################################
+
+def _timeframe_text_(_timeframe):
+
+    # 1 -> 'M1', 'M1' -> 'M1'
+    if _timeframe in TIMEFRAMES:
+        return _timeframe
+
+    for _text, _minutes in TIMEFRAMES.items():
+        if _minutes == _timeframe:
+            return _text
+
+    raise ValueError('Unknown timeframe: {}'.format(_timeframe))
+
+def _to_seconds_(_time):
+
+    # Seconds since epoch, MetaTrader server time
+    if isinstance(_time, (int, np.integer)):
+        return int(_time)
+
+    if isinstance(_time, str):
+        _time = _time.replace('.', '-', 2)
+
+    return int(Timestamp(_time).value // 10**9)
+
+def _format_time_(_seconds):
+    return to_datetime(_seconds, unit='s').strftime(_MT_TIME_FORMAT)
+
+##############################################################################
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+    DWX_ZMQ_Binary_Feed.py
+    --
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+"""
+Binary SUB feed, enabled per subscription with TRACK_PRICES_BIN and
+TRACK_RATES_BIN (the text feed stays the default). The EA then publishes
+each update as one frame:
+
+    TOPIC \x00 RECORD       e.g. b'EURUSD\x00' + 32 bytes, b'EURUSD_M1\x00' + 72 bytes
+
+The topic prefix keeps SUB prefix filtering working, and the NUL (never
+found in text messages) tells binary messages apart. RECORD is a packed
+little-endian struct (DWX_BinTick / DWX_BinBar in the EA), starting with a
+common header:
+
+    id        uint16    position of the symbol / instrument in the TRACK_* list
+    kind      uint16    KIND_TICK or KIND_BAR
+    seq       uint32    per topic sequence number, from 1 after each TRACK_*
+    time_ms   int64     server time in ms (tick time, or bar open time)
+
+followed by bid, ask (ticks) or open, high, low, close, tick_volume,
+spread, real_volume (bars). Records are decoded in place, with struct or
+with np.frombuffer(..., TICK_WIRE_DTYPE).
+"""
+
+import struct
+
+import numpy as np
+from time import time_ns
+
+try:
+    from api.DWX_ZMQ_Topic_Router import DWX_ZMQ_Tick, DWX_ZMQ_Bar
+    from api.DWX_ZMQ_Bar_Store import _split_instrument_
+except ImportError:
+    from DWX_ZMQ_Topic_Router import DWX_ZMQ_Tick, DWX_ZMQ_Bar
+    from DWX_ZMQ_Bar_Store import _split_instrument_
+
+##############################################################################
+
+KIND_TICK = 1
+KIND_BAR = 2
+
+_TICK = struct.Struct('<HHIqdd')
+_BAR = struct.Struct('<HHIqddddqiiq')
+
+TICK_WIRE_DTYPE = np.dtype([('id', '<u2'), ('kind', '<u2'), ('seq', '<u4'),
+                            ('time_ms', '<i8'), ('bid', '<f8'), ('ask', '<f8')])
+
+BAR_WIRE_DTYPE = np.dtype([('id', '<u2'), ('kind', '<u2'), ('seq', '<u4'),
+                           ('time_ms', '<i8'), ('open', '<f8'), ('high', '<f8'),
+                           ('low', '<f8'), ('close', '<f8'), ('tick_volume', '<i8'),
+                           ('spread', '<i4'), ('reserved', '<i4'), ('real_volume', '<i8')])
+
+assert TICK_WIRE_DTYPE.itemsize == _TICK.size == 32
+assert BAR_WIRE_DTYPE.itemsize == _BAR.size == 72
+
+##############################################################################
+
+def _encode_tick_(_topic, _id, _seq, _time_ms, _bid, _ask):
+
+    # Reference encoder, byte for byte what the EA's PublishBinaryTick() sends
+    return _topic.encode() + b'\x00' + _TICK.pack(_id, KIND_TICK, _seq & 0xFFFFFFFF,
+                                                  _time_ms, _bid, _ask)
+
+def _encode_bar_(_topic, _id, _seq, _time_ms, _open, _high, _low, _close,
+                 _tick_volume, _spread, _real_volume):
+
+    # Reference encoder, byte for byte what the EA's PublishBinaryRate() sends
+    return _topic.encode() + b'\x00' + _BAR.pack(_id, KIND_BAR, _seq & 0xFFFFFFFF, _time_ms,
+                                                 _open, _high, _low, _close,
+                                                 _tick_volume, _spread, 0, _real_volume)
+
+##############################################################################
+
+def _DWX_ZMQ_SPLIT_SUB_BINARY_(_msg):
+
+    """
+    Split one binary SUB message into (TOPIC, RECORD), RECORD being a
+    memoryview into _msg (no copy). Raises ValueError if _msg has no NUL,
+    i.e. is a text message.
+    """
+    _end = _msg.index(0)
+
+    return _msg[:_end].decode(), memoryview(_msg)[_end + 1:]
+
+##############################################################################
+
+def _DWX_ZMQ_DECODE_SUB_BINARY_(_msg, _end=None):
+
+    """
+    Decode one binary SUB message (bytes) into (DWX_ZMQ_Tick or DWX_ZMQ_Bar,
+    SEQ), as for the text feed. Tick time is the local receive time in ns,
+    like the text feed; bar time is the bar open time in seconds. _end is
+    the position of the NUL after the topic, if already known. Raises
+    ValueError if malformed.
+    """
+    if _end is None:
+        _end = _msg.index(0)
+
+    _topic = _msg[:_end].decode()
+
+    # Told apart by size first: one unpack per record, read in place
+    _size = len(_msg) - _end - 1
+
+    if _size == _TICK.size:
+        _id, _kind, _seq, _time_ms, _bid, _ask = _TICK.unpack_from(_msg, _end + 1)
+
+        if _kind == KIND_TICK:
+            return DWX_ZMQ_Tick(_topic, time_ns(), _bid, _ask), _seq
+
+    elif _size == _BAR.size:
+        (_id, _kind, _seq, _time_ms, _open, _high, _low, _close,
+         _tick_volume, _spread, _reserved, _real_volume) = _BAR.unpack_from(_msg, _end + 1)
+
+        if _kind == KIND_BAR:
+            _symbol, _timeframe = _split_instrument_(_topic)
+
+            return DWX_ZMQ_Bar(_topic, _symbol, _timeframe, _time_ms // 1000, _open, _high,
+                               _low, _close, _tick_volume, _spread, _real_volume), _seq
+
+    raise ValueError('Unknown binary SUB record ({} bytes)'.format(_size))
+
+##############################################################################
+
+_TIME_MS = struct.Struct('<q')
+
+def _DWX_ZMQ_SERVER_TIME_(_msg, _end=None):
+
+    # time_ms of one binary SUB message, _end being the position of the NUL
+    if _end is None:
+        _end = _msg.index(0)
+
+    return _TIME_MS.unpack_from(_msg, _end + 9)[0]
+
+##############################################################################
+
+def _DWX_ZMQ_DECODE_TICKS_(_records):
+
+    """
+    Decode many tick records at once: concatenated RECORDs, or a list of
+    them (see _DWX_ZMQ_SPLIT_SUB_BINARY_) -> TICK_WIRE_DTYPE array. A single
+    buffer is wrapped without copying.
+    """
+    if isinstance(_records, (list, tuple)):
+        _records = b''.join(_records)
+
+    return np.frombuffer(_records, dtype=TICK_WIRE_DTYPE)
+
+##############################################################################
+
+def _to_text_(_item, _delimiter=';', _main_delimiter=':|:'):
+
+    # Text feed equivalent of a decoded item, for raw onSubData(msg) handlers
+    if type(_item) is DWX_ZMQ_Tick:
+        return '{}{}{:f}{}{:f}'.format(_item.symbol, _main_delimiter, _item.bid,
+                                       _delimiter, _item.ask)
+
+    return _item.instrument + _main_delimiter + _delimiter.join(
+        ('{:f}'.format(_field) if isinstance(_field, float) else str(_field))
+        for _field in _item[3:])
+
+##############################################################################
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+    DWX_ZMQ_Conflator.py
+    --
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+from threading import Condition
+
+##############################################################################
+
+class DWX_ZMQ_Conflator():
+
+    """
+    Latest-value slots for SUB data, one per topic ('EURUSD', 'EURUSD_M1').
+
+    Every update overwrites its topic's slot and gets the next sequence
+    number. Each consumer (any name) remembers the last sequence number it
+    read, so _changed_() returns only the topics updated since that
+    consumer's previous call, each with its newest item. A strategy reading
+    every 100 ms therefore handles at most one update per topic, however
+    many ticks arrived in between.
+
+    Slots are kept in update order, so a read costs O(topics changed), not
+    O(topics).
+    """
+    def __init__(self):
+
+        self._cond = Condition()
+
+        # {TOPIC: (SEQ, ITEM)}, oldest update first
+        self._slots = {}
+        self._seq = 0
+
+        # {CONSUMER: [LAST_SEQ, READS, DELIVERED, CONFLATED]}
+        self._consumers = {}
+
+        # Readers blocked in _changed_(_timeout=...)
+        self._waiting = 0
+
+    ##########################################################################
+
+    def _update_(self, _topic, _item):
+
+        with self._cond:
+
+            self._seq += 1
+
+            # Re-insert, moving the topic to the end of the update order
+            self._slots.pop(_topic, None)
+            self._slots[_topic] = (self._seq, _item)
+
+            if self._waiting > 0:
+                self._cond.notify_all()
+
+    ##########################################################################
+
+    def _changed_(self, _consumer='default', _timeout=None):
+
+        """
+        {TOPIC: ITEM} for the topics updated since _consumer's last call,
+        oldest update first. A new consumer gets every slot. If _timeout
+        (seconds) is given and nothing changed, waits up to _timeout for an
+        update; otherwise returns at once, possibly {}.
+        """
+        with self._cond:
+
+            _state = self._consumers.get(_consumer)
+
+            if _state is None:
+                _state = self._consumers[_consumer] = [0, 0, 0, 0]
+
+            if _timeout is not None and self._seq == _state[0]:
+                self._waiting += 1
+                try:
+                    self._cond.wait_for(lambda: self._seq != _state[0], _timeout)
+                finally:
+                    self._waiting -= 1
+
+            _changed = []
+
+            for _topic, (_seq, _item) in reversed(self._slots.items()):
+                if _seq <= _state[0]:
+                    break
+                _changed.append((_topic, _item))
+
+            # Updates overwritten before this consumer saw them
+            _state[3] += (self._seq - _state[0]) - len(_changed)
+            _state[0] = self._seq
+            _state[1] += 1
+            _state[2] += len(_changed)
+
+            return dict(reversed(_changed))
+
+    ##########################################################################
+
+    def _latest_(self, _topic):
+
+        # Newest item of _topic, or None
+        _slot = self._slots.get(_topic)
+
+        return None if _slot is None else _slot[1]
+
+    ##########################################################################
+
+    def _remove_(self, _topic):
+
+        with self._cond:
+            self._slots.pop(_topic, None)
+
+    def _remove_consumer_(self, _consumer):
+
+        with self._cond:
+            self._consumers.pop(_consumer, None)
+
+    ##########################################################################
+
+    """
+    Function to get per-consumer stats:
+    {CONSUMER: {'reads', 'delivered', 'conflated', 'pending'}}
+    """
+    def _get_stats_(self):
+
+        with self._cond:
+            return {_consumer: {'reads': _state[1],
+                                'delivered': _state[2],
+                                'conflated': _state[3],
+                                'pending': self._seq - _state[0]}
+                    for _consumer, _state in self._consumers.items()}
+
+##############################################################################
@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+    DWX_ZMQ_Connector_Pool.py
+    --
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+import zmq
+from fnmatch import fnmatchcase
+from functools import partial
+from threading import Thread
+
+try:
+    from api.DWX_ZeroMQ_Connector_v2_0_1_RC8 import DWX_ZeroMQ_Connector
+except ImportError:
+    from DWX_ZeroMQ_Connector_v2_0_1_RC8 import DWX_ZeroMQ_Connector
+
+##############################################################################
+
+class DWX_ZeroMQ_Connector_Pool():
+
+    """
+    Several MetaTrader terminals (one DWX EA each) driven from a single
+    poll thread and ZeroMQ context.
+
+    _terminals maps a terminal name to its connection settings, e.g.
+
+        {'ACC1': {'_PUSH_PORT': 32768, '_PULL_PORT': 32769, '_SUB_PORT': 32770,
+                  '_account': 1234567, '_symbols': ['EURUSD', 'GBP*']},
+         'ACC2': {'_PUSH_PORT': 32771, '_PULL_PORT': 32772, '_SUB_PORT': 32773,
+                  '_account': 7654321, '_symbols': ['*']}}
+
+    '_account' and '_symbols' (shell-style patterns, checked in order) are
+    used to route commands, see _connector_(). Every other key, and any
+    extra keyword argument, is passed to that terminal's
+    DWX_ZeroMQ_Connector. The connectors keep their own stores, request
+    trackers and handlers; the pool only reads their sockets.
+
+    Parsed SUB data of all terminals is merged into one stream, tagged with
+    the source terminal, see _add_sub_handler_().
+    """
+    def __init__(self, _terminals, _poll_timeout=1000, _drain_batch=1000,
+                 **_kwargs):
+
+        self._ACTIVE = True
+
+        self._poll_timeout = _poll_timeout
+        self._drain_batch = _drain_batch
+
+        # One context (and I/O thread) for all terminals
+        self._ZMQ_CONTEXT = zmq.Context()
+
+        # {TERMINAL: DWX_ZeroMQ_Connector}, {TERMINAL: ACCOUNT}, [(PATTERN, TERMINAL)]
+        self._connectors = {}
+        self._accounts = {}
+        self._symbols = []
+
+        for _terminal, _config in _terminals.items():
+
+            _config = dict(_config)
+
+            self._accounts[_terminal] = _config.pop('_account', None)
+            self._symbols.extend((_pattern, _terminal) for _pattern in _config.pop('_symbols', []))
+
+            _args = dict(_kwargs, _ClientID=_terminal)
+            _args.update(_config)
+
+            self._connectors[_terminal] = DWX_ZeroMQ_Connector(_context=self._ZMQ_CONTEXT,
+                                                               _poll_thread=False,
+                                                               **_args)
+
+        # {SOCKET: (TERMINAL, 'PULL' or 'SUB')}
+        self._sockets = {}
+        self._poller = zmq.Poller()
+
+        for _terminal, _zmq in self._connectors.items():
+            for _socket, _kind in ((_zmq._PULL_SOCKET, 'PULL'), (_zmq._SUB_SOCKET, 'SUB')):
+                self._sockets[_socket] = (_terminal, _kind)
+                self._poller.register(_socket, zmq.POLLIN)
+
+        # {TERMINAL: {'pull_messages': N, 'sub_messages': N}}
+        self._stats = {_terminal: {'pull_messages': 0, 'sub_messages': 0}
+                       for _terminal in self._connectors}
+
+        # {(TOPIC, HANDLER): [(TERMINAL, TAGGED_HANDLER)]}
+        self._tagged_handlers = {}
+
+        self._Poll_Thread = Thread(target=self._DWX_ZMQ_Poll_Pool_, daemon=True)
+        self._Poll_Thread.start()
+
+    ##########################################################################
+
+    def _DWX_ZMQ_Poll_Pool_(self):
+
+        while self._ACTIVE:
+
+            sockets = dict(self._poller.poll(self._poll_timeout))
+
+            for _socket in sockets:
+
+                _terminal, _kind = self._sockets[_socket]
+                _zmq = self._connectors[_terminal]
+
+                if _kind == 'PULL' and _zmq._PULL_SOCKET_STATUS['state'] != True:
+                    continue
+
+                _count = 0
+
+                # Drain, so a busy terminal can't starve the others for long
+                while _count < self._drain_batch:
+                    try:
+                        if _kind == 'SUB':
+                            _zmq._DWX_ZMQ_Recv_Sub_(_zmq._string_delimiter)
+                            msg = ''
+                        else:
+                            msg = _socket.recv_string(zmq.DONTWAIT)
+                    except zmq.error.Again:
+                        break
+
+                    _count += 1
+
+                    if msg != '':
+                        _zmq._DWX_ZMQ_Process_Pull_Data_(msg)
+
+                self._stats[_terminal][_kind.lower() + '_messages'] += _count
+
+        print("\n++ [KERNEL] _DWX_ZMQ_Poll_Pool_() Signing Out ++")
+
+    ##########################################################################
+
+    """
+    Function to pick the terminal's connector for a command: by terminal
+    name, else by account number, else by the first '_symbols' pattern
+    matching _symbol. Raises KeyError if none matches.
+    """
+    def _connector_(self, _terminal=None, _account=None, _symbol=None):
+
+        if _terminal is not None:
+            return self._connectors[_terminal]
+
+        if _account is not None:
+            for _name, _acc in self._accounts.items():
+                if _acc is not None and str(_acc) == str(_account):
+                    return self._connectors[_name]
+
+            raise KeyError('No terminal for account {}'.format(_account))
+
+        if _symbol is not None:
+            for _pattern, _name in self._symbols:
+                if fnmatchcase(_symbol, _pattern):
+                    return self._connectors[_name]
+
+            raise KeyError('No terminal for symbol {}'.format(_symbol))
+
+        # Nothing to route by: fine if there's only one terminal
+        if len(self._connectors) == 1:
+            return next(iter(self._connectors.values()))
+
+        raise KeyError('Specify _terminal, _account or _symbol')
+
+    def __getitem__(self, _terminal):
+        return self._connectors[_terminal]
+
+    def _terminals_(self):
+        return list(self._connectors)
+
+    ##########################################################################
+
+    """
+    Function to send a new trade to the terminal of _terminal / _account,
+    or else of the order's symbol. Returns the connector's Future.
+    """
+    def _DWX_MTX_NEW_TRADE_(self, _order=None, _terminal=None, _account=None):
+
+        _symbol = None if _order is None else _order.get('_symbol')
+
+        return self._connector_(_terminal, _account, _symbol)._DWX_MTX_NEW_TRADE_(_order)
+
+    """
+    Function to request open trades from every terminal: {TERMINAL: Future}
+    """
+    def _DWX_MTX_GET_ALL_OPEN_TRADES_(self):
+
+        return {_terminal: _zmq._DWX_MTX_GET_ALL_OPEN_TRADES_()
+                for _terminal, _zmq in self._connectors.items()}
+
+    ##########################################################################
+
+    """
+    Function to subscribe the SUB socket of the terminal of _terminal /
+    _account, or else of the terminal _symbol routes to, to _symbol's BID/ASK
+    feed. Returns its connector. Nothing is sent to MetaTrader: have it
+    publish the symbol with _DWX_MTX_SEND_TRACKPRICES_REQUEST_() on that
+    connector.
+    """
+    def _DWX_MTX_SUBSCRIBE_MARKETDATA_(self, _symbol='EURUSD', _terminal=None, _account=None):
+
+        _zmq = self._connector_(_terminal, _account, _symbol)
+
+        _zmq._DWX_MTX_SUBSCRIBE_MARKETDATA_(_symbol)
+
+        return _zmq
+
+    ##########################################################################
+
+    """
+    Function to register _handler(_terminal, _item) for parsed SUB data of
+    _topic (or topic pattern) from every terminal, or only from _terminals.
+    """
+    def _add_sub_handler_(self, _topic, _handler, _terminals=None):
+
+        _tagged = self._tagged_handlers.setdefault((_topic, _handler), [])
+
+        for _terminal in (self._connectors if _terminals is None else _terminals):
+
+            # partial() keeps handlers picklable for _dispatch_mode='process'
+            _tagged_handler = partial(_handler, _terminal)
+            _tagged.append((_terminal, _tagged_handler))
+
+            self._connectors[_terminal]._DWX_ZMQ_ADD_SUB_HANDLER_(_topic, _tagged_handler)
+
+    def _remove_sub_handler_(self, _topic, _handler):
+
+        for _terminal, _tagged_handler in self._tagged_handlers.pop((_topic, _handler), []):
+            self._connectors[_terminal]._DWX_ZMQ_REMOVE_SUB_HANDLER_(_topic, _tagged_handler)
+
+    ##########################################################################
+
+    """
+    Messages read per terminal: {TERMINAL: {'pull_messages', 'sub_messages'}}
+    """
+    def _get_pool_stats_(self):
+        return {_terminal: dict(_stats) for _terminal, _stats in self._stats.items()}
+
+    ##########################################################################
+
+    def _DWX_ZMQ_SHUTDOWN_(self):
+
+        self._ACTIVE = False
+        self._Poll_Thread.join()
+
+        for _socket in self._sockets:
+            self._poller.unregister(_socket)
+
+        # Stops monitor threads and handler pools, closes sockets
+        for _zmq in self._connectors.values():
+            _zmq._ACTIVE = False
+            _zmq._DWX_ZMQ_SHUTDOWN_()
+
+        self._ZMQ_CONTEXT.destroy(0)
+        print("\n++ [KERNEL] ZeroMQ Context Terminated.. pool shut down safely complete! :)")
+
+##############################################################################
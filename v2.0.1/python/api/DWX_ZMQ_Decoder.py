@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+    DWX_ZMQ_Decoder.py
+    --
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+import json
+import re
+
+##############################################################################
+
+"""
+Decoder for the responses the EA sends through the PULL socket, e.g.
+
+    {'_action': 'OPEN_TRADES', '_trades': {85051741: {'_magic': 123456, ...}}}
+
+These are Python-style dict literals: single-quoted strings, bare integer
+keys (tickets) and plain numbers. They are rewritten into JSON and handed to
+the C json decoder, so nothing in the message is ever executed.
+
+Fast path (HIST, account info, most trade responses): no double quotes,
+backslashes or integer keys, so swapping the quote character is enough.
+Otherwise every string literal is re-encoded and integer keys are tagged
+so they come back as int, like eval() would return them.
+
+Older EAs end CLOSE_ALL(_MAGIC) '_responses' with ", }" when the last order
+they looked at was skipped. eval() accepted that, so if decoding fails,
+trailing commas are dropped and the message decoded again.
+"""
+
+# Single-quoted string, or a bare integer used as a dict key.
+_TOKEN = re.compile(r"'([^']*)'|([{,]\s*)(-?\d+)(?=\s*:)")
+
+_INT_KEY = re.compile(r"[{,]\s*-?\d+\s*:")
+
+# JSON string (kept as is), or a comma closing a dict or list.
+_TRAILING_COMMA = re.compile(r'("(?:[^"\\]|\\.)*")|,\s*(?=[}\]])')
+
+# Prefix marking JSON keys that were bare integers in the original message.
+_INT_KEY_MARK = '\x00'
+
+_decoder = json.JSONDecoder()
+
+##############################################################################
+
+def _int_keys_hook(_pairs):
+    return {(int(_k[1:]) if _k[:1] == _INT_KEY_MARK else _k): _v for _k, _v in _pairs}
+
+_int_key_decoder = json.JSONDecoder(object_pairs_hook=_int_keys_hook)
+
+def _rewrite_token(_match):
+
+    if _match.group(1) is not None:
+        return json.dumps(_match.group(1))
+
+    return '{}"\\u0000{}"'.format(_match.group(2), _match.group(3))
+
+def _drop_trailing_commas(_json):
+    return _TRAILING_COMMA.sub(lambda _match: _match.group(1) or '', _json)
+
+##############################################################################
+
+def _DWX_ZMQ_DECODE_(_msg):
+
+    """
+    Decode one PULL response into a dict. Raises ValueError if the message
+    is not in the EA's response format.
+    """
+    _int_keys = _INT_KEY.search(_msg) is not None
+
+    if not _int_keys and '"' not in _msg and '\\' not in _msg:
+        _json = _msg.replace("'", '"')
+    else:
+        _json = _TOKEN.sub(_rewrite_token, _msg)
+
+    _json_decoder = _int_key_decoder if _int_keys else _decoder
+
+    try:
+        return _json_decoder.decode(_json)
+
+    except ValueError:
+        return _json_decoder.decode(_drop_trailing_commas(_json))
+
+##############################################################################
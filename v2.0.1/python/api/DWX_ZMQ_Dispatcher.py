@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+    DWX_ZMQ_Dispatcher.py
+    --
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from threading import Lock
+from zlib import crc32
+
+##############################################################################
+
+class DWX_ZMQ_Handler_Stats():
+
+    """
+    Backlog and counters of one handler run by DWX_ZMQ_Dispatcher.
+    """
+    def __init__(self, _name):
+
+        self._name = _name
+        self._submitted = 0
+        self._completed = 0
+        self._dropped = 0
+        self._errors = 0
+        self._max_depth = 0
+
+    def _depth_(self):
+
+        # Items queued or running
+        return self._submitted - self._completed
+
+    def _to_dict_(self):
+
+        return {'submitted': self._submitted,
+                'completed': self._completed,
+                'dropped': self._dropped,
+                'errors': self._errors,
+                'depth': self._depth_(),
+                'max_depth': self._max_depth}
+
+##############################################################################
+
+class DWX_ZMQ_Dispatcher():
+
+    """
+    Runs data handlers off the poll thread.
+
+    Work is spread over _workers lanes, each a single-worker executor
+    (a thread, or a process if _mode='process'). All items of one topic for
+    one handler go to the same lane, so every handler sees a topic's items
+    in the order they were received, while different topics and handlers
+    run in parallel.
+
+    Each handler may have at most _queue_size items queued or running.
+    Beyond that, new items for it are dropped (and counted) rather than
+    letting a slow handler hold up the poll thread or grow memory.
+
+    In 'process' mode, handlers and items must be picklable (e.g.
+    module-level functions) and run in the worker processes.
+    """
+    def __init__(self, _mode='thread', _workers=4, _queue_size=10000):
+
+        if _mode not in ('thread', 'process'):
+            raise ValueError("_mode must be 'thread' or 'process'")
+
+        _executor = ThreadPoolExecutor if _mode == 'thread' else ProcessPoolExecutor
+
+        self._mode = _mode
+        self._queue_size = _queue_size
+        self._lanes = [_executor(max_workers=1) for _ in range(_workers)]
+
+        # {HANDLER: DWX_ZMQ_Handler_Stats}. Bound methods of the same object
+        # compare (and hash) equal, so obj.onSubData maps to one entry.
+        self._stats = {}
+        self._lock = Lock()
+
+        # {(HANDLER_NAME, TOPIC): LANE}
+        self._topic_lanes = {}
+
+    ##########################################################################
+
+    def _lane_(self, _name, _topic):
+
+        _key = (_name, _topic)
+        _lane = self._topic_lanes.get(_key)
+
+        if _lane is None:
+            # Stable across runs, unlike hash() of a str
+            _lane = self._topic_lanes[_key] = self._lanes[
+                crc32('{}|{}'.format(_name, _topic).encode()) % len(self._lanes)]
+
+        return _lane
+
+    ##########################################################################
+
+    def _submit_(self, _handler, _topic, _item):
+
+        """
+        Queue _handler(_item) on _topic's lane. Returns False if dropped.
+        """
+        with self._lock:
+
+            _stats = self._stats.get(_handler)
+
+            if _stats is None:
+                _stats = self._stats[_handler] = DWX_ZMQ_Handler_Stats(
+                    getattr(_handler, '__qualname__', repr(_handler)))
+
+            if _stats._depth_() >= self._queue_size:
+                _stats._dropped += 1
+                return False
+
+            _stats._submitted += 1
+            _stats._max_depth = max(_stats._max_depth, _stats._depth_())
+
+        try:
+            _future = self._lane_(_stats._name, _topic).submit(_handler, _item)
+
+        except RuntimeError:
+            # Shut down: nothing will run it
+            with self._lock:
+                _stats._submitted -= 1
+                _stats._dropped += 1
+            return False
+
+        _future.add_done_callback(lambda _f: self._done_(_stats, _f))
+
+        return True
+
+    ##########################################################################
+
+    def _done_(self, _stats, _future):
+
+        with self._lock:
+            _stats._completed += 1
+
+        if _future.cancelled():
+            return
+
+        ex = _future.exception()
+
+        if ex is not None:
+
+            with self._lock:
+                _stats._errors += 1
+
+            _exstr = "Exception Type {0}. Args:\n{1!r}"
+            _msg = _exstr.format(type(ex).__name__, ex.args)
+            print(_msg)
+
+    ##########################################################################
+
+    """
+    Function to get per-handler stats:
+    {HANDLER_NAME: {'submitted', 'completed', 'dropped', 'errors', 'depth', 'max_depth'}}
+    """
+    def _get_stats_(self):
+
+        with self._lock:
+            _stats = {}
+
+            for _s in self._stats.values():
+                _name = _s._name
+
+                # Different handlers may share a name (e.g. two instances)
+                while _name in _stats:
+                    _name += "'"
+
+                _stats[_name] = _s._to_dict_()
+
+            return _stats
+
+    ##########################################################################
+
+    def _shutdown_(self, _cancel=True):
+
+        # Wait for running handlers; queued ones are dropped if _cancel
+        for _lane in self._lanes:
+            _lane.shutdown(wait=True, cancel_futures=_cancel)
+
+##############################################################################
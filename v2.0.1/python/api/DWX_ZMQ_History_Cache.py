@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+    DWX_ZMQ_History_Cache.py
+    --
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+import json
+import os
+
+import numpy as np
+from pandas import DataFrame, Timestamp, to_datetime
+
+try:
+    from api.DWX_ZMQ_Bar_Store import BAR_DTYPE, _timeframe_text_, _to_seconds_
+except ImportError:
+    from DWX_ZMQ_Bar_Store import BAR_DTYPE, _timeframe_text_, _to_seconds_
+
+##############################################################################
+
+class DWX_ZMQ_History_Cache():
+
+    """
+    On-disk cache of HIST bars per symbol and timeframe.
+
+    Each instrument is a folder of one .npy file per BAR_DTYPE column (e.g.
+    <_cache_dir>/EURUSD_M1/close.npy), loaded memory-mapped, plus meta.json
+    with the contiguous range of MetaTrader server time already downloaded.
+
+    _get_history_() serves requests from the cache and only sends HIST
+    requests for the missing head and/or tail of the range, then merges
+    them in. Times are MetaTrader server time, in seconds since epoch.
+
+    Usage:
+
+        _cache = DWX_ZMQ_History_Cache(_zmq, _cache_dir='dwx_history')
+        _df = _cache._get_history_('EURUSD', 'M1', '2018.01.01', '2019.01.01')
+    """
+    def __init__(self, _zmq, _cache_dir='dwx_history', _timeout=60,
+                 _chunk_bars=10000, _max_in_flight=4):
+
+        # DWX_ZeroMQ_Connector used to download missing bars
+        self._zmq = _zmq
+
+        self._cache_dir = _cache_dir
+        self._timeout = _timeout
+
+        # Missing ranges are downloaded in chunks, see
+        # DWX_ZeroMQ_Connector._DWX_MTX_SEND_HIST_REQUEST_CHUNKED_()
+        self._chunk_bars = _chunk_bars
+        self._max_in_flight = _max_in_flight
+
+        os.makedirs(self._cache_dir, exist_ok=True)
+
+    ##########################################################################
+
+    def _path_(self, _symbol, _timeframe, _name=''):
+        return os.path.join(self._cache_dir, _symbol + '_' + _timeframe, _name)
+
+    ##########################################################################
+
+    """
+    Function to read a cached instrument: ({COLUMN: memmap}, META) or (None, None)
+    """
+    def _load_(self, _symbol, _timeframe):
+
+        try:
+            with open(self._path_(_symbol, _timeframe, 'meta.json')) as _f:
+                _meta = json.load(_f)
+
+            _columns = {_name: np.load(self._path_(_symbol, _timeframe, _name + '.npy'),
+                                       mmap_mode='r')
+                        for _name in BAR_DTYPE.names}
+
+        except (OSError, ValueError):
+            return None, None
+
+        # Columns written by an interrupted _save_() don't match meta.json
+        if any(len(_column) != _meta['bars'] for _column in _columns.values()):
+            return None, None
+
+        return _columns, _meta
+
+    ##########################################################################
+
+    def _save_(self, _symbol, _timeframe, _bars, _start, _end):
+
+        _dir = self._path_(_symbol, _timeframe)
+        os.makedirs(_dir, exist_ok=True)
+
+        # Write each file next to its target, then swap it in. meta.json goes
+        # last, so readers never see a range the columns don't hold.
+        for _name in BAR_DTYPE.names:
+            _tmp = self._path_(_symbol, _timeframe, _name + '.tmp.npy')
+            np.save(_tmp, np.ascontiguousarray(_bars[_name]))
+            os.replace(_tmp, self._path_(_symbol, _timeframe, _name + '.npy'))
+
+        _tmp = self._path_(_symbol, _timeframe, 'meta.json.tmp')
+
+        with open(_tmp, 'w') as _f:
+            json.dump({'symbol': _symbol, 'timeframe': _timeframe,
+                       'start': int(_start), 'end': int(_end),
+                       'bars': len(_bars)}, _f)
+
+        os.replace(_tmp, self._path_(_symbol, _timeframe, 'meta.json'))
+
+    ##########################################################################
+
+    def _fetch_(self, _symbol, _timeframe, _start, _end):
+
+        # (BAR_DTYPE array, possibly empty, [(START, END)] of chunks that
+        # still had no data after retrying). Raises TimeoutError if
+        # MetaTrader doesn't answer.
+        _gaps = []
+
+        _bars = self._zmq._DWX_MTX_SEND_HIST_REQUEST_CHUNKED_(
+            _symbol=_symbol,
+            _timeframe=_timeframe,
+            _start=_start,
+            _end=_end,
+            _chunk_bars=self._chunk_bars,
+            _max_in_flight=self._max_in_flight,
+            _timeout=self._timeout,
+            _gaps=_gaps)
+
+        return _bars, _gaps
+
+    ##########################################################################
+
+    """
+    Function to return bars for _symbol / _timeframe between _start and _end
+    (MetaTrader datetime strings, Timestamps or seconds since epoch), fetching
+    only what is not cached yet. Returns a DataFrame, or the BAR_DTYPE array
+    if _as_array=True.
+    """
+    def _get_history_(self, _symbol='EURUSD', _timeframe='M1',
+                      _start='2020.01.01 00:00:00',
+                      _end=None,
+                      _as_array=False):
+
+        _timeframe = _timeframe_text_(_timeframe)
+        _start = _to_seconds_(_start)
+        _end = _to_seconds_(Timestamp.now() if _end is None else _end)
+
+        _columns, _meta = self._load_(_symbol, _timeframe)
+
+        _head, _head_gaps = np.zeros(0, dtype=BAR_DTYPE), []
+        _tail, _tail_gaps = np.zeros(0, dtype=BAR_DTYPE), []
+
+        if _meta is None:
+            _tail, _tail_gaps = self._fetch_(_symbol, _timeframe, _start, _end)
+
+        else:
+            # Missing head, up to the first cached bar
+            if _start < _meta['start']:
+                _head, _head_gaps = self._fetch_(_symbol, _timeframe, _start, _meta['start'])
+
+            # Missing tail, re-fetching the last cached bar in case it was
+            # still forming when it was downloaded
+            if _end > _meta['end']:
+                _tail, _tail_gaps = self._fetch_(_symbol, _timeframe, _meta['end'], _end)
+
+        # Nothing received: leave the cache as it was (MetaTrader often
+        # returns no data while it is still loading a symbol's history).
+        if len(_head) + len(_tail) > 0:
+
+            _cached = np.zeros(0, dtype=BAR_DTYPE) if _columns is None else _to_bars_(_columns)
+
+            # _save_() replaces the mapped files, which Windows refuses while
+            # they are mapped: _cached is a copy, so let go of the memmaps
+            _columns = None
+
+            # New bars first, so they win where times clash
+            _all = np.concatenate([_tail, _head, _cached])
+            _times, _index = np.unique(_all['time'], return_index=True)
+            _bars = _all[_index]
+
+            # The range covered only grows by the bars received next to it,
+            # up to the first chunk without data, so empty parts and gaps are
+            # asked for again next time. A head fetched without gaps covers
+            # the requested _start, even if there are no bars there (closed
+            # market, or before the symbol's history). The range ends at the
+            # last bar received, so the next request also refreshes it.
+            if _meta is None:
+                _first = int(_tail['time'][0])
+                _kept = _until_gap_(_tail['time'], [_gap for _gap in _tail_gaps if _gap[0] > _first])
+                _new_start = _start if len(_tail_gaps) == 0 else _first
+                _new_end = int(_kept[-1])
+            else:
+                if len(_head_gaps) == 0:
+                    _new_start = min(_meta['start'], _start)
+                else:
+                    _kept = _after_gap_(_head['time'], _head_gaps)
+                    _new_start = min(_meta['start'], int(_kept[0])) if len(_kept) > 0 else _meta['start']
+
+                _kept = _until_gap_(_tail['time'], _tail_gaps)
+                _new_end = max(_meta['end'], int(_kept[-1])) if len(_kept) > 0 else _meta['end']
+
+            self._save_(_symbol, _timeframe, _bars, _new_start, _new_end)
+            _columns, _meta = self._load_(_symbol, _timeframe)
+
+        if _columns is None:
+            _bars = np.zeros(0, dtype=BAR_DTYPE)
+        else:
+            _i = int(np.searchsorted(_columns['time'], _start, side='left'))
+            _j = int(np.searchsorted(_columns['time'], _end, side='right'))
+            _bars = _to_bars_({_name: _column[_i:_j] for _name, _column in _columns.items()})
+
+        if _as_array:
+            return _bars
+
+        _df = DataFrame({_name: _bars[_name] for _name in BAR_DTYPE.names[1:]},
+                        index=to_datetime(_bars['time'], unit='s'))
+        _df.index.name = 'time'
+
+        return _df
+
+    ##########################################################################
+
+    """
+    Function to return the cached range of _symbol / _timeframe as
+    (START, END) Timestamps, or None
+    """
+    def _get_coverage_(self, _symbol, _timeframe):
+
+        _columns, _meta = self._load_(_symbol, _timeframe_text_(_timeframe))
+
+        if _meta is None:
+            return None
+
+        return to_datetime(_meta['start'], unit='s'), to_datetime(_meta['end'], unit='s')
+
+##############################################################################
+
+def _after_gap_(_times, _gaps):
+
+    # Times after the last gap, all if there is none
+    if len(_gaps) == 0:
+        return _times
+
+    return _times[_times > max(_end for _, _end in _gaps)]
+
+def _until_gap_(_times, _gaps):
+
+    # Times before the first gap, all if there is none
+    if len(_gaps) == 0:
+        return _times
+
+    return _times[_times < min(_start for _start, _ in _gaps)]
+
+def _to_bars_(_columns):
+
+    _bars = np.zeros(len(_columns['time']), dtype=BAR_DTYPE)
+
+    for _name in BAR_DTYPE.names:
+        _bars[_name] = _columns[_name]
+
+    return _bars
+
+##############################################################################
@@ -0,0 +1,421 @@
+# -*- coding: utf-8 -*-
+"""
+    DWX_ZMQ_Journal.py
+    --
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+"""
+Append-only journal of everything a connector received: SUB ticks and bars
+and PULL responses, each stamped with its receive time in ns.
+
+A journal file is a 16 byte header (b'DWXJ', version, creation time) and
+length-prefixed records, each starting with:
+
+    length    uint32    record size in bytes, header included
+    kind      uint16    JOURNAL_TOPIC, JOURNAL_TICK, JOURNAL_BAR or JOURNAL_RESPONSE
+    topic     uint16    topic id (1, 2, ...) of ticks and bars, 0 for responses
+    recv_ns   int64     local receive time, ns since epoch
+
+followed by bid, ask (ticks, 32 bytes in all), the bar fields (80 bytes),
+the response text (UTF-8) or, for JOURNAL_TOPIC, the name given to a new
+topic id. Topic ids are defined in each file before their first use, so
+every file reads on its own. A record cut short by a crash is ignored.
+"""
+
+import os
+import struct
+
+import numpy as np
+from datetime import datetime, timezone
+from time import time_ns
+
+try:
+    from api.DWX_ZMQ_Topic_Router import DWX_ZMQ_Tick, DWX_ZMQ_Bar
+except ImportError:
+    from DWX_ZMQ_Topic_Router import DWX_ZMQ_Tick, DWX_ZMQ_Bar
+
+##############################################################################
+
+JOURNAL_TOPIC = 0
+JOURNAL_TICK = 1
+JOURNAL_BAR = 2
+JOURNAL_RESPONSE = 3
+
+_MAGIC = b'DWXJ'
+_VERSION = 1
+
+_FILE_HEADER = struct.Struct('<4sHHq')
+_HEADER = struct.Struct('<IHHq')
+_TICK = struct.Struct('<IHHqdd')
+_BAR = struct.Struct('<IHHqqddddqiiq')
+
+_HEADER_FIELDS = [('length', '<u4'), ('kind', '<u2'), ('topic', '<u2'), ('recv_ns', '<i8')]
+
+JOURNAL_TICK_DTYPE = np.dtype(_HEADER_FIELDS + [('bid', '<f8'), ('ask', '<f8')])
+
+JOURNAL_BAR_DTYPE = np.dtype(_HEADER_FIELDS + [('time', '<i8'), ('open', '<f8'), ('high', '<f8'),
+                                               ('low', '<f8'), ('close', '<f8'),
+                                               ('tick_volume', '<i8'), ('spread', '<i4'),
+                                               ('reserved', '<i4'), ('real_volume', '<i8')])
+
+assert JOURNAL_TICK_DTYPE.itemsize == _TICK.size == 32
+assert JOURNAL_BAR_DTYPE.itemsize == _BAR.size == 80
+
+_NS_PER_DAY = 86400 * 10**9
+
+##############################################################################
+
+class DWX_ZMQ_Journal_Writer():
+
+    """
+    Writes a journal into _directory as _prefix-YYYYMMDD-NNNN.dwxj files,
+    starting a new file when one reaches _max_bytes or, if _daily, when the
+    UTC day of the receive time changes. Existing files are never
+    overwritten.
+
+    Attach it with DWX_ZeroMQ_Connector(_journal=...), which writes from its
+    poll thread only (the writer is not thread-safe) and closes it on
+    shutdown. Writes go through a _buffer_size buffer: _flush_() to make
+    them visible to readers sooner.
+    """
+    def __init__(self, _directory, _prefix='dwx-journal', _max_bytes=1 << 30,
+                 _daily=True, _buffer_size=1 << 20):
+
+        self._directory = _directory
+        self._prefix = _prefix
+        self._max_bytes = _max_bytes
+        self._daily = _daily
+        self._buffer_size = _buffer_size
+
+        os.makedirs(_directory, exist_ok=True)
+
+        self._file = None
+        self._path = None
+        self._size = 0
+        self._day = None
+
+        # {TOPIC: ID} of the current file
+        self._topic_ids = {}
+
+        self._stats = {'files': 0, 'records': 0, 'bytes': 0}
+
+    ##########################################################################
+
+    def _open_(self, _recv_ns):
+
+        self._close_file_()
+
+        self._day = _recv_ns // _NS_PER_DAY
+        _date = datetime.fromtimestamp(_recv_ns / 1e9, timezone.utc).strftime('%Y%m%d')
+
+        _number = 0
+        while True:
+            _path = os.path.join(self._directory, '{}-{}-{:04d}.dwxj'.format(self._prefix, _date, _number))
+            if not os.path.exists(_path):
+                break
+            _number += 1
+
+        self._file = open(_path, 'xb', buffering=self._buffer_size)
+        self._path = _path
+        self._topic_ids = {}
+
+        self._file.write(_FILE_HEADER.pack(_MAGIC, _VERSION, 0, time_ns()))
+        self._size = _FILE_HEADER.size
+        self._stats['files'] += 1
+
+    def _file_for_(self, _recv_ns, _length):
+
+        # Roll over before a record that would cross the size or day limit
+        if (self._file is None
+                or (self._daily and _recv_ns // _NS_PER_DAY != self._day)
+                or self._size + _length > self._max_bytes):
+            self._open_(_recv_ns)
+
+        return self._file
+
+    def _append_(self, _record):
+
+        self._file.write(_record)
+        self._size += len(_record)
+        self._stats['records'] += 1
+        self._stats['bytes'] += len(_record)
+
+    ##########################################################################
+
+    def _topic_id_(self, _topic, _recv_ns):
+
+        _id = self._topic_ids.get(_topic)
+
+        if _id is None:
+            _id = self._topic_ids[_topic] = len(self._topic_ids) + 1
+            _name = _topic.encode()
+            self._append_(_HEADER.pack(_HEADER.size + len(_name), JOURNAL_TOPIC, _id, _recv_ns) + _name)
+
+        return _id
+
+    ##########################################################################
+
+    def _write_tick_(self, _topic, _recv_ns, _bid, _ask):
+
+        # Room for a topic definition as well, so both land in the same file
+        self._file_for_(_recv_ns, _TICK.size + 64)
+        self._append_(_TICK.pack(_TICK.size, JOURNAL_TICK, self._topic_id_(_topic, _recv_ns),
+                                 _recv_ns, _bid, _ask))
+
+    def _write_bar_(self, _bar, _recv_ns):
+
+        self._file_for_(_recv_ns, _BAR.size + 64)
+        self._append_(_BAR.pack(_BAR.size, JOURNAL_BAR, self._topic_id_(_bar.instrument, _recv_ns),
+                                _recv_ns, _bar.time, _bar.open, _bar.high, _bar.low, _bar.close,
+                                _bar.tick_volume, _bar.spread, 0, _bar.real_volume))
+
+    def _write_item_(self, _item, _recv_ns=None):
+
+        # Ticks carry their receive time; bars are stamped now
+        if type(_item) is DWX_ZMQ_Tick:
+            self._write_tick_(_item.symbol, _item.time, _item.bid, _item.ask)
+
+        elif type(_item) is DWX_ZMQ_Bar:
+            self._write_bar_(_item, time_ns() if _recv_ns is None else _recv_ns)
+
+    def _write_response_(self, _msg, _recv_ns=None):
+
+        _recv_ns = time_ns() if _recv_ns is None else _recv_ns
+        _text = _msg.encode() if isinstance(_msg, str) else bytes(_msg)
+
+        self._file_for_(_recv_ns, _HEADER.size + len(_text))
+        self._append_(_HEADER.pack(_HEADER.size + len(_text), JOURNAL_RESPONSE, 0, _recv_ns) + _text)
+
+    ##########################################################################
+
+    def _flush_(self):
+
+        if self._file is not None:
+            self._file.flush()
+
+    def _close_file_(self):
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _close_(self):
+        self._close_file_()
+
+    """
+    {'files', 'records', 'bytes'} written, and the current file's 'path'
+    """
+    def _get_stats_(self):
+        return dict(self._stats, path=self._path)
+
+##############################################################################
+
+class DWX_ZMQ_Journal_Reader():
+
+    """
+    Memory-maps one journal file and indexes it in a single pass. Runs of
+    consecutive tick (or bar) records are read in place as
+    JOURNAL_TICK_DTYPE (JOURNAL_BAR_DTYPE) arrays, without copying.
+
+    _topics maps topic ids to names, e.g. names = np.array(reader._topics)
+    then names[ticks['topic']].
+    """
+    def __init__(self, _path):
+
+        self._path = _path
+        self._map = np.memmap(_path, dtype=np.uint8, mode='r')
+
+        if len(self._map) < _FILE_HEADER.size:
+            raise ValueError('{} is not a DWX journal'.format(_path))
+
+        _magic, _version, _reserved, self._created_ns = _FILE_HEADER.unpack_from(self._map, 0)
+
+        if _magic != _MAGIC or _version != _VERSION:
+            raise ValueError('{} is not a version {} DWX journal'.format(_path, _VERSION))
+
+        # Id -> name (id 0: no topic)
+        self._topics = ['']
+
+        # [(KIND, OFFSET, COUNT)] in file order
+        self._runs = []
+
+        self._records = 0
+        self._truncated = 0     # bytes of an incomplete last record
+
+        self._index_()
+
+    ##########################################################################
+
+    def _index_(self):
+
+        _buf = self._map
+        _end = len(_buf)
+        _offset = _FILE_HEADER.size
+        _unpack = _HEADER.unpack_from
+
+        while _offset + _HEADER.size <= _end:
+
+            _length, _kind, _topic, _recv_ns = _unpack(_buf, _offset)
+
+            if _length < _HEADER.size or _offset + _length > _end:
+                break
+
+            if _kind == JOURNAL_TICK or _kind == JOURNAL_BAR:
+                _count = self._run_length_(_kind, _offset, _end)
+                self._runs.append((_kind, _offset, _count))
+
+                _offset += _count * _length
+                self._records += _count
+                continue
+
+            if _kind == JOURNAL_RESPONSE:
+                self._runs.append((JOURNAL_RESPONSE, _offset, 1))
+
+            elif _kind == JOURNAL_TOPIC:
+                self._topics.extend([''] * (_topic + 1 - len(self._topics)))
+                self._topics[_topic] = bytes(_buf[_offset + _HEADER.size:_offset + _length]).decode()
+
+            _offset += _length
+            self._records += 1
+
+        self._truncated = _end - _offset
+
+    def _run_length_(self, _kind, _offset, _end):
+
+        # Consecutive _kind records from _offset, checked in growing blocks
+        # with NumPy rather than one by one
+        _dtype = JOURNAL_TICK_DTYPE if _kind == JOURNAL_TICK else JOURNAL_BAR_DTYPE
+        _size = _dtype.itemsize
+        _available = (_end - _offset) // _size
+        _count = 0
+        _block = 64
+
+        while _count < _available:
+
+            _n = min(_block, _available - _count)
+            _records = np.ndarray(_n, dtype=_dtype, buffer=self._map, offset=_offset + _count * _size)
+            _other = np.flatnonzero((_records['length'] != _size) | (_records['kind'] != _kind))
+
+            if len(_other) > 0:
+                return _count + int(_other[0])
+
+            _count += _n
+            _block = min(_block * 4, 1 << 16)
+
+        return _count
+
+    ##########################################################################
+
+    def _run_array_(self, _kind, _offset, _count):
+
+        _dtype = JOURNAL_TICK_DTYPE if _kind == JOURNAL_TICK else JOURNAL_BAR_DTYPE
+
+        return np.ndarray(_count, dtype=_dtype, buffer=self._map, offset=_offset)
+
+    def _response_(self, _offset):
+
+        _length, _kind, _topic, _recv_ns = _HEADER.unpack_from(self._map, _offset)
+
+        return _recv_ns, bytes(self._map[_offset + _HEADER.size:_offset + _length]).decode()
+
+    ##########################################################################
+
+    def _batches_(self, _size=65536):
+
+        """
+        Iterate the journal in file order, about _size records at a time:
+        {'ticks': JOURNAL_TICK_DTYPE array, 'bars': JOURNAL_BAR_DTYPE array,
+        'responses': [(RECV_NS, TEXT)]}. Runs longer than _size are split.
+        """
+        _empty = {JOURNAL_TICK: np.empty(0, JOURNAL_TICK_DTYPE),
+                  JOURNAL_BAR: np.empty(0, JOURNAL_BAR_DTYPE)}
+
+        _batch = {JOURNAL_TICK: [], JOURNAL_BAR: [], JOURNAL_RESPONSE: []}
+        _count = 0
+
+        for _kind, _offset, _run_count in self._runs:
+
+            if _kind == JOURNAL_RESPONSE:
+                _batch[_kind].append(self._response_(_offset))
+                _count += 1
+
+            else:
+                _array = self._run_array_(_kind, _offset, _run_count)
+
+                while len(_array) > 0:
+                    _take = min(len(_array), _size - _count)
+                    _batch[_kind].append(_array[:_take])
+                    _array = _array[_take:]
+                    _count += _take
+
+                    if _count >= _size and len(_array) > 0:
+                        yield self._batch_dict_(_batch, _empty)
+                        _batch = {JOURNAL_TICK: [], JOURNAL_BAR: [], JOURNAL_RESPONSE: []}
+                        _count = 0
+
+            if _count >= _size:
+                yield self._batch_dict_(_batch, _empty)
+                _batch = {JOURNAL_TICK: [], JOURNAL_BAR: [], JOURNAL_RESPONSE: []}
+                _count = 0
+
+        if _count > 0:
+            yield self._batch_dict_(_batch, _empty)
+
+    def _batch_dict_(self, _batch, _empty):
+
+        # A single run stays a view into the file
+        def _join(_kind):
+            _arrays = _batch[_kind]
+            if len(_arrays) == 0:
+                return _empty[_kind]
+            return _arrays[0] if len(_arrays) == 1 else np.concatenate(_arrays)
+
+        return {'ticks': _join(JOURNAL_TICK),
+                'bars': _join(JOURNAL_BAR),
+                'responses': _batch[JOURNAL_RESPONSE]}
+
+    ##########################################################################
+
+    def _ticks_(self):
+
+        _runs = [self._run_array_(*_run) for _run in self._runs if _run[0] == JOURNAL_TICK]
+
+        return np.concatenate(_runs) if len(_runs) > 0 else np.empty(0, JOURNAL_TICK_DTYPE)
+
+    def _bars_(self):
+
+        _runs = [self._run_array_(*_run) for _run in self._runs if _run[0] == JOURNAL_BAR]
+
+        return np.concatenate(_runs) if len(_runs) > 0 else np.empty(0, JOURNAL_BAR_DTYPE)
+
+    def _responses_(self):
+        return [self._response_(_offset) for _kind, _offset, _count in self._runs
+                if _kind == JOURNAL_RESPONSE]
+
+    def __len__(self):
+        return self._records
+
+    def _close_(self):
+
+        # Arrays handed out keep the mapping alive until they are released
+        self._map = None
+        self._runs = []
+
+##############################################################################
+
+def _DWX_ZMQ_JOURNAL_FILES_(_directory, _prefix='dwx-journal'):
+
+    # Journal files of one writer, oldest first (names sort by date, number)
+    return sorted(os.path.join(_directory, _name) for _name in os.listdir(_directory)
+                  if _name.startswith(_prefix + '-') and _name.endswith('.dwxj'))
+
+##############################################################################
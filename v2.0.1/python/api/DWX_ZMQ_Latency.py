@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+    DWX_ZMQ_Latency.py
+    --
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+##############################################################################
+
+class DWX_ZMQ_Latency_Histogram():
+
+    """
+    HDR-style histogram of durations in microseconds: constant memory and
+    O(1) recording, with every value kept to _digits significant digits
+    (2 -> within 1%) from 1us up to _highest us (1 hour by default, larger
+    values are counted as _highest).
+
+    Buckets are log-linear: values below 2 * 10^_digits (rounded up to a
+    power of two) are counted exactly, and each doubling above that is split
+    into as many equal sub-buckets.
+    """
+    def __init__(self, _digits=2, _highest=3600 * 10**6):
+
+        # Sub-buckets per doubling, enough for _digits significant digits
+        self._sub_bits = (2 * 10**_digits - 1).bit_length()
+        self._half = 1 << (self._sub_bits - 1)
+        self._highest = int(_highest)
+
+        self._counts = [0] * (self._index_(self._highest) + 1)
+        self._count = 0
+        self._total = 0
+        self._min = self._highest
+        self._max = 0
+
+    ##########################################################################
+
+    def _index_(self, _value):
+
+        _shift = _value.bit_length() - self._sub_bits
+
+        if _shift <= 0:
+            return _value
+
+        return _shift * self._half + (_value >> _shift)
+
+    def _highest_equivalent_(self, _index):
+
+        # Largest value counted in bucket _index
+        if _index < 2 * self._half:
+            return _index
+
+        _shift = (_index - 2 * self._half) // self._half + 1
+
+        return ((_index - _shift * self._half + 1) << _shift) - 1
+
+    ##########################################################################
+
+    def _record_(self, _us):
+
+        # Called per tick: kept to a few int operations
+        _us = int(_us)
+
+        if _us > self._max:
+            if _us > self._highest:
+                _us = self._highest
+            self._max = _us
+
+        if _us < self._min:
+            if _us < 0:
+                _us = 0
+            self._min = _us
+
+        _shift = _us.bit_length() - self._sub_bits
+
+        if _shift <= 0:
+            self._counts[_us] += 1
+        else:
+            self._counts[_shift * self._half + (_us >> _shift)] += 1
+
+        self._count += 1
+        self._total += _us
+
+    def _add_(self, _other):
+
+        # Merge _other (same _digits and _highest) into this one
+        for _index, _n in enumerate(_other._counts):
+            if _n > 0:
+                self._counts[_index] += _n
+
+        self._count += _other._count
+        self._total += _other._total
+        self._max = max(self._max, _other._max)
+        self._min = min(self._min, _other._min)
+
+    ##########################################################################
+
+    def _percentiles_(self, _percentiles):
+
+        """
+        Values (us) at each of _percentiles (0-100, ascending), as the
+        highest value of the bucket reaching that rank, capped at max.
+        """
+        _values = []
+        _seen = 0
+        _index = -1
+
+        for _p in _percentiles:
+
+            _rank = max(1, -(-self._count * _p // 100))
+
+            while _seen < _rank and _index < len(self._counts) - 1:
+                _index += 1
+                _seen += self._counts[_index]
+
+            _values.append(min(self._highest_equivalent_(_index), self._max))
+
+        return _values
+
+    ##########################################################################
+
+    """
+    Summary in milliseconds: {'count', 'min', 'mean', 'p50', 'p90', 'p99',
+    'p99.9', 'max'} (just {'count': 0} if empty)
+    """
+    def _summary_(self):
+
+        if self._count == 0:
+            return {'count': 0}
+
+        _p50, _p90, _p99, _p999 = self._percentiles_((50, 90, 99, 99.9))
+
+        return {'count': self._count,
+                'min': self._min / 1000,
+                'mean': self._total / self._count / 1000,
+                'p50': _p50 / 1000,
+                'p90': _p90 / 1000,
+                'p99': _p99 / 1000,
+                'p99.9': _p999 / 1000,
+                'max': self._max / 1000}
+
+##############################################################################
+
+class DWX_ZMQ_Latency_Recorder():
+
+    """
+    Latency histograms of one connector, all recorded on its poll thread:
+
+        commands        per command action (OPEN, MODIFY, HIST, ...): from
+                        the PUSH send to the matching PULL response arriving
+        tick_age        per symbol: tick arrival minus its server time.
+                        Only binary ticks carry a server time, and MT4's is
+                        whole seconds, so ages are up to 1s high. Server
+                        time is broker time: _server_offset (seconds ahead
+                        of UTC) is estimated from the first tick to the
+                        nearest 15 minutes if None.
+        tick_handling   per symbol: from tick arrival to its stores and
+                        handlers being done (handed off, with a dispatcher)
+    """
+    def __init__(self, _digits=2, _server_offset=None):
+
+        self._digits = _digits
+        self._server_offset = _server_offset
+
+        self._commands = {}         # {ACTION: DWX_ZMQ_Latency_Histogram}
+        self._tick_age = {}         # {SYMBOL: DWX_ZMQ_Latency_Histogram}
+        self._tick_handling = {}    # {SYMBOL: DWX_ZMQ_Latency_Histogram}
+
+    ##########################################################################
+
+    def _histogram_(self, _histograms, _key):
+
+        _histogram = _histograms[_key] = DWX_ZMQ_Latency_Histogram(self._digits)
+
+        return _histogram
+
+    def _record_command_(self, _action, _seconds):
+
+        _histogram = self._commands.get(_action) or self._histogram_(self._commands, _action)
+        _histogram._record_(_seconds * 1e6)
+
+    def _record_tick_age_(self, _symbol, _server_ms, _arrival_ns):
+
+        if self._server_offset is None:
+            self._server_offset = round((_server_ms / 1000 - _arrival_ns / 1e9) / 900) * 900
+
+        _histogram = self._tick_age.get(_symbol) or self._histogram_(self._tick_age, _symbol)
+        _histogram._record_(_arrival_ns // 1000 - (_server_ms - self._server_offset * 1000) * 1000)
+
+    def _record_tick_handling_(self, _symbol, _nanoseconds):
+
+        _histogram = self._tick_handling.get(_symbol) or self._histogram_(self._tick_handling, _symbol)
+        _histogram._record_(_nanoseconds // 1000)
+
+    ##########################################################################
+
+    """
+    Snapshot of all histograms, in milliseconds (see
+    DWX_ZMQ_Latency_Histogram._summary_): {'commands': {ACTION: SUMMARY},
+    'tick_age': {SYMBOL: SUMMARY}, 'tick_handling': {SYMBOL: SUMMARY},
+    'server_offset': SECONDS}
+    """
+    def _snapshot_(self):
+
+        return {'commands': {_k: _h._summary_() for _k, _h in list(self._commands.items())},
+                'tick_age': {_k: _h._summary_() for _k, _h in list(self._tick_age.items())},
+                'tick_handling': {_k: _h._summary_() for _k, _h in list(self._tick_handling.items())},
+                'server_offset': self._server_offset}
+
+    def _reset_(self):
+
+        # Fresh dicts, so the poll thread never sees one cleared mid-record
+        self._commands = {}
+        self._tick_age = {}
+        self._tick_handling = {}
+
+##############################################################################
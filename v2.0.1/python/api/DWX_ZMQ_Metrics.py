@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+    DWX_ZMQ_Metrics.py
+    --
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from time import perf_counter
+
+try:
+    from api.DWX_ZMQ_Latency import DWX_ZMQ_Latency_Histogram
+except ImportError:
+    from DWX_ZMQ_Latency import DWX_ZMQ_Latency_Histogram
+
+##############################################################################
+
+# Counters kept by the connector, all incremented on its poll thread
+# (push_* on the sending thread)
+COUNTERS = ('pull_messages', 'pull_bytes', 'pull_parse_errors',
+            'sub_messages', 'sub_bytes', 'sub_parse_errors',
+            'push_messages', 'push_bytes', 'push_dropped',
+            'handler_errors', 'poll_iterations')
+
+##############################################################################
+
+class DWX_ZMQ_Metrics():
+
+    """
+    Runtime counters of one connector, plus a histogram of poll-loop
+    iteration time (the work done per poller wakeup, not the wait).
+    Counters only ever grow; rates are derived between snapshots.
+    """
+    def __init__(self):
+
+        self._counts = dict.fromkeys(COUNTERS, 0)
+        self._poll_time = DWX_ZMQ_Latency_Histogram()
+
+        self._started_at = perf_counter()
+
+        # (TIME, COUNTS) the rates of the next snapshot are measured from
+        self._last_sample = (self._started_at, dict(self._counts))
+
+    ##########################################################################
+
+    def _record_poll_(self, _seconds):
+
+        self._counts['poll_iterations'] += 1
+        self._poll_time._record_(_seconds * 1e6)
+
+    ##########################################################################
+
+    def _snapshot_(self, _min_interval=1.0):
+
+        """
+        {'uptime', 'counters', 'rates', 'poll_time'}: rates are per second
+        since the previous snapshot taken at least _min_interval seconds
+        before, so frequent readers (e.g. a scraper and a dashboard) share
+        a meaningful window.
+        """
+        _now = perf_counter()
+        _counts = dict(self._counts)
+        _then, _last = self._last_sample
+
+        _elapsed = _now - _then
+        _rates = {_k: (_counts[_k] - _last[_k]) / _elapsed if _elapsed > 0 else 0.0
+                  for _k in ('pull_messages', 'pull_bytes', 'sub_messages',
+                             'sub_bytes', 'push_messages', 'push_bytes')}
+
+        if _elapsed >= _min_interval:
+            self._last_sample = (_now, _counts)
+
+        return {'uptime': _now - self._started_at,
+                'counters': _counts,
+                'rates': _rates,
+                'poll_time': self._poll_time._summary_()}
+
+##############################################################################
+
+def _prometheus_line_(_lines, _name, _value, _labels):
+
+    _lines.append('{}{{{}}} {}'.format(
+        _name, ','.join('{}="{}"'.format(_k, str(_v).replace('\\', '\\\\').replace('"', '\\"'))
+                        for _k, _v in _labels.items()), _value))
+
+def _DWX_ZMQ_PROMETHEUS_TEXT_(_stats, _client):
+
+    """
+    Render DWX_ZeroMQ_Connector._get_metrics_() in the Prometheus text
+    exposition format, every series labelled client=_client.
+    """
+    _c = _stats['counters']
+    _lines = []
+
+    def _metric(_name, _type, _help, _series):
+        _lines.append('# HELP {} {}'.format(_name, _help))
+        _lines.append('# TYPE {} {}'.format(_name, _type))
+        for _labels, _value in _series:
+            _prometheus_line_(_lines, _name, _value, dict(client=_client, **_labels))
+
+    _metric('dwx_zmq_messages_total', 'counter', 'Messages received (pull, sub) or sent (push)',
+            [({'socket': _s}, _c[_s + '_messages']) for _s in ('pull', 'sub', 'push')])
+    _metric('dwx_zmq_bytes_total', 'counter', 'Message bytes received (pull, sub) or sent (push)',
+            [({'socket': _s}, _c[_s + '_bytes']) for _s in ('pull', 'sub', 'push')])
+    _metric('dwx_zmq_parse_errors_total', 'counter', 'Messages that could not be decoded',
+            [({'socket': _s}, _c[_s + '_parse_errors']) for _s in ('pull', 'sub')])
+    _metric('dwx_zmq_send_dropped_total', 'counter', 'Commands dropped because the PUSH socket was busy',
+            [({}, _c['push_dropped'])])
+    _metric('dwx_zmq_handler_errors_total', 'counter', 'Exceptions raised by data handlers',
+            [({}, _c['handler_errors'])])
+    _metric('dwx_zmq_store_keys', 'gauge', 'Symbols / instruments / accounts held per store',
+            [({'store': _s}, _v['keys']) for _s, _v in _stats['stores'].items()])
+    _metric('dwx_zmq_store_rows', 'gauge', 'Ticks / bars / records held per store',
+            [({'store': _s}, _v['rows']) for _s, _v in _stats['stores'].items()])
+    _metric('dwx_zmq_requests_pending', 'gauge', 'Commands awaiting a response',
+            [({}, _stats['requests_pending'])])
+
+    # Summaries from histograms summarised in ms
+    _quantiles = (('0.5', 'p50'), ('0.9', 'p90'), ('0.99', 'p99'), ('0.999', 'p99.9'))
+
+    def _summary(_name, _help, _by):
+        _lines.append('# HELP {} {}'.format(_name, _help))
+        _lines.append('# TYPE {} summary'.format(_name))
+        for _labels, _s in _by:
+            _labels = dict(client=_client, **_labels)
+            if _s['count'] > 0:
+                for _q, _k in _quantiles:
+                    _prometheus_line_(_lines, _name, _s[_k] / 1000, dict(_labels, quantile=_q))
+            _prometheus_line_(_lines, _name + '_sum', _s['count'] and _s['mean'] * _s['count'] / 1000,
+                              _labels)
+            _prometheus_line_(_lines, _name + '_count', _s['count'], _labels)
+
+    _summary('dwx_zmq_poll_iteration_seconds', 'Work done per poll-loop wakeup',
+             [({}, _stats['poll_time'])])
+
+    if 'commands' in _stats['latency']:
+        _summary('dwx_zmq_command_roundtrip_seconds', 'PUSH send to PULL response, per command',
+                 [({'action': _a}, _s) for _a, _s in _stats['latency']['commands'].items()])
+
+    return '\n'.join(_lines) + '\n'
+
+##############################################################################
+
+class DWX_ZMQ_Metrics_Server():
+
+    """
+    Local HTTP endpoint serving _render() (Prometheus text) at /metrics,
+    from a daemon thread. Binds to 127.0.0.1 unless _host is given.
+    """
+    def __init__(self, _render, _port=9100, _host='127.0.0.1'):
+
+        class _Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+
+                _body = _render().encode()
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(_body)))
+                self.end_headers()
+                self.wfile.write(_body)
+
+            def log_message(self, *_args):
+                pass # one line per scrape would flood the console
+
+        self._server = ThreadingHTTPServer((_host, _port), _Handler)
+        self._server.daemon_threads = True
+
+        self._Server_Thread = Thread(target=self._server.serve_forever, daemon=True)
+        self._Server_Thread.start()
+
+        print("[INIT] Serving metrics on http://{}:{}/metrics".format(_host, self._server.server_port))
+
+    ##########################################################################
+
+    def _shutdown_(self):
+
+        self._server.shutdown()
+        self._server.server_close()
+
+##############################################################################
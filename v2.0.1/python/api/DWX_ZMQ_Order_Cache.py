@@ -0,0 +1,367 @@
+# -*- coding: utf-8 -*-
+"""
+    DWX_ZMQ_Order_Cache.py
+    --
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+from threading import Lock
+from time import perf_counter
+
+##############################################################################
+
+# Fields of an order, as in GET_OPEN_TRADES responses
+_ORDER_FIELDS = ('_magic', '_symbol', '_lots', '_type', '_open_price', '_open_time',
+                 '_SL', '_TP', '_pnl', '_comment')
+
+# Fields compared to count corrections when a snapshot arrives
+_CHECKED_FIELDS = ('_magic', '_symbol', '_lots', '_type', '_open_price', '_SL', '_TP')
+
+##############################################################################
+
+class DWX_ZMQ_Order_Cache():
+
+    """
+    Open orders as last known to the connector, updated from the responses
+    it receives anyway, so they can be queried without asking MetaTrader:
+
+        EXECUTION (OPEN)        adds the order (type, lots and comment come
+                                from the command, the rest from the response)
+        MODIFY                  updates SL / TP
+        CLOSE, CLOSE_PARTIAL    remove it, or reduce its lots (MetaTrader gives
+                                the rest a new ticket, known after a snapshot)
+        CLOSE_ALL(_MAGIC)       remove what was closed
+        BATCH                   each item as above
+        OPEN_TRADES             replaces everything (a snapshot)
+        OPEN_TRADES_DELTA       merges the orders added / changed and the
+                                tickets removed since _version (or replaces
+                                everything if '_full')
+
+    Orders closed on the terminal itself (SL / TP, manually) only go away
+    with the next snapshot or delta; _stale_() tells when one is due. A
+    delta only refreshes '_pnl' of the orders it lists. Orders are
+    {'_magic', '_symbol', '_lots', '_type', '_open_price', '_open_time',
+    '_SL', '_TP', '_pnl', '_comment'} dicts, '_pnl' being NaN until a
+    snapshot reports it.
+    """
+    def __init__(self, _sync_interval=5.0):
+
+        # Seconds after which a snapshot is due (None = never)
+        self._sync_interval = _sync_interval
+
+        self._lock = Lock()
+
+        self._orders = {}       # {TICKET: ORDER}
+        self._by_magic = {}     # {MAGIC: {TICKET, ...}}
+        self._by_symbol = {}    # {SYMBOL: {TICKET, ...}}
+        self._by_comment = {}   # {COMMENT: {TICKET, ...}}
+
+        self._last_snapshot = None
+
+        # Where the EA's GET_OPEN_TRADES_DELTA versions left off (0 = none)
+        self._epoch = 0
+        self._version = 0
+
+        # An order partially closed: its remainder's ticket is unknown
+        self._incomplete = False
+
+        self._stats = {'updates': 0, 'snapshots': 0, 'deltas': 0, 'corrections': 0}
+
+    ##########################################################################
+
+    def _index_(self, _ticket, _order):
+
+        self._by_magic.setdefault(_order['_magic'], set()).add(_ticket)
+        self._by_symbol.setdefault(_order['_symbol'], set()).add(_ticket)
+        self._by_comment.setdefault(_order['_comment'], set()).add(_ticket)
+
+    def _unindex_(self, _ticket, _order):
+
+        for _index, _key in ((self._by_magic, _order['_magic']),
+                             (self._by_symbol, _order['_symbol']),
+                             (self._by_comment, _order['_comment'])):
+            _tickets = _index.get(_key)
+
+            if _tickets is not None:
+                _tickets.discard(_ticket)
+
+                if len(_tickets) == 0:
+                    del _index[_key]
+
+    def _put_(self, _ticket, _order):
+
+        _old = self._orders.get(_ticket)
+
+        if _old is not None:
+            self._unindex_(_ticket, _old)
+
+        self._orders[_ticket] = _order
+        self._index_(_ticket, _order)
+
+    def _remove_(self, _ticket):
+
+        _order = self._orders.pop(_ticket, None)
+
+        if _order is not None:
+            self._unindex_(_ticket, _order)
+
+    ##########################################################################
+
+    """
+    Function to update the cache from a decoded PULL response, _request being
+    the DWX_ZMQ_Request it answers (None if unmatched)
+    """
+    def _apply_(self, _data, _request=None):
+
+        if not isinstance(_data, dict):
+            return
+
+        _action = _data.get('_action')
+        _command = _request._command if _request is not None else None
+
+        with self._lock:
+
+            if _action == 'OPEN_TRADES':
+                self._snapshot_(_data.get('_trades'))
+
+            elif _action == 'OPEN_TRADES_DELTA':
+                self._delta_(_data)
+
+            elif _action in ('CLOSE_ALL', 'CLOSE_ALL_MAGIC'):
+                self._apply_close_all_(_data)
+
+            elif _action == 'BATCH':
+                _commands = _command if isinstance(_command, list) else []
+                _responses = _data.get('_responses', [])
+
+                for _i, _response in enumerate(_responses):
+                    if isinstance(_response, dict):
+                        self._apply_trade_(_response, _commands[_i] if _i < len(_commands) else None)
+
+            elif _action in ('EXECUTION', 'MODIFY', 'CLOSE'):
+                self._apply_trade_(_data, _command)
+
+    ##########################################################################
+
+    def _apply_trade_(self, _data, _command):
+
+        # Caller holds self._lock. _command is the order dict sent, if known.
+        _action = _data.get('_action')
+        _command = _command if isinstance(_command, dict) else {}
+
+        # Single MODIFY responses don't echo the ticket
+        _ticket = _data.get('_ticket', _command.get('_ticket'))
+
+        try:
+            _ticket = int(_ticket)
+        except (TypeError, ValueError):
+            return
+
+        if _action == 'EXECUTION':
+
+            # Rejected, or closed again because SL / TP couldn't be set
+            if '_close_price' in _data:
+                return
+
+            self._put_(_ticket, {'_magic': _data.get('_magic', _command.get('_magic')),
+                                 '_symbol': _data.get('_symbol', _command.get('_symbol')),
+                                 '_lots': float(_command.get('_lots', 0.0)),
+                                 '_type': int(_command.get('_type', 0)),
+                                 '_open_price': _data.get('_open_price'),
+                                 '_open_time': _data.get('_open_time'),
+                                 '_SL': _data.get('_sl', 0.0),
+                                 '_TP': _data.get('_tp', 0.0),
+                                 '_pnl': float('nan'),
+                                 '_comment': _command.get('_comment', '')})
+
+        elif _ticket not in self._orders:
+            return
+
+        elif _data.get('_response') == 'NOT_FOUND':
+            self._remove_(_ticket)
+
+        elif _action == 'MODIFY':
+
+            if '_sl' in _data:
+                _order = self._orders[_ticket]
+                _order['_SL'] = _data['_sl']
+                _order['_TP'] = _data['_tp']
+
+                # Pending orders may move too
+                if _order['_type'] not in (0, 1) and float(_command.get('_price', 0)) != 0.0:
+                    _order['_open_price'] = float(_command['_price'])
+
+        elif _data.get('_response') == 'CLOSE_PENDING':
+            self._remove_(_ticket)
+
+        elif '_close_price' in _data:
+            _order = self._orders[_ticket]
+            _left = round(_order['_lots'] - float(_data.get('_close_lots', _order['_lots'])), 2)
+
+            if _left > 0:
+                _order['_lots'] = _left
+                self._incomplete = True
+            else:
+                self._remove_(_ticket)
+
+        else:
+            return
+
+        self._stats['updates'] += 1
+
+    def _apply_close_all_(self, _data):
+
+        # Caller holds self._lock
+        _responses = _data.get('_responses')
+
+        if not isinstance(_responses, dict):
+            return
+
+        for _ticket, _response in _responses.items():
+            if (isinstance(_response, dict)
+                    and ('_close_price' in _response or _response.get('_response') == 'CLOSE_PENDING')):
+                self._remove_(int(_ticket))
+
+        self._stats['updates'] += 1
+
+    def _snapshot_(self, _trades):
+
+        # Caller holds self._lock
+        if not isinstance(_trades, dict):
+            return
+
+        _new = {int(_ticket): _order_(_trade) for _ticket, _trade in _trades.items()}
+
+        # Differences from what the cache expected
+        self._stats['corrections'] += len(self._orders.keys() ^ _new.keys()) + sum(
+            1 for _ticket in self._orders.keys() & _new.keys()
+            if _differs_(self._orders[_ticket], _new[_ticket]))
+
+        self._orders = {}
+        self._by_magic = {}
+        self._by_symbol = {}
+        self._by_comment = {}
+
+        for _ticket, _order in _new.items():
+            self._put_(_ticket, _order)
+
+        self._last_snapshot = perf_counter()
+        self._incomplete = False
+        self._stats['snapshots'] += 1
+
+    def _delta_(self, _data):
+
+        # Caller holds self._lock
+        _trades = _data.get('_trades')
+
+        if not isinstance(_trades, dict):
+            return
+
+        if int(_data.get('_full', 1)):
+            self._snapshot_(_trades)
+
+        else:
+            for _ticket in _data.get('_removed', []):
+                if int(_ticket) in self._orders:
+                    self._remove_(int(_ticket))
+                    self._stats['corrections'] += 1
+
+            for _ticket, _trade in _trades.items():
+                _new = _order_(_trade)
+                _old = self._orders.get(int(_ticket))
+
+                if _old is None or _differs_(_old, _new):
+                    self._stats['corrections'] += 1
+
+                self._put_(int(_ticket), _new)
+
+            self._last_snapshot = perf_counter()
+            self._incomplete = False
+            self._stats['deltas'] += 1
+
+        self._epoch = int(_data.get('_epoch', 0))
+        self._version = int(_data.get('_version', 0))
+
+    ##########################################################################
+
+    """
+    Function to get copies of the open orders matching all the given
+    filters: {TICKET: ORDER}
+    """
+    def _find_(self, _magic=None, _symbol=None, _comment=None):
+
+        with self._lock:
+
+            _tickets = None
+
+            for _index, _key in ((self._by_magic, _magic),
+                                 (self._by_symbol, _symbol),
+                                 (self._by_comment, _comment)):
+                if _key is not None:
+                    _match = _index.get(_key, set())
+                    _tickets = _match if _tickets is None else _tickets & _match
+
+            if _tickets is None:
+                _tickets = self._orders.keys()
+
+            return {_ticket: dict(self._orders[_ticket]) for _ticket in _tickets}
+
+    def _get_(self, _ticket):
+
+        with self._lock:
+            _order = self._orders.get(int(_ticket))
+            return None if _order is None else dict(_order)
+
+    def __len__(self):
+        return len(self._orders)
+
+    def _sync_state_(self):
+
+        # (EPOCH, VERSION) to send with GET_OPEN_TRADES_DELTA
+        with self._lock:
+            return self._epoch, self._version
+
+    ##########################################################################
+
+    """
+    True if no snapshot was received yet, the last one is older than
+    _max_age seconds (default _sync_interval), or an order was partially
+    closed since
+    """
+    def _stale_(self, _max_age=None):
+
+        _max_age = self._sync_interval if _max_age is None else _max_age
+
+        if self._last_snapshot is None or self._incomplete:
+            return True
+
+        return _max_age is not None and perf_counter() - self._last_snapshot > _max_age
+
+    """
+    {'orders', 'updates', 'snapshots', 'deltas', 'corrections', 'version',
+    'snapshot_age'}: corrections counts orders a snapshot or delta added,
+    removed or changed, snapshot_age the seconds since either
+    """
+    def _get_stats_(self):
+
+        return dict(self._stats, orders=len(self._orders), version=self._version,
+                    snapshot_age=(None if self._last_snapshot is None
+                                  else perf_counter() - self._last_snapshot))
+
+##############################################################################
+
+def _order_(_trade):
+    return {_field: _trade.get(_field) for _field in _ORDER_FIELDS}
+
+def _differs_(_old, _new):
+    return any(_old[_field] != _new[_field] for _field in _CHECKED_FIELDS)
+
+##############################################################################
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+    DWX_ZMQ_Requests.py
+    --
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+from collections import OrderedDict
+from concurrent.futures import Future
+from itertools import count
+from threading import Lock
+from time import perf_counter
+
+##############################################################################
+
+# Command action -> '_action' of the matching response sent by MetaTrader.
+_RESPONSE_ACTIONS = {'OPEN': 'EXECUTION',
+                     'MODIFY': 'MODIFY',
+                     'CLOSE': 'CLOSE',
+                     'CLOSE_PARTIAL': 'CLOSE',
+                     'CLOSE_MAGIC': 'CLOSE_ALL_MAGIC',
+                     'CLOSE_ALL': 'CLOSE_ALL',
+                     'GET_OPEN_TRADES': 'OPEN_TRADES',
+                     'GET_OPEN_TRADES_DELTA': 'OPEN_TRADES_DELTA',
+                     'GET_ACCOUNT_INFO': 'GET_ACCOUNT_INFORMATION',
+                     'HIST': 'HIST',
+                     'TRACK_PRICES': 'TRACK_PRICES',
+                     'TRACK_RATES': 'TRACK_RATES',
+                     'HEARTBEAT': 'heartbeat',
+                     'BATCH': 'BATCH'}
+
+##############################################################################
+
+class DWX_ZMQ_Request():
+
+    """
+    A command in flight to MetaTrader and the Future its response resolves.
+    """
+    def __init__(self, _request_id, _action, _ticket=None, _symbol=None,
+                 _command=None, _future=None):
+
+        self._request_id = _request_id
+        self._action = _action
+        self._response_action = _RESPONSE_ACTIONS.get(_action, _action)
+        self._ticket = _ticket
+        self._symbol = _symbol
+
+        # Fields the command was sent with (e.g. the order dict)
+        self._command = _command
+
+        self._future = _future if _future is not None else Future()
+        self._sent_at = perf_counter()
+
+        # When handed to the PUSH socket (later than _sent_at if queued)
+        self._pushed_at = self._sent_at
+
+    ##########################################################################
+
+    def _matches_(self, _data):
+
+        # Responses rejected by CheckOpsStatus() carry no '_action'
+        if '_action' not in _data:
+            return True
+
+        if _data['_action'] != self._response_action:
+            return False
+
+        if self._ticket is not None and '_ticket' in _data:
+            try:
+                if int(_data['_ticket']) != int(self._ticket):
+                    return False
+            except (TypeError, ValueError):
+                return False
+
+        # HIST responses are tagged SYMBOL_TIMEFRAME, e.g. EURUSD_D1
+        if self._symbol is not None and '_symbol' in _data and self._action == 'HIST':
+            return str(_data['_symbol']).startswith(self._symbol + '_')
+
+        return True
+
+##############################################################################
+
+class DWX_ZMQ_Request_Tracker():
+
+    """
+    Correlates responses received on the PULL socket with the commands that
+    caused them, so each command can be awaited on its own Future.
+
+    Responses are matched by the '_request_id' echoed by the EA. Responses
+    without one (older EAs) fall back to the oldest pending command with the
+    same response action and ticket.
+    """
+    def __init__(self, _prefix='dwx-zeromq', _timeout=60.0):
+
+        self._prefix = _prefix
+        self._timeout = _timeout
+        self._counter = count(1)
+        self._lock = Lock()
+
+        # {REQUEST_ID: DWX_ZMQ_Request}, oldest first
+        self._pending = OrderedDict()
+
+    ##########################################################################
+
+    def _new_request_(self, _action, _ticket=None, _symbol=None, _command=None,
+                      _future=None):
+
+        # ';' is the EA's field separator, keep it out of the id.
+        _request_id = '{}-{}'.format(self._prefix, next(self._counter)).replace(';', '_')
+
+        # _future may be an asyncio.Future, resolved from the event loop
+        _request = DWX_ZMQ_Request(_request_id, _action, _ticket, _symbol, _command,
+                                   _future)
+
+        with self._lock:
+            self._expire_()
+            self._pending[_request_id] = _request
+
+        return _request
+
+    ##########################################################################
+
+    def _discard_(self, _request, _exception=None):
+
+        with self._lock:
+            self._pending.pop(_request._request_id, None)
+
+        if not _request._future.done():
+            if _exception is not None:
+                _request._future.set_exception(_exception)
+            else:
+                _request._future.cancel()
+
+    ##########################################################################
+
+    def _abandon_(self, _future):
+
+        # The caller stopped waiting: drop the request so a late response
+        # can't be matched to it ahead of newer commands.
+        with self._lock:
+            for _request_id, _request in self._pending.items():
+                if _request._future is _future:
+                    del self._pending[_request_id]
+                    break
+
+        _future.cancel()
+
+    ##########################################################################
+
+    def _resolve_(self, _data, _before=None):
+
+        # _before(_data, _request) runs ahead of waking the waiter (_request
+        # None if unmatched), so state it updates is current once woken.
+        if not isinstance(_data, dict):
+            return None
+
+        with self._lock:
+
+            _request = None
+
+            if '_request_id' in _data:
+                _request = self._pending.pop(str(_data['_request_id']), None)
+
+            else:
+                for _pending in self._pending.values():
+                    if _pending._matches_(_data):
+                        _request = _pending
+                        break
+
+                if _request is not None:
+                    del self._pending[_request._request_id]
+
+        if _before is not None:
+            _before(_data, _request)
+
+        if _request is not None and not _request._future.done():
+            _request._future.set_result(_data)
+
+        return _request
+
+    ##########################################################################
+
+    def _pending_count_(self):
+        return len(self._pending)
+
+    def _expire_now_(self):
+
+        # Fail timed-out requests without waiting for the next command
+        with self._lock:
+            self._expire_()
+
+    ##########################################################################
+
+    def _expire_(self):
+
+        # Caller holds self._lock. Oldest first, so stop at the first live one.
+        if self._timeout is None:
+            return
+
+        _now = perf_counter()
+
+        while len(self._pending) > 0:
+            _request_id, _request = next(iter(self._pending.items()))
+
+            if _now - _request._sent_at < self._timeout:
+                break
+
+            del self._pending[_request_id]
+
+            if not _request._future.done():
+                _request._future.set_exception(
+                    TimeoutError('No response to {} ({}) after {}s'.format(
+                        _request._action, _request_id, self._timeout)))
+
+##############################################################################
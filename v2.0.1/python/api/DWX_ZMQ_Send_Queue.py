@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+    DWX_ZMQ_Send_Queue.py
+    --
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+from collections import deque
+from queue import Full
+from threading import Condition, Thread
+from time import perf_counter
+
+##############################################################################
+
+class DWX_ZMQ_Send_Queue():
+
+    """
+    Flow-controlled PUSH pipeline: commands wait in a queue and one sender
+    thread (the only user of the PUSH socket) passes them on, keeping at
+    most _window commands in flight. A slot is credited back when the
+    command's Future completes, i.e. when its response arrives on PULL (or
+    it times out / is abandoned), so commands go out as fast as the EA
+    answers them and none is dropped because the socket was busy.
+
+    _push(_msg, _timeout_ms) must send _msg within _timeout_ms and return
+    True, or return False if the socket couldn't take it (it is retried).
+
+    When _max_queue commands are waiting, _put_() applies _policy:
+        'block':    wait for room
+        'timeout':  wait up to _timeout seconds, then fail
+        'reject':   fail at once
+    A command that fails to enter the queue gets queue.Full on its Future.
+    """
+    def __init__(self, _push, _window=4, _max_queue=1000, _policy='block',
+                 _timeout=10.0, _expire=None):
+
+        if _policy not in ('block', 'timeout', 'reject'):
+            raise ValueError("_policy must be 'block', 'timeout' or 'reject'")
+
+        if _window < 1:
+            raise ValueError('_window must be at least 1')
+
+        self._push = _push
+        self._window = _window
+        self._max_queue = _max_queue
+        self._policy = _policy
+        self._timeout = _timeout
+
+        # Called while waiting for credit, so lost responses time out and
+        # free their slot (DWX_ZMQ_Request_Tracker._expire_now_)
+        self._expire = _expire
+
+        self._cond = Condition()
+
+        # [(MSG, DWX_ZMQ_Request, QUEUED_AT)]
+        self._queue = deque()
+        self._in_flight = 0
+
+        self._stats = {'queued': 0, 'sent': 0, 'rejected': 0, 'send_retries': 0,
+                       'max_depth': 0, 'total_wait': 0.0, 'max_wait': 0.0}
+
+        self._ACTIVE = True
+        self._Sender_Thread = Thread(target=self._DWX_ZMQ_Send_Loop_, daemon=True)
+        self._Sender_Thread.start()
+
+    ##########################################################################
+
+    def _put_(self, _msg, _request):
+
+        """
+        Queue _msg, whose response resolves _request._future. Returns False
+        (after failing the Future with queue.Full) if there was no room.
+        """
+        with self._cond:
+
+            if len(self._queue) >= self._max_queue and self._policy != 'reject':
+                self._cond.wait_for(lambda: len(self._queue) < self._max_queue or not self._ACTIVE,
+                                    None if self._policy == 'block' else self._timeout)
+
+            if len(self._queue) >= self._max_queue or not self._ACTIVE:
+                self._stats['rejected'] += 1
+                _room = False
+            else:
+                self._queue.append((_msg, _request, perf_counter()))
+                self._stats['queued'] += 1
+                self._stats['max_depth'] = max(self._stats['max_depth'], len(self._queue))
+                self._cond.notify_all()
+                _room = True
+
+        if not _room and not _request._future.done():
+            _request._future.set_exception(Full('Send queue full ({} commands)'.format(self._max_queue)))
+
+        return _room
+
+    ##########################################################################
+
+    def _DWX_ZMQ_Send_Loop_(self):
+
+        while True:
+
+            with self._cond:
+
+                _ready = self._cond.wait_for(
+                    lambda: not self._ACTIVE or (len(self._queue) > 0 and self._in_flight < self._window),
+                    1.0)
+
+                if not self._ACTIVE:
+                    break
+
+                if not _ready:
+                    _msg = None
+                else:
+                    _msg, _request, _queued_at = self._queue[0]
+
+            if _msg is None:
+                # Window full for a while: let lost responses time out
+                if self._expire is not None and len(self._queue) > 0:
+                    self._expire()
+                continue
+
+            # Cancelled or failed while queued: skip it
+            if _request._future.done():
+                with self._cond:
+                    self._queue.popleft()
+                    self._cond.notify_all()
+                continue
+
+            _request._pushed_at = perf_counter()
+
+            if not self._push(_msg, 100):
+                with self._cond:
+                    self._stats['send_retries'] += 1
+                continue
+
+            _wait = perf_counter() - _queued_at
+
+            with self._cond:
+                self._queue.popleft()
+                self._in_flight += 1
+                self._stats['sent'] += 1
+                self._stats['total_wait'] += _wait
+                self._stats['max_wait'] = max(self._stats['max_wait'], _wait)
+                self._cond.notify_all()
+
+            # Runs at once if the response is already in
+            _request._future.add_done_callback(self._credit_)
+
+        print("\n++ [KERNEL] _DWX_ZMQ_Send_Loop_() Signing Out ++")
+
+    ##########################################################################
+
+    def _credit_(self, _future):
+
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    ##########################################################################
+
+    """
+    Function to get queue stats: depth (waiting to be sent), in_flight,
+    window, counters, and mean / max seconds spent waiting in the queue.
+    """
+    def _get_stats_(self):
+
+        with self._cond:
+            _stats = dict(self._stats, depth=len(self._queue),
+                          in_flight=self._in_flight, window=self._window)
+
+        _stats['mean_wait'] = _stats['total_wait'] / _stats['sent'] if _stats['sent'] > 0 else 0.0
+        del _stats['total_wait']
+
+        return _stats
+
+    ##########################################################################
+
+    def _shutdown_(self):
+
+        # Commands still queued are cancelled
+        with self._cond:
+            self._ACTIVE = False
+            _queued = list(self._queue)
+            self._queue.clear()
+            self._cond.notify_all()
+
+        self._Sender_Thread.join()
+
+        for _msg, _request, _queued_at in _queued:
+            _request._future.cancel()
+
+##############################################################################
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+    DWX_ZMQ_Shared_Ring.py
+    --
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+import numpy as np
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from time import perf_counter, sleep, time_ns
+
+try:
+    from api.DWX_ZMQ_Topic_Router import DWX_ZMQ_Tick, DWX_ZMQ_Bar
+except ImportError:
+    from DWX_ZMQ_Topic_Router import DWX_ZMQ_Tick, DWX_ZMQ_Bar
+
+##############################################################################
+
+# One parsed SUB message. Ticks fill bid/ask (time = receive time in ns);
+# bars fill open..real_volume (time = bar open time in seconds). written is
+# when it entered the ring (ns since epoch), seq its 1-based position in the
+# stream, stored last so a row is only valid once seq is set.
+RING_DTYPE = np.dtype([('kind', np.int8),           # RING_TICK or RING_BAR
+                       ('topic', 'S32'),            # 'EURUSD' or 'EURUSD_M1'
+                       ('time', np.int64),
+                       ('bid', np.float64),
+                       ('ask', np.float64),
+                       ('open', np.float64),
+                       ('high', np.float64),
+                       ('low', np.float64),
+                       ('close', np.float64),
+                       ('tick_volume', np.int64),
+                       ('spread', np.int32),
+                       ('real_volume', np.int64),
+                       ('written', np.int64),
+                       ('seq', np.int64)])
+
+RING_TICK = 0
+RING_BAR = 1
+
+# Header: [MAGIC, CAPACITY, RECORDS WRITTEN], then 2 x CAPACITY records
+_MAGIC = 0x44575852494E4701
+_HEADER = np.dtype(np.int64).itemsize * 8
+
+##############################################################################
+
+def _ring_arrays_(_buf, _capacity):
+
+    _header = np.ndarray(3, dtype=np.int64, buffer=_buf)
+    _records = np.ndarray(2 * _capacity, dtype=RING_DTYPE, buffer=_buf, offset=_HEADER)
+
+    return _header, _records
+
+def _attach_(_name):
+
+    # Attach without registering the segment with the resource tracker,
+    # which would otherwise delete it (for every process) when this reader
+    # exits. Python 3.13+ supports this directly.
+    try:
+        return SharedMemory(name=_name, track=False)
+    except TypeError:
+        pass
+
+    _register = resource_tracker.register
+    resource_tracker.register = lambda _name, _rtype: None
+
+    try:
+        return SharedMemory(name=_name)
+    finally:
+        resource_tracker.register = _register
+
+##############################################################################
+
+class DWX_ZMQ_Shared_Ring():
+
+    """
+    Writer side of a shared-memory ring of parsed ticks and bars, so any
+    number of local processes can read one SUB feed (see
+    DWX_ZMQ_Shared_Ring_Reader) without their own ZeroMQ subscription.
+
+    Like DWX_ZMQ_Tick_Buffer, every record is written twice (slot i and
+    i + _capacity), so any run of up to _capacity consecutive records is one
+    contiguous slice and readers get NumPy views without copying. There is a
+    single writer and it never waits for readers: a reader more than
+    _capacity records behind loses the oldest ones.
+    """
+    def __init__(self, _name='dwx_ring', _capacity=65536):
+
+        if _capacity < 1:
+            raise ValueError('_capacity must be at least 1')
+
+        self._name = _name
+        self._capacity = _capacity
+
+        _size = _HEADER + 2 * _capacity * RING_DTYPE.itemsize
+
+        # Left over by a writer that didn't close (e.g. killed)
+        try:
+            _stale = SharedMemory(name=_name)
+            _stale.close()
+            _stale.unlink()
+        except FileNotFoundError:
+            pass
+
+        self._shm = SharedMemory(name=_name, create=True, size=_size)
+        self._header, self._records = _ring_arrays_(self._shm.buf, _capacity)
+
+        self._records[:] = np.zeros(1, dtype=RING_DTYPE)
+        self._header[:] = (_MAGIC, _capacity, 0)
+
+        self._count = 0
+
+    ##########################################################################
+
+    def _write_(self, _item):
+
+        """
+        Append a DWX_ZMQ_Tick or DWX_ZMQ_Bar. Other items are ignored.
+        """
+        if type(_item) is DWX_ZMQ_Tick:
+            _record = (RING_TICK, _item.symbol.encode(), _item.time, _item.bid, _item.ask,
+                       0.0, 0.0, 0.0, 0.0, 0, 0, 0, time_ns(), self._count + 1)
+
+        elif type(_item) is DWX_ZMQ_Bar:
+            _record = (RING_BAR, _item.instrument.encode(), _item.time, 0.0, 0.0,
+                       _item.open, _item.high, _item.low, _item.close,
+                       _item.tick_volume, _item.spread, _item.real_volume,
+                       time_ns(), self._count + 1)
+
+        else:
+            return
+
+        _i = self._count % self._capacity
+        _j = _i + self._capacity
+
+        # Invalidate first, so a reader lapped mid-write sees a bad seq
+        self._records['seq'][_i] = self._records['seq'][_j] = -1
+        self._records[_i] = self._records[_j] = _record
+
+        # Publish
+        self._count += 1
+        self._header[2] = self._count
+
+    ##########################################################################
+
+    def __len__(self):
+        return self._count
+
+    def _close_(self, _unlink=True):
+
+        # Views into the buffer must go before it can be closed
+        self._header = self._records = None
+        self._shm.close()
+
+        if _unlink:
+            self._shm.unlink()
+
+##############################################################################
+
+class DWX_ZMQ_Shared_Ring_Reader():
+
+    """
+    Reader of a DWX_ZMQ_Shared_Ring, in any local process.
+
+    Each reader keeps its own position, starting at the latest record (or
+    the oldest retained one if _from_start=True). _read_() returns the new
+    records as a read-only RING_DTYPE view into shared memory, e.g.
+
+        _ring = DWX_ZMQ_Shared_Ring_Reader('dwx_ring')
+        _new = _ring._read_(_timeout=0.1)
+        _eur = _new[(_new['kind'] == RING_TICK) & (_new['topic'] == b'EURUSD')]
+
+    The writer never waits, so a view is only stable until the writer has
+    added _capacity more records: process it (or copy it) before then. If
+    _lapped_() is True after processing, part of it was overwritten.
+    """
+    def __init__(self, _name='dwx_ring', _from_start=False):
+
+        self._shm = _attach_(_name)
+
+        _header = np.ndarray(3, dtype=np.int64, buffer=self._shm.buf)
+
+        if _header[0] != _MAGIC:
+            raise ValueError('{} is not a DWX_ZMQ_Shared_Ring'.format(_name))
+
+        self._capacity = int(_header[1])
+        self._header, self._records = _ring_arrays_(self._shm.buf, self._capacity)
+
+        _count = int(self._header[2])
+
+        # Next record to read (0-based) and start of the last returned view
+        self._next = max(0, _count - self._capacity) if _from_start else _count
+        self._view_start = self._next
+
+        # Records overwritten before this reader got to them
+        self._lost = 0
+
+    ##########################################################################
+
+    def _read_(self, _max=None, _timeout=None, _sleep=0.0001):
+
+        """
+        Records written since the last call (at most _max, and at most
+        _capacity), oldest first. If none and _timeout (seconds) is given,
+        polls every _sleep seconds until there are some or _timeout passes.
+        """
+        _count = int(self._header[2])
+
+        if _count == self._next and _timeout is not None:
+
+            _deadline = perf_counter() + _timeout
+
+            while _count == self._next and perf_counter() < _deadline:
+                sleep(_sleep)
+                _count = int(self._header[2])
+
+        # Lapped by the writer: skip what has been overwritten
+        if _count - self._next > self._capacity:
+            self._lost += _count - self._capacity - self._next
+            self._next = _count - self._capacity
+
+        _n = _count - self._next
+
+        if _max is not None:
+            _n = min(_n, _max)
+
+        _i = self._next % self._capacity
+
+        _view = self._records[_i:_i + _n]
+        _view.flags.writeable = False
+
+        self._view_start = self._next
+        self._next += _n
+
+        return _view
+
+    ##########################################################################
+
+    def _lapped_(self):
+
+        # True if the last view returned by _read_() may have been overwritten
+        return int(self._header[2]) - self._view_start > self._capacity
+
+    def _lag_(self):
+
+        # Records written but not read yet
+        return int(self._header[2]) - self._next
+
+    ##########################################################################
+
+    def _close_(self):
+
+        self._header = self._records = None
+        self._shm.close()
+
+##############################################################################
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+    DWX_ZMQ_Tick_Store.py
+    --
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+import numpy as np
+from pandas import DataFrame, Timestamp, to_datetime
+from time import time_ns
+
+##############################################################################
+
+class DWX_ZMQ_Tick_Buffer():
+
+    """
+    Fixed-capacity BID/ASK history for one symbol.
+
+    Columns (receive time in ns since epoch UTC, bid, ask) are preallocated
+    NumPy arrays of 2 x _capacity. Every tick is written twice, at slot i and
+    i + _capacity, so the latest N ticks are always one contiguous slice and
+    _last_() / _since_() return views without copying or wrapping.
+
+    Views are read-only and alias the buffer: once more than _capacity ticks
+    arrive after a read, its values are overwritten. Call .copy() to keep them.
+    """
+    def __init__(self, _capacity=100000):
+
+        if _capacity < 1:
+            raise ValueError('_capacity must be at least 1')
+
+        self._capacity = _capacity
+
+        self._time = np.zeros(2 * _capacity, dtype=np.int64)
+        self._bid = np.zeros(2 * _capacity, dtype=np.float64)
+        self._ask = np.zeros(2 * _capacity, dtype=np.float64)
+
+        # Ticks appended since creation (next slot is _count % _capacity)
+        self._count = 0
+
+    ##########################################################################
+
+    def _append_(self, _time, _bid, _ask):
+
+        # Keep times non-decreasing (wall clock adjustments) for _since_()
+        if self._count > 0:
+            _last = self._time[(self._count - 1) % self._capacity]
+            if _time < _last:
+                _time = _last
+
+        _i = self._count % self._capacity
+        _j = _i + self._capacity
+
+        self._time[_i] = self._time[_j] = _time
+        self._bid[_i] = self._bid[_j] = _bid
+        self._ask[_i] = self._ask[_j] = _ask
+
+        self._count += 1
+
+    ##########################################################################
+
+    def __len__(self):
+        return min(self._count, self._capacity)
+
+    ##########################################################################
+
+    def _view_(self, _n):
+
+        # Latest _n ticks, oldest first: (TIME_NS, BID, ASK)
+        _count = self._count
+        _n = max(0, min(_n, _count, self._capacity))
+
+        _end = (_count - 1) % self._capacity + self._capacity + 1 if _count > 0 else 0
+        _views = (self._time[_end - _n:_end],
+                  self._bid[_end - _n:_end],
+                  self._ask[_end - _n:_end])
+
+        for _view in _views:
+            _view.flags.writeable = False
+
+        return _views
+
+    ##########################################################################
+
+    """
+    Latest _n ticks (all retained ticks if None) as (TIME_NS, BID, ASK) views.
+    """
+    def _last_(self, _n=None):
+        return self._view_(self._capacity if _n is None else _n)
+
+    """
+    Retained ticks received at or after _t (ns since epoch, or anything
+    pandas.Timestamp accepts; naive times are UTC) as (TIME_NS, BID, ASK) views.
+    """
+    def _since_(self, _t):
+
+        if not isinstance(_t, (int, np.integer)):
+            _t = Timestamp(_t).value
+
+        _times, _bids, _asks = self._view_(self._capacity)
+        _start = int(np.searchsorted(_times, _t, side='left'))
+
+        return _times[_start:], _bids[_start:], _asks[_start:]
+
+    ##########################################################################
+
+    def _latest_(self):
+
+        # (TIME_NS, BID, ASK) of the most recent tick, or None
+        if self._count == 0:
+            return None
+
+        _i = (self._count - 1) % self._capacity
+
+        return int(self._time[_i]), float(self._bid[_i]), float(self._ask[_i])
+
+    ##########################################################################
+
+    def _to_dataframe_(self, _n=None):
+
+        _times, _bids, _asks = self._last_(_n)
+
+        return DataFrame({'bid': _bids, 'ask': _asks},
+                         index=to_datetime(_times, unit='ns', utc=True))
+
+    ##########################################################################
+
+    def _nbytes_(self):
+        return self._time.nbytes + self._bid.nbytes + self._ask.nbytes
+
+##############################################################################
+
+class DWX_ZMQ_Tick_Store():
+
+    """
+    BID/ASK ticks received on the SUB socket, one DWX_ZMQ_Tick_Buffer per
+    symbol. Memory is bounded at _capacity ticks (48 bytes each) per symbol.
+
+    Written only by the connector's poll thread. Readers on other threads
+    always get a consistent slice, but the newest tick may be mid-write.
+    """
+    def __init__(self, _capacity=100000):
+
+        self._capacity = _capacity
+
+        # {SYMBOL: DWX_ZMQ_Tick_Buffer}
+        self._buffers = {}
+
+    ##########################################################################
+
+    def _append_(self, _symbol, _bid, _ask, _time=None):
+
+        _buffer = self._buffers.get(_symbol)
+
+        if _buffer is None:
+            _buffer = self._buffers[_symbol] = DWX_ZMQ_Tick_Buffer(self._capacity)
+
+        _buffer._append_(time_ns() if _time is None else _time, _bid, _ask)
+
+    ##########################################################################
+
+    def __getitem__(self, _symbol):
+        return self._buffers[_symbol]
+
+    def __contains__(self, _symbol):
+        return _symbol in self._buffers
+
+    def __iter__(self):
+        return iter(list(self._buffers))
+
+    def __len__(self):
+        return len(self._buffers)
+
+    def keys(self):
+        return list(self._buffers)
+
+    ##########################################################################
+
+    def _last_(self, _symbol, _n=None):
+        return self._buffers[_symbol]._last_(_n)
+
+    def _since_(self, _symbol, _t):
+        return self._buffers[_symbol]._since_(_t)
+
+    def _latest_(self, _symbol):
+        return self._buffers[_symbol]._latest_() if _symbol in self._buffers else None
+
+    def _to_dataframe_(self, _symbol, _n=None):
+        return self._buffers[_symbol]._to_dataframe_(_n)
+
+    ##########################################################################
+
+    def _nbytes_(self):
+        return sum(_buffer._nbytes_() for _buffer in list(self._buffers.values()))
+
+##############################################################################
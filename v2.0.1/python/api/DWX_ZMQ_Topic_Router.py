@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+    DWX_ZMQ_Topic_Router.py
+    --
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+from collections import namedtuple
+from fnmatch import fnmatchcase
+from threading import Lock
+from time import time_ns
+
+try:
+    from api.DWX_ZMQ_Bar_Store import _split_instrument_
+except ImportError:
+    from DWX_ZMQ_Bar_Store import _split_instrument_
+
+##############################################################################
+
+# BID/ASK update, e.g. 'EURUSD:|:1.11385;1.11387'. time is the local receive
+# time in ns since epoch (the EA doesn't send one).
+DWX_ZMQ_Tick = namedtuple('DWX_ZMQ_Tick', ['symbol', 'time', 'bid', 'ask'])
+
+# Rate update, e.g. 'EURUSD_M1:|:1569931200;1.0982;...'. Fields from time on
+# are in BAR_DTYPE order, so bar[3:] can be stored as is.
+DWX_ZMQ_Bar = namedtuple('DWX_ZMQ_Bar', ['instrument', 'symbol', 'timeframe',
+                                         'time', 'open', 'high', 'low', 'close',
+                                         'tick_volume', 'spread', 'real_volume'])
+
+##############################################################################
+
+def _DWX_ZMQ_PARSE_SUB_(_msg, _main_delimiter=':|:', _delimiter=';'):
+
+    """
+    Parse one SUB message into a DWX_ZMQ_Tick or DWX_ZMQ_Bar. Returns None
+    for other messages; raises ValueError if the message is malformed.
+    """
+    _topic, _data = _msg.split(_main_delimiter)
+    _fields = _data.split(_delimiter)
+
+    if len(_fields) == 2:
+        return DWX_ZMQ_Tick(_topic, time_ns(), float(_fields[0]), float(_fields[1]))
+
+    if len(_fields) == 8:
+        _symbol, _timeframe = _split_instrument_(_topic)
+
+        return DWX_ZMQ_Bar(_topic, _symbol, _timeframe,
+                           int(_fields[0]), float(_fields[1]), float(_fields[2]),
+                           float(_fields[3]), float(_fields[4]), int(_fields[5]),
+                           int(_fields[6]), int(_fields[7]))
+
+    return None
+
+##############################################################################
+
+class DWX_ZMQ_Topic_Router():
+
+    """
+    Routes parsed SUB messages to the handlers registered for their topic.
+
+    Handlers are callables taking one DWX_ZMQ_Tick or DWX_ZMQ_Bar. They are
+    registered for an exact topic ('EURUSD', 'EURUSD_M1') or a shell-style
+    pattern ('*', 'EUR*', '*_M1'). The handlers for each topic seen are
+    resolved once into a lookup table, so routing a message is one dict
+    lookup no matter how many patterns are registered. The table is rebuilt
+    lazily after every (un)registration.
+
+    Handlers run on the calling thread, or are queued on _dispatcher (a
+    DWX_ZMQ_Dispatcher) if given.
+    """
+    def __init__(self, _dispatcher=None):
+
+        self._dispatcher = _dispatcher
+        self._lock = Lock()
+
+        # {TOPIC: [HANDLER]} and [(PATTERN, HANDLER)], in registration order
+        self._exact = {}
+        self._patterns = []
+
+        # {TOPIC: (HANDLER, ...)}, resolved on first message of each topic
+        self._routes = {}
+
+        # Exceptions raised by handlers run on the calling thread
+        self._errors = 0
+
+    ##########################################################################
+
+    def _register_(self, _topic, _handler):
+
+        with self._lock:
+            if any(_char in _topic for _char in '*?['):
+                self._patterns.append((_topic, _handler))
+            else:
+                self._exact.setdefault(_topic, []).append(_handler)
+
+            self._routes = {}
+
+    ##########################################################################
+
+    def _unregister_(self, _topic, _handler=None):
+
+        """
+        Remove _handler (all handlers if None) registered under _topic.
+        """
+        with self._lock:
+            if _topic in self._exact:
+                self._exact[_topic] = [_h for _h in self._exact[_topic]
+                                       if _handler is not None and _h != _handler]
+                if len(self._exact[_topic]) == 0:
+                    del self._exact[_topic]
+
+            self._patterns = [(_p, _h) for _p, _h in self._patterns
+                              if _p != _topic or (_handler is not None and _h != _handler)]
+
+            self._routes = {}
+
+    ##########################################################################
+
+    def _handlers_(self, _topic):
+
+        _handlers = self._routes.get(_topic)
+
+        if _handlers is None:
+            with self._lock:
+                _handlers = tuple(self._exact.get(_topic, ())) + tuple(
+                    _h for _p, _h in self._patterns if fnmatchcase(_topic, _p))
+                self._routes[_topic] = _handlers
+
+        return _handlers
+
+    ##########################################################################
+
+    def _dispatch_(self, _topic, _item):
+
+        """
+        Deliver _item to every handler of _topic. A failing handler is
+        reported and doesn't stop the others (or the poll thread).
+        """
+        if self._dispatcher is not None:
+            for _handler in self._handlers_(_topic):
+                self._dispatcher._submit_(_handler, _topic, _item)
+            return
+
+        for _handler in self._handlers_(_topic):
+            try:
+                _handler(_item)
+            except Exception as ex:
+                self._errors += 1
+                _exstr = "Exception Type {0}. Args:\n{1!r}"
+                _msg = _exstr.format(type(ex).__name__, ex.args)
+                print(_msg)
+
+    ##########################################################################
+
+    def _topics_(self):
+
+        # Topics and patterns with at least one handler
+        with self._lock:
+            return list(self._exact) + [_p for _p, _h in self._patterns]
+
+##############################################################################
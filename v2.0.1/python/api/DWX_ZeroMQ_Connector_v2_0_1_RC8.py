@@ -14,13 +14,53 @@
 """
 
 import zmq
-from time import sleep
+import numpy as np
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from time import sleep, perf_counter, time_ns
 from pandas import DataFrame, Timestamp
 from threading import Thread
 
 # 30-07-2019 10:58 CEST
 from zmq.utils.monitor import recv_monitor_message
 
+try:
+    from api.DWX_ZMQ_Requests import DWX_ZMQ_Request_Tracker
+    from api.DWX_ZMQ_Decoder import _DWX_ZMQ_DECODE_
+    from api.DWX_ZMQ_Tick_Store import DWX_ZMQ_Tick_Store
+    from api.DWX_ZMQ_Dispatcher import DWX_ZMQ_Dispatcher
+    from api.DWX_ZMQ_Conflator import DWX_ZMQ_Conflator
+    from api.DWX_ZMQ_Shared_Ring import DWX_ZMQ_Shared_Ring
+    from api.DWX_ZMQ_Send_Queue import DWX_ZMQ_Send_Queue
+    from api.DWX_ZMQ_Binary_Feed import _DWX_ZMQ_DECODE_SUB_BINARY_, _DWX_ZMQ_SERVER_TIME_, _to_text_
+    from api.DWX_ZMQ_Latency import DWX_ZMQ_Latency_Recorder
+    from api.DWX_ZMQ_Metrics import DWX_ZMQ_Metrics, DWX_ZMQ_Metrics_Server, _DWX_ZMQ_PROMETHEUS_TEXT_
+    from api.DWX_ZMQ_Order_Cache import DWX_ZMQ_Order_Cache
+    from api.DWX_ZMQ_Topic_Router import (DWX_ZMQ_Topic_Router, DWX_ZMQ_Tick, 
+                                          DWX_ZMQ_Bar, _DWX_ZMQ_PARSE_SUB_)
+    from api.DWX_ZMQ_Bar_Store import (DWX_ZMQ_Bar_Store, BAR_DTYPE, TIMEFRAMES,
+                                       _hist_to_bars_, _to_seconds_, _format_time_)
+except ImportError:
+    from DWX_ZMQ_Requests import DWX_ZMQ_Request_Tracker
+    from DWX_ZMQ_Decoder import _DWX_ZMQ_DECODE_
+    from DWX_ZMQ_Tick_Store import DWX_ZMQ_Tick_Store
+    from DWX_ZMQ_Dispatcher import DWX_ZMQ_Dispatcher
+    from DWX_ZMQ_Conflator import DWX_ZMQ_Conflator
+    from DWX_ZMQ_Shared_Ring import DWX_ZMQ_Shared_Ring
+    from DWX_ZMQ_Send_Queue import DWX_ZMQ_Send_Queue
+    from DWX_ZMQ_Binary_Feed import _DWX_ZMQ_DECODE_SUB_BINARY_, _DWX_ZMQ_SERVER_TIME_, _to_text_
+    from DWX_ZMQ_Latency import DWX_ZMQ_Latency_Recorder
+    from DWX_ZMQ_Metrics import DWX_ZMQ_Metrics, DWX_ZMQ_Metrics_Server, _DWX_ZMQ_PROMETHEUS_TEXT_
+    from DWX_ZMQ_Order_Cache import DWX_ZMQ_Order_Cache
+    from DWX_ZMQ_Topic_Router import (DWX_ZMQ_Topic_Router, DWX_ZMQ_Tick, 
+                                      DWX_ZMQ_Bar, _DWX_ZMQ_PARSE_SUB_)
+    from DWX_ZMQ_Bar_Store import (DWX_ZMQ_Bar_Store, BAR_DTYPE, TIMEFRAMES,
+                                   _hist_to_bars_, _to_seconds_, _format_time_)
+
+# Trade actions the EA accepts inside a BATCH command
+_BATCH_ACTIONS = ('OPEN', 'MODIFY', 'CLOSE', 'CLOSE_PARTIAL')
+
 class DWX_ZeroMQ_Connector():
 
     """
@@ -39,7 +79,31 @@ class DWX_ZeroMQ_Connector():
                  _verbose=True,             # String delimiter
                  _poll_timeout=1000,        # ZMQ Poller Timeout (ms)
                  _sleep_delay=0.001,        # 1 ms for time.sleep()
-                 _monitor=False):           # Experimental ZeroMQ Socket Monitoring
+                 _monitor=False,            # Experimental ZeroMQ Socket Monitoring
+                 _drain=False,              # Drain all queued PULL/SUB messages per poller wakeup
+                 _drain_batch=1000,         # Max messages drained per socket per wakeup
+                 _request_timeout=60,       # Seconds before an unanswered command's Future fails
+                 _tick_capacity=100000,     # Ticks retained per symbol in _Market_Data_DB
+                 _max_bars=None,            # Bars retained per instrument in _Rates_DB (None = all)
+                 _dispatch_mode=None,       # Run handlers on the poll thread (None), or in a 'thread' / 'process' pool
+                 _dispatch_workers=4,       # Pool lanes (topics are spread over them, in order per topic)
+                 _dispatch_queue_size=10000,    # Max queued items per handler before dropping
+                 _conflate=False,           # Keep the latest tick/bar per topic for _DWX_ZMQ_GET_CHANGED_()
+                 _context=None,             # Shared zmq.Context (None = create one)
+                 _poll_thread=True,         # Start a poll thread (False when polled by DWX_ZeroMQ_Connector_Pool)
+                 _shm_ring=None,            # Publish parsed ticks/bars to this shared-memory ring name
+                 _shm_capacity=65536,       # Records kept in the shared-memory ring
+                 _send_window=None,         # Max commands awaiting a response (None = send at once, drop if busy)
+                 _send_queue_size=1000,     # Max commands waiting to be sent when _send_window is set
+                 _send_policy='block',      # When the send queue is full: 'block', 'timeout' or 'reject'
+                 _send_timeout=10.0,        # Seconds to wait for room with _send_policy='timeout'
+                 _latency_stats=True,       # Record latency histograms (see _get_latency_stats_)
+                 _server_offset=None,       # Broker server time minus UTC in seconds (None = estimated)
+                 _metrics_port=None,        # Serve _get_metrics_() to Prometheus on this local port (None = off)
+                 _journal=None,             # DWX_ZMQ_Journal_Writer recording all SUB / PULL data (None = off)
+                 _order_cache=True,         # Track open orders from trade responses (see _get_open_orders_)
+                 _order_sync_interval=5.0,  # Seconds before the order cache is due a GET_OPEN_TRADES snapshot
+                 _order_sync_delta=True):   # Sync it with GET_OPEN_TRADES_DELTA (False for EAs before it)
     
         ######################################################################
         
@@ -55,8 +119,9 @@ class DWX_ZeroMQ_Connector():
         # Connection Protocol
         self._protocol = _protocol
 
-        # ZeroMQ Context
-        self._ZMQ_CONTEXT = zmq.Context()
+        # ZeroMQ Context (a shared one is left for its owner to terminate)
+        self._OWN_CONTEXT = _context is None
+        self._ZMQ_CONTEXT = zmq.Context() if _context is None else _context
         
         # TCP Connection URL Template
         self._URL = self._protocol + "://" + self._host + ":"
@@ -103,6 +168,11 @@ class DWX_ZeroMQ_Connector():
         
         self._main_string_delimiter = ':|:'
         
+        # Binary SUB feed (see _DWX_MTX_SEND_TRACKPRICES_REQUEST_): last record
+        # sequence number per topic, to count records lost on the way
+        self._sub_sequence = {}     # {TOPIC: LAST_SEQ}
+        self._sub_sequence_stats = {'records': 0, 'gaps': 0, 'missed': 0}
+        
         # BID/ASK Market Data Subscription Threads ({SYMBOL: Thread})
         self._MarketData_Thread = None
         
@@ -110,8 +180,11 @@ class DWX_ZeroMQ_Connector():
         self._PUSH_Monitor_Thread = None
         self._PULL_Monitor_Thread = None
         
-        # Market Data Dictionary by Symbol (holds tick data)
-        self._Market_Data_DB = {}   # {SYMBOL: {TIMESTAMP: (BID, ASK)}}
+        # Market Data by Symbol (holds the latest _tick_capacity ticks per symbol)
+        self._Market_Data_DB = DWX_ZMQ_Tick_Store(_tick_capacity)   # {SYMBOL: DWX_ZMQ_Tick_Buffer}
+        
+        # OHLC Bars by Instrument (holds TRACK_RATES data, keyed by bar open time)
+        self._Rates_DB = DWX_ZMQ_Bar_Store(_max_bars)   # {(SYMBOL, TIMEFRAME): DWX_ZMQ_Bar_Buffer}
         
         # History Data Dictionary by Symbol (holds historic data of the last HIST request for each symbol)
         self._History_DB = {}   # {SYMBOL_TF: [{'time': TIME, 'open': OPEN_PRICE, 'high': HIGH_PRICE, 
@@ -124,12 +197,64 @@ class DWX_ZeroMQ_Connector():
                                         # 'account_profit': ACCOUNT_PROFIT, 'account_free_margin': ACCOUNT_FREE_MARGIN,
                                         # 'account_leverage': ACCOUNT_LEVERAGE}]}
 
+        # Open Orders by Ticket, kept from trade responses (see _get_open_orders_)
+        self._Orders_DB = None
+        
+        if _order_cache:
+            self._Orders_DB = DWX_ZMQ_Order_Cache(_order_sync_interval)
+        
+        self._order_sync_delta = _order_sync_delta
+
         # Temporary Order STRUCT for convenience wrappers later.
         self.temp_order_dict = self._generate_default_order_dict()
         
         # Thread returns the most recently received DATA block here
         self._thread_data_output = None
         
+        # Commands in flight, each resolved by its own response (see _DWX_ZMQ_SEND_REQUEST_)
+        self._requests = DWX_ZMQ_Request_Tracker(_prefix=self._ClientID,
+                                                 _timeout=_request_timeout)
+        
+        # Flow-controlled PUSH pipeline (see _get_send_stats_)
+        self._send_queue = None
+        
+        if _send_window is not None:
+            self._send_queue = DWX_ZMQ_Send_Queue(self._DWX_ZMQ_Push_,
+                                                  _window=_send_window,
+                                                  _max_queue=_send_queue_size,
+                                                  _policy=_send_policy,
+                                                  _timeout=_send_timeout,
+                                                  _expire=self._requests._expire_now_)
+        
+        # Socket, parse, drop and handler error counters (see _get_metrics_)
+        self._metrics = DWX_ZMQ_Metrics()
+        
+        # Command round-trip and tick latency histograms (see _get_latency_stats_)
+        self._latency = None
+        
+        if _latency_stats:
+            self._latency = DWX_ZMQ_Latency_Recorder(_server_offset=_server_offset)
+        
+        # Worker pool running data handlers off the poll thread (see _get_dispatch_stats_)
+        self._dispatcher = None
+        
+        if _dispatch_mode is not None:
+            self._dispatcher = DWX_ZMQ_Dispatcher(_mode=_dispatch_mode,
+                                                  _workers=_dispatch_workers,
+                                                  _queue_size=_dispatch_queue_size)
+        
+        # Per-topic handlers of parsed SUB data (see _DWX_ZMQ_ADD_SUB_HANDLER_)
+        self._router = DWX_ZMQ_Topic_Router(self._dispatcher)
+        
+        # Latest tick/bar per topic, read in batches (see _DWX_ZMQ_GET_CHANGED_)
+        self._conflator = DWX_ZMQ_Conflator() if _conflate else None
+        
+        # Parsed ticks/bars for other local processes (see DWX_ZMQ_Shared_Ring_Reader)
+        self._shm_ring = None
+        
+        if _shm_ring is not None:
+            self._shm_ring = DWX_ZMQ_Shared_Ring(_shm_ring, _shm_capacity)
+        
         # Verbosity
         self._verbose = _verbose
         
@@ -139,12 +264,29 @@ class DWX_ZeroMQ_Connector():
         # Global Sleep Delay
         self._sleep_delay = _sleep_delay
         
+        # Drain Mode (see _DWX_ZMQ_Drain_Data_)
+        self._drain = _drain
+        self._drain_batch = _drain_batch
+        self._drain_stats = {'wakeups': 0, 'pull_messages': 0, 'sub_messages': 0,
+                             'last_batch': 0, 'max_batch': 0, 'capped_wakeups': 0}
+        
+        # Everything received, journaled from the poll thread (see DWX_ZMQ_Journal)
+        self._journal = _journal
+        
+        # Prometheus endpoint at http://127.0.0.1:_metrics_port/metrics
+        self._metrics_server = None
+        
+        if _metrics_port is not None:
+            self._metrics_server = DWX_ZMQ_Metrics_Server(self._get_metrics_text_, _metrics_port)
+        
         # Begin polling for PULL / SUB data
-        self._MarketData_Thread = Thread(target=self._DWX_ZMQ_Poll_Data_, 
-                                         args=(self._string_delimiter,
-                                               self._poll_timeout,))
-        self._MarketData_Thread.daemon = True
-        self._MarketData_Thread.start()
+        if _poll_thread == True:
+            self._MarketData_Thread = Thread(target=(self._DWX_ZMQ_Drain_Data_ if self._drain 
+                                                     else self._DWX_ZMQ_Poll_Data_), 
+                                             args=(self._string_delimiter,
+                                                   self._poll_timeout,))
+            self._MarketData_Thread.daemon = True
+            self._MarketData_Thread.start()
         
         ###########################################
         # Enable/Disable ZeroMQ Socket Monitoring #
@@ -201,14 +343,36 @@ class DWX_ZeroMQ_Connector():
         if self._PULL_Monitor_Thread is not None:            
             self._PULL_Monitor_Thread.join()
         
+        if self._send_queue is not None:
+            self._send_queue._shutdown_()
+        
+        if self._metrics_server is not None:
+            self._metrics_server._shutdown_()
+        
+        # Let running handlers finish, drop queued ones
+        if self._dispatcher is not None:
+            self._dispatcher._shutdown_()
+        
+        # Readers still attached keep their mapping until they close it
+        if self._shm_ring is not None:
+            self._shm_ring._close_()
+        
+        if self._journal is not None:
+            self._journal._close_()
+        
         # Unregister sockets from Poller
         self._poller.unregister(self._PULL_SOCKET)
         self._poller.unregister(self._SUB_SOCKET)
         print("\n++ [KERNEL] Sockets unregistered from ZMQ Poller()! ++")
         
         # Terminate context 
-        self._ZMQ_CONTEXT.destroy(0)
-        print("\n++ [KERNEL] ZeroMQ Context Terminated.. shut down safely complete! :)")
+        if self._OWN_CONTEXT:
+            self._ZMQ_CONTEXT.destroy(0)
+            print("\n++ [KERNEL] ZeroMQ Context Terminated.. shut down safely complete! :)")
+        else:
+            for _socket in (self._PUSH_SOCKET, self._PULL_SOCKET, self._SUB_SOCKET):
+                _socket.close(0)
+            print("\n++ [KERNEL] Sockets closed.. shut down safely complete! :)")
         
     ##########################################################################
     
@@ -230,11 +394,105 @@ class DWX_ZeroMQ_Connector():
         if self._PUSH_SOCKET_STATUS['state'] == True:
             try:
                 _socket.send_string(_data, zmq.DONTWAIT)
+                self._metrics._counts['push_messages'] += 1
+                self._metrics._counts['push_bytes'] += len(_data)
+                return True
             except zmq.error.Again:
                 print("\nResource timeout.. please try again.")
                 sleep(self._sleep_delay)
         else:
             print('\n[KERNEL] NO HANDSHAKE ON PUSH SOCKET.. Cannot SEND data')
+        
+        self._metrics._counts['push_dropped'] += 1
+        
+        return False
+      
+    ##########################################################################
+    
+    """
+    Function to send a command whose response can be awaited.
+    
+    Returns a concurrent.futures.Future resolved with the response dict as 
+    soon as it arrives on the PULL socket. If _tagged, the request id is 
+    appended as the last field so the EA can echo it back as '_request_id'.
+    """
+    def _DWX_ZMQ_SEND_REQUEST_(self, _msg, _action, _ticket=None, _symbol=None,
+                               _command=None, _tagged=True):
+        
+        _request = self._requests._new_request_(_action, _ticket, _symbol, _command)
+        
+        if _tagged:
+            _msg = "{};{}".format(_msg, _request._request_id)
+        
+        # Queued (waits for a free slot in the window), or sent at once
+        if self._send_queue is not None:
+            if not self._send_queue._put_(_msg, _request):
+                self._requests._discard_(_request)
+        
+        # Send via PUSH Socket (stamped first: the response may beat the return)
+        else:
+            _request._pushed_at = perf_counter()
+            
+            if not self.remote_send(self._PUSH_SOCKET, _msg):
+                self._requests._discard_(_request)
+        
+        return _request._future
+    
+    ##########################################################################
+    
+    """
+    Function used by the send queue's thread to send one command, waiting 
+    up to _timeout ms for room on the PUSH socket. Returns False if not sent.
+    """
+    def _DWX_ZMQ_Push_(self, _msg, _timeout=100):
+        
+        if self._PUSH_SOCKET_STATUS['state'] != True:
+            sleep(_timeout / 1000)
+            return False
+        
+        if not self._PUSH_SOCKET.poll(_timeout, zmq.POLLOUT):
+            return False
+        
+        try:
+            self._PUSH_SOCKET.send_string(_msg, zmq.DONTWAIT)
+            self._metrics._counts['push_messages'] += 1
+            self._metrics._counts['push_bytes'] += len(_msg)
+            return True
+        except zmq.error.Again:
+            return False
+    
+    """
+    Send queue stats when _send_window is set: {'depth', 'max_depth', 
+    'in_flight', 'window', 'queued', 'sent', 'rejected', 'send_retries', 
+    'mean_wait', 'max_wait'} (waits in seconds)
+    """
+    def _get_send_stats_(self):
+        
+        if self._send_queue is None:
+            return {}
+        
+        return self._send_queue._get_stats_()
+    
+    ##########################################################################
+    
+    """
+    Wait up to _timeout seconds for a command's Future. Returns the response 
+    dict, or None if it timed out or the command could not be sent.
+    """
+    def _wait_response_(self, _future, _timeout=1.0):
+        
+        if _future is None:
+            return None
+        
+        try:
+            return _future.result(timeout=_timeout)
+        # Not the builtin TimeoutError before Python 3.11
+        except FutureTimeoutError:
+            self._requests._abandon_(_future)
+        except Exception:
+            pass
+        
+        return None
       
     ##########################################################################
     
@@ -292,21 +550,23 @@ class DWX_ZeroMQ_Connector():
             _order = self._generate_default_order_dict()
         
         # Execute
-        self._DWX_MTX_SEND_COMMAND_(**_order)
+        return self._DWX_MTX_SEND_COMMAND_(**_order)
         
     # MODIFY ORDER
     # _SL and _TP given in points. _price is only used for pending orders. 
     def _DWX_MTX_MODIFY_TRADE_BY_TICKET_(self, _ticket, _SL, _TP, _price=0):
         
         try:
-            self.temp_order_dict['_action'] = 'MODIFY'
-            self.temp_order_dict['_ticket'] = _ticket
-            self.temp_order_dict['_SL'] = _SL
-            self.temp_order_dict['_TP'] = _TP
-            self.temp_order_dict['_price'] = _price
+            # Per-call copy, so concurrent callers don't overwrite each other's fields
+            _order = dict(self.temp_order_dict)
+            _order['_action'] = 'MODIFY'
+            _order['_ticket'] = _ticket
+            _order['_SL'] = _SL
+            _order['_TP'] = _TP
+            _order['_price'] = _price
             
             # Execute
-            self._DWX_MTX_SEND_COMMAND_(**self.temp_order_dict)
+            return self._DWX_MTX_SEND_COMMAND_(**_order)
             
         except KeyError:
             print("[ERROR] Order Ticket {} not found!".format(_ticket))
@@ -315,11 +575,12 @@ class DWX_ZeroMQ_Connector():
     def _DWX_MTX_CLOSE_TRADE_BY_TICKET_(self, _ticket):
         
         try:
-            self.temp_order_dict['_action'] = 'CLOSE'
-            self.temp_order_dict['_ticket'] = _ticket
+            _order = dict(self.temp_order_dict)
+            _order['_action'] = 'CLOSE'
+            _order['_ticket'] = _ticket
             
             # Execute
-            self._DWX_MTX_SEND_COMMAND_(**self.temp_order_dict)
+            return self._DWX_MTX_SEND_COMMAND_(**_order)
             
         except KeyError:
             print("[ERROR] Order Ticket {} not found!".format(_ticket))
@@ -328,12 +589,13 @@ class DWX_ZeroMQ_Connector():
     def _DWX_MTX_CLOSE_PARTIAL_BY_TICKET_(self, _ticket, _lots):
         
         try:
-            self.temp_order_dict['_action'] = 'CLOSE_PARTIAL'
-            self.temp_order_dict['_ticket'] = _ticket
-            self.temp_order_dict['_lots'] = _lots
+            _order = dict(self.temp_order_dict)
+            _order['_action'] = 'CLOSE_PARTIAL'
+            _order['_ticket'] = _ticket
+            _order['_lots'] = _lots
             
             # Execute
-            self._DWX_MTX_SEND_COMMAND_(**self.temp_order_dict)
+            return self._DWX_MTX_SEND_COMMAND_(**_order)
             
         except KeyError:
             print("[ERROR] Order Ticket {} not found!".format(_ticket))
@@ -342,11 +604,12 @@ class DWX_ZeroMQ_Connector():
     def _DWX_MTX_CLOSE_TRADES_BY_MAGIC_(self, _magic):
         
         try:
-            self.temp_order_dict['_action'] = 'CLOSE_MAGIC'
-            self.temp_order_dict['_magic'] = _magic
+            _order = dict(self.temp_order_dict)
+            _order['_action'] = 'CLOSE_MAGIC'
+            _order['_magic'] = _magic
             
             # Execute
-            self._DWX_MTX_SEND_COMMAND_(**self.temp_order_dict)
+            return self._DWX_MTX_SEND_COMMAND_(**_order)
             
         except KeyError:
             pass
@@ -355,10 +618,11 @@ class DWX_ZeroMQ_Connector():
     def _DWX_MTX_CLOSE_ALL_TRADES_(self):
         
         try:
-            self.temp_order_dict['_action'] = 'CLOSE_ALL'
+            _order = dict(self.temp_order_dict)
+            _order['_action'] = 'CLOSE_ALL'
             
             # Execute
-            self._DWX_MTX_SEND_COMMAND_(**self.temp_order_dict)
+            return self._DWX_MTX_SEND_COMMAND_(**_order)
             
         except KeyError:
             pass
@@ -367,14 +631,109 @@ class DWX_ZeroMQ_Connector():
     def _DWX_MTX_GET_ALL_OPEN_TRADES_(self):
         
         try:
-            self.temp_order_dict['_action'] = 'GET_OPEN_TRADES'
+            _order = dict(self.temp_order_dict)
+            _order['_action'] = 'GET_OPEN_TRADES'
                         
             # Execute
-            self._DWX_MTX_SEND_COMMAND_(**self.temp_order_dict)
+            return self._DWX_MTX_SEND_COMMAND_(**_order)
             
         except KeyError:
             pass
     
+    # GET OPEN TRADES CHANGED since the order cache's last delta (all of 
+    # them the first time, or after the EA restarted): '_trades' has the 
+    # orders added or changed, '_removed' the tickets no longer open. The 
+    # order cache merges the response.
+    def _DWX_MTX_GET_OPEN_TRADES_DELTA_(self):
+        
+        _epoch, _version = (0, 0) if self._Orders_DB is None else self._Orders_DB._sync_state_()
+        
+        try:
+            _order = dict(self.temp_order_dict)
+            _order['_action'] = 'GET_OPEN_TRADES_DELTA'
+            _order['_comment'] = _epoch
+            _order['_ticket'] = _version
+            
+            # Execute
+            return self._DWX_MTX_SEND_COMMAND_(**_order)
+            
+        except KeyError:
+            pass
+    
+    # GET OPEN TRADES (or only the changes, with _order_sync_delta), if the 
+    # order cache is due a sync: older than _max_age seconds (default 
+    # _order_sync_interval), never synced, or an order was partially closed 
+    # since. Returns None if it is current.
+    def _DWX_MTX_SYNC_OPEN_TRADES_(self, _max_age=None):
+        
+        if self._Orders_DB is None:
+            return self._DWX_MTX_GET_ALL_OPEN_TRADES_()
+        
+        if self._Orders_DB._stale_(_max_age):
+            if self._order_sync_delta:
+                return self._DWX_MTX_GET_OPEN_TRADES_DELTA_()
+            
+            return self._DWX_MTX_GET_ALL_OPEN_TRADES_()
+        
+        return None
+    
+    """
+    Open orders from the order cache, without asking MetaTrader: 
+    {TICKET: {'_magic', '_symbol', '_lots', '_type', '_open_price', 
+    '_open_time', '_SL', '_TP', '_pnl', '_comment'}}, as GET_OPEN_TRADES 
+    returns them, for those matching all of _magic, _symbol and _comment 
+    given. Orders this connector opened, modified or closed are current; 
+    others (and SL / TP exits) as of the last GET_OPEN_TRADES(_DELTA) 
+    response.
+    """
+    def _get_open_orders_(self, _magic=None, _symbol=None, _comment=None):
+        
+        if self._Orders_DB is None:
+            return {}
+        
+        return self._Orders_DB._find_(_magic, _symbol, _comment)
+    
+    def _get_order_cache_stats_(self):
+        
+        if self._Orders_DB is None:
+            return {}
+        
+        return self._Orders_DB._get_stats_()
+    
+    # BATCH OF ORDERS
+    # _orders: order dicts as for _DWX_MTX_SEND_COMMAND_(), with '_action' 
+    # OPEN, MODIFY, CLOSE or CLOSE_PARTIAL (missing fields take the defaults). 
+    # All are sent in one message and run by the EA in one timer event. The 
+    # response's '_responses' holds one result per order, in order, each as 
+    # the single command would have returned it.
+    def _DWX_MTX_SEND_BATCH_(self, _orders):
+        
+        _fields = []
+        _commands = []
+        
+        for _order in _orders:
+            
+            _command = dict(self.temp_order_dict)
+            _command.update(_order)
+            
+            if _command['_action'] not in _BATCH_ACTIONS:
+                raise ValueError('Unsupported batch action: {}'.format(_command['_action']))
+            
+            _fields.append("{};{};{};{};{};{};{};{};{};{}".format(_command['_action'], _command['_type'],
+                                                                  _command['_symbol'], _command['_price'],
+                                                                  _command['_SL'], _command['_TP'],
+                                                                  _command['_comment'], _command['_lots'],
+                                                                  _command['_magic'], _command['_ticket']))
+            _commands.append(_command)
+        
+        if len(_fields) == 0:
+            raise ValueError('Empty batch')
+        
+        _msg = "BATCH;{};{}".format(len(_fields), ";".join(_fields))
+        
+        # Send via PUSH Socket
+        return self._DWX_ZMQ_SEND_REQUEST_(_msg, 'BATCH', _command=_commands)
+    
     # DEFAULT ORDER DICT
     def _generate_default_order_dict(self):
         return({'_action': 'OPEN',
@@ -409,7 +768,156 @@ class DWX_ZeroMQ_Connector():
                                      _end)
 
         # Send via PUSH Socket
-        self.remote_send(self._PUSH_SOCKET, _msg)
+        return self._DWX_ZMQ_SEND_REQUEST_(_msg, 'HIST', _symbol=_symbol)
+    
+    ##########################################################################
+    
+    """
+    Function to download a large HIST range as consecutive time chunks of 
+    _chunk_bars bars each, keeping up to _max_in_flight requests queued at 
+    MetaTrader so it builds the next chunk while this side decodes the last.
+    
+    Each chunk is converted to a BAR_DTYPE array as it arrives, and chunks are 
+    reassembled in order. _progress(_done, _total, _bars) is called for each 
+    chunk, in order. Chunks that can't be sent, or get no response within 
+    _timeout seconds, are retried up to _retries times.
+    
+    Chunks are spans of calendar time, so those inside a weekend or holiday 
+    are answered without '_data'. Such a chunk is empty if chunks before and 
+    after it returned bars; otherwise it is retried, as MetaTrader may still 
+    be loading the history. If it still has no data, it is empty too when 
+    another chunk returned bars (before the symbol's history, or a closed 
+    market at either end). Only when no chunk returned any bars are their 
+    (START, END) seconds appended to _gaps if given, else TimeoutError is 
+    raised.
+    
+    Returns a BAR_DTYPE array of all bars between _start and _end.
+    """
+    def _DWX_MTX_SEND_HIST_REQUEST_CHUNKED_(self,
+                                         _symbol='EURUSD',
+                                         _timeframe=1440,
+                                         _start='2020.01.01 00:00:00',
+                                         _end=None,
+                                         _chunk_bars=10000,
+                                         _max_in_flight=4,
+                                         _timeout=60,
+                                         _retries=3,
+                                         _progress=None,
+                                         _gaps=None):
+        
+        _minutes = TIMEFRAMES.get(_timeframe, _timeframe)
+        _start = _to_seconds_(_start)
+        _end = _to_seconds_(Timestamp.now() if _end is None else _end)
+        
+        # [(START, END)], each ending 1s before the next starts
+        _span = _chunk_bars * _minutes * 60
+        _chunks = [(_t, min(_t + _span - 1, _end)) for _t in range(_start, _end + 1, _span)]
+        
+        _in_flight = {}     # {FUTURE: (CHUNK, SENT_AT)}
+        _received = {}      # {CHUNK: BARS}, waiting for earlier chunks
+        _with_bars = []     # Chunks that returned bars
+        _no_data = []       # Chunks still without data after _retries
+        _to_send = deque(range(len(_chunks)))
+        _attempts = [0] * len(_chunks)
+        _last_sent = perf_counter()
+        _parts = []
+        
+        while len(_parts) < len(_chunks):
+            
+            # Top up the pipeline (retried chunks are at the front) while the
+            # PUSH socket (SNDHWM=1) can take another message. With a send 
+            # queue, its thread waits for room instead.
+            while (len(_in_flight) < _max_in_flight and len(_to_send) > 0
+                   and (self._send_queue is not None or self._PUSH_SOCKET.poll(0, zmq.POLLOUT))):
+                
+                _chunk = _to_send[0]
+                _future = self._DWX_MTX_SEND_HIST_REQUEST_(_symbol, _minutes,
+                                                           _format_time_(_chunks[_chunk][0]),
+                                                           _format_time_(_chunks[_chunk][1]))
+                
+                # PUSH socket full (SNDHWM=1): try again once a response is in
+                if _future.cancelled():
+                    break
+                
+                _to_send.popleft()
+                _in_flight[_future] = (_chunk, perf_counter())
+                _last_sent = perf_counter()
+            
+            if len(_in_flight) == 0:
+                if perf_counter() - _last_sent > _timeout:
+                    raise TimeoutError('Could not send HIST chunk {} of {} for {}s'.format(
+                        _to_send[0] + 1, len(_chunks), _timeout))
+                sleep(self._sleep_delay)
+                continue
+            
+            _done, _ = wait(list(_in_flight), timeout=min(_timeout, 1.0),
+                            return_when=FIRST_COMPLETED)
+            
+            for _future in _done:
+                
+                _chunk, _ = _in_flight.pop(_future)
+                
+                if _future.cancelled() or _future.exception() is not None:
+                    self._DWX_MTX_Retry_Chunk_(_chunk, _attempts, _retries, _to_send)
+                    continue
+                
+                _response = _future.result()
+                
+                if '_data' not in _response:
+                    
+                    # Closed market between chunks with bars
+                    if (len(_with_bars) > 0 and min(_with_bars) < _chunk < max(_with_bars)):
+                        _received[_chunk] = np.zeros(0, dtype=BAR_DTYPE)
+                    
+                    elif _attempts[_chunk] >= _retries:
+                        _no_data.append(_chunk)
+                        _received[_chunk] = np.zeros(0, dtype=BAR_DTYPE)
+                    
+                    else:
+                        self._DWX_MTX_Retry_Chunk_(_chunk, _attempts, _retries, _to_send)
+                    continue
+                
+                _received[_chunk] = _hist_to_bars_(_response['_data'])
+                _with_bars.append(_chunk)
+            
+            # Requests that got no response in time
+            _now = perf_counter()
+            
+            for _future, (_chunk, _sent_at) in list(_in_flight.items()):
+                if _now - _sent_at > _timeout:
+                    del _in_flight[_future]
+                    self._requests._abandon_(_future)
+                    self._DWX_MTX_Retry_Chunk_(_chunk, _attempts, _retries, _to_send)
+            
+            # Hand over completed chunks in order
+            while len(_parts) in _received:
+                _parts.append(_received.pop(len(_parts)))
+                
+                if _progress is not None:
+                    _progress(len(_parts), len(_chunks), _parts[-1])
+        
+        if len(_no_data) > 0 and len(_with_bars) == 0:
+            
+            if _gaps is None:
+                raise TimeoutError('No data for HIST chunk {} after {} attempts'.format(
+                    min(_no_data) + 1, _retries + 1))
+            
+            _gaps.extend(_chunks[_chunk] for _chunk in sorted(_no_data))
+        
+        if len(_parts) == 0:
+            return np.zeros(0, dtype=BAR_DTYPE)
+        
+        return np.concatenate(_parts)
+    
+    def _DWX_MTX_Retry_Chunk_(self, _chunk, _attempts, _retries, _to_send):
+        
+        _attempts[_chunk] += 1
+        
+        if _attempts[_chunk] > _retries:
+            raise TimeoutError('No response to HIST chunk {} after {} attempts'.format(
+                _chunk + 1, _attempts[_chunk]))
+        
+        _to_send.appendleft(_chunk)
     
     
     ##########################################################################
@@ -418,13 +926,16 @@ class DWX_ZeroMQ_Connector():
     MetaTrader for real-time price updates
     """
     def _DWX_MTX_SEND_TRACKPRICES_REQUEST_(self,
-                                 _symbols=['EURUSD']):
-        _msg = 'TRACK_PRICES'
+                                 _symbols=['EURUSD'],
+                                 _binary=False):
+        
+        # _binary=True: ticks arrive as packed records (DWX_ZMQ_Binary_Feed)
+        _msg = 'TRACK_PRICES_BIN' if _binary else 'TRACK_PRICES'
         for s in _symbols:
           _msg = _msg + ";{}".format(s)
 
-        # Send via PUSH Socket
-        self.remote_send(self._PUSH_SOCKET, _msg)
+        # Send via PUSH Socket (untagged, the EA counts trailing fields as symbols)
+        return self._DWX_ZMQ_SEND_REQUEST_(_msg, 'TRACK_PRICES', _tagged=False)
     
     
     ##########################################################################
@@ -433,13 +944,16 @@ class DWX_ZeroMQ_Connector():
     MetaTrader for OHLC
     """
     def _DWX_MTX_SEND_TRACKRATES_REQUEST_(self,
-                                 _instruments=[('EURUSD_M1', 'EURUSD',1)]):
-        _msg = 'TRACK_RATES'                                 
+                                 _instruments=[('EURUSD_M1', 'EURUSD',1)],
+                                 _binary=False):
+        
+        # _binary=True: bars arrive as packed records (DWX_ZMQ_Binary_Feed)
+        _msg = 'TRACK_RATES_BIN' if _binary else 'TRACK_RATES'
         for i in _instruments:
           _msg = _msg + ";{};{}".format(i[1], i[2])
           
-        # Send via PUSH Socket
-        self.remote_send(self._PUSH_SOCKET, _msg)
+        # Send via PUSH Socket (untagged, the EA counts trailing fields as instruments)
+        return self._DWX_ZMQ_SEND_REQUEST_(_msg, 'TRACK_RATES', _tagged=False)
     
     
     ##########################################################################
@@ -461,7 +975,14 @@ class DWX_ZeroMQ_Connector():
                                                          _ticket)
         
         # Send via PUSH Socket
-        self.remote_send(self._PUSH_SOCKET, _msg)
+        return self._DWX_ZMQ_SEND_REQUEST_(_msg, _action,
+                                           _ticket=(_ticket if _action in ('MODIFY', 'CLOSE', 'CLOSE_PARTIAL') else None),
+                                           _symbol=_symbol,
+                                           _command={'_action': _action, '_type': _type,
+                                                     '_symbol': _symbol, '_price': _price,
+                                                     '_SL': _SL, '_TP': _TP, '_comment': _comment,
+                                                     '_lots': _lots, '_magic': _magic,
+                                                     '_ticket': _ticket})
         
         """
          compArray[0] = TRADE or DATA
@@ -489,6 +1010,7 @@ class DWX_ZeroMQ_Connector():
          compArray[8] = Lots
          compArray[9] = Magic Number
          compArray[10] = Ticket Number (MODIFY/CLOSE)
+         compArray[11] = Request ID (echoed back as '_request_id')
          """
         # pass
     
@@ -508,6 +1030,8 @@ class DWX_ZeroMQ_Connector():
             
             sockets = dict(self._poller.poll(poll_timeout))
             
+            _woken_at = perf_counter()
+            
             # Process response to commands sent to MetaTrader
             if self._PULL_SOCKET in sockets and sockets[self._PULL_SOCKET] == zmq.POLLIN:
                 
@@ -519,46 +1043,10 @@ class DWX_ZeroMQ_Connector():
                         
                         # If data is returned, store as pandas Series
                         if msg != '' and msg != None:
-                            
-                            try: 
-                                _data = eval(msg)
-                                if '_action' in _data and _data['_action'] == 'HIST':
-                                    _symbol = _data['_symbol']
-                                    if '_data' in _data.keys():
-                                        if _symbol not in self._History_DB.keys():
-                                            self._History_DB[_symbol] = {}
-                                        self._History_DB[_symbol] = _data['_data']
-                                    else:
-                                        print('No data found. MT4 often needs multiple requests when accessing data of symbols without open charts.')
-                                        print('message: ' + msg)
-                                
-                                # Handling of Account Information messages
-                                elif '_action' in _data and _data['_action'] == 'GET_ACCOUNT_INFORMATION':
-                                    account_number = _data['account_number']        #Use Account Number as Key in Account_info_DB dict
-                                    if '_data' in _data.keys():
-                                        if account_number not in self.account_info_DB.keys():
-                                            self.account_info_DB[account_number] = []
-                                        self.account_info_DB[account_number] += _data['_data']    
-
-                                # invokes data handlers on pull port
-                                for hnd in self._pulldata_handlers:
-                                    hnd.onPullData(_data)
-                                
-                                self._thread_data_output = _data
-                                if self._verbose:
-                                    print(_data) # default logic
-                                    
-                            except Exception as ex:
-                                _exstr = "Exception Type {0}. Args:\n{1!r}"
-                                _msg = _exstr.format(type(ex).__name__, ex.args)
-                                print(_msg)
+                            self._DWX_ZMQ_Process_Pull_Data_(msg)
                    
                     except zmq.error.Again:
                         pass # resource temporarily unavailable, nothing to print
-                    except ValueError:
-                        pass # No data returned, passing iteration.
-                    except UnboundLocalError:
-                        pass # _symbol may sometimes get referenced before being assigned.
                 
                 else:
                     print('\r[KERNEL] NO HANDSHAKE on PULL SOCKET.. Cannot READ data.', end='', flush=True)
@@ -567,49 +1055,467 @@ class DWX_ZeroMQ_Connector():
             if self._SUB_SOCKET in sockets and sockets[self._SUB_SOCKET] == zmq.POLLIN:
                 
                 try:
-                    msg = self._SUB_SOCKET.recv_string(zmq.DONTWAIT)
-                    
-                    if msg != "":
+                    self._DWX_ZMQ_Recv_Sub_(string_delimiter)
 
-                        _timestamp = str(Timestamp.now('UTC'))[:-6]
-                        _symbol, _data = msg.split(self._main_string_delimiter)
-                        if len(_data.split(string_delimiter)) == 2:
-                            _bid, _ask = _data.split(string_delimiter)   
-                                                                   
+                except zmq.error.Again:
+                    pass # resource temporarily unavailable, nothing to print
+            
+            if len(sockets) > 0:
+                self._metrics._record_poll_(perf_counter() - _woken_at)
+                    
+        print("\n++ [KERNEL] _DWX_ZMQ_Poll_Data_() Signing Out ++")
+                
+    ##########################################################################
+    
+    """
+    Event-driven alternative to _DWX_ZMQ_Poll_Data_(): blocks only in the 
+    poller and, on every wakeup, drains all pending PULL and SUB messages 
+    (up to _drain_batch per socket) instead of reading one message per 
+    socket and sleeping in between.
+    """
+    
+    def _DWX_ZMQ_Drain_Data_(self, 
+                            string_delimiter=';',
+                            poll_timeout=1000):
+        
+        while self._ACTIVE:
+            
+            sockets = dict(self._poller.poll(poll_timeout))
+            
+            _woken_at = perf_counter()
+            
+            _pull_count = 0
+            _sub_count = 0
+            
+            # Process all queued responses to commands sent to MetaTrader
+            if self._PULL_SOCKET in sockets and sockets[self._PULL_SOCKET] == zmq.POLLIN:
+                
+                if self._PULL_SOCKET_STATUS['state'] == True:
+                    
+                    while _pull_count < self._drain_batch:
+                        try:
+                            msg = self._PULL_SOCKET.recv_string(zmq.DONTWAIT)
+                        except zmq.error.Again:
+                            break # queue drained
                         
-                            if self._verbose:
-                                print("\n[" + _symbol + "] " + _timestamp + " (" + _bid + "/" + _ask + ") BID/ASK")                    
+                        _pull_count += 1
+                        
+                        if msg != '':
+                            self._DWX_ZMQ_Process_Pull_Data_(msg)
+                
+                else:
+                    print('\r[KERNEL] NO HANDSHAKE on PULL SOCKET.. Cannot READ data.', end='', flush=True)
                     
-                            # Update Market Data DB
-                            if _symbol not in self._Market_Data_DB.keys():
-                                self._Market_Data_DB[_symbol] = {}
-                            
-                            self._Market_Data_DB[_symbol][_timestamp] = (float(_bid), float(_ask))
+                    # Nothing was read, so the poller would return immediately.
+                    sleep(self._sleep_delay)
+            
+            # Process all queued market data from MetaTrader
+            if self._SUB_SOCKET in sockets and sockets[self._SUB_SOCKET] == zmq.POLLIN:
+                
+                while _sub_count < self._drain_batch:
+                    try:
+                        self._DWX_ZMQ_Recv_Sub_(string_delimiter)
+                    except zmq.error.Again:
+                        break # queue drained
+                    
+                    _sub_count += 1
+            
+            if _pull_count > 0 or _sub_count > 0:
+                self._DWX_ZMQ_Update_Drain_Stats_(_pull_count, _sub_count)
+            
+            if len(sockets) > 0:
+                self._metrics._record_poll_(perf_counter() - _woken_at)
+                    
+        print("\n++ [KERNEL] _DWX_ZMQ_Drain_Data_() Signing Out ++")
+    
+    ##########################################################################
+    
+    def _DWX_ZMQ_Update_Drain_Stats_(self, _pull_count, _sub_count):
+        
+        _batch = _pull_count + _sub_count
+        
+        self._drain_stats['wakeups'] += 1
+        self._drain_stats['pull_messages'] += _pull_count
+        self._drain_stats['sub_messages'] += _sub_count
+        self._drain_stats['last_batch'] = _batch
+        
+        if _batch > self._drain_stats['max_batch']:
+            self._drain_stats['max_batch'] = _batch
+            
+        if _pull_count >= self._drain_batch or _sub_count >= self._drain_batch:
+            self._drain_stats['capped_wakeups'] += 1
+        
+        if self._verbose:
+            print('\n[KERNEL] Drained {} PULL / {} SUB messages'.format(_pull_count, _sub_count))
+    
+    ##########################################################################
+    
+    """
+    Messages drained per wakeup when _drain=True.
+    """
+    def _get_drain_stats_(self):
+        
+        _stats = dict(self._drain_stats)
+        
+        if _stats['wakeups'] > 0:
+            _stats['mean_batch'] = (_stats['pull_messages'] + _stats['sub_messages']) / _stats['wakeups']
+        else:
+            _stats['mean_batch'] = 0.0
+            
+        return _stats
+    
+    ##########################################################################
+    
+    """
+    Per-handler queue stats when _dispatch_mode is set: {HANDLER_NAME: 
+    {'submitted', 'completed', 'dropped', 'errors', 'depth', 'max_depth'}}
+    """
+    def _get_dispatch_stats_(self):
+        
+        if self._dispatcher is None:
+            return {}
+        
+        return self._dispatcher._get_stats_()
+    
+    ##########################################################################
+    
+    """
+    Function to process a single response (PULL) from MetaTrader
+    """
+    def _DWX_ZMQ_Process_Pull_Data_(self, msg):
+        
+        _received_at = perf_counter()
+        
+        self._metrics._counts['pull_messages'] += 1
+        self._metrics._counts['pull_bytes'] += len(msg)
+        
+        # As received, so responses that fail to decode are kept too
+        if self._journal is not None:
+            self._journal._write_response_(msg)
+        
+        try: 
+            _data = _DWX_ZMQ_DECODE_(msg)
+            if '_action' in _data and _data['_action'] == 'HIST':
+                _symbol = _data['_symbol']
+                if '_data' in _data.keys():
+                    if _symbol not in self._History_DB.keys():
+                        self._History_DB[_symbol] = {}
+                    self._History_DB[_symbol] = _data['_data']
+                else:
+                    print('No data found. MT4 often needs multiple requests when accessing data of symbols without open charts.')
+                    print('message: ' + msg)
+            
+            # Handling of Account Information messages
+            elif '_action' in _data and _data['_action'] == 'GET_ACCOUNT_INFORMATION':
+                account_number = _data['account_number']        #Use Account Number as Key in Account_info_DB dict
+                if '_data' in _data.keys():
+                    if account_number not in self.account_info_DB.keys():
+                        self.account_info_DB[account_number] = []
+                    self.account_info_DB[account_number] += _data['_data']    
 
-                        elif len(_data.split(string_delimiter)) == 8:
-                            _time, _open, _high, _low, _close, _tick_vol, _spread, _real_vol = _data.split(string_delimiter)
-                            if self._verbose:
-                                print("\n[" + _symbol + "] " + _timestamp + " (" + _time + "/" + _open + "/" + _high + "/" + _low + "/" + _close + "/" + _tick_vol + "/" + _spread + "/" + _real_vol + ") TIME/OPEN/HIGH/LOW/CLOSE/TICKVOL/SPREAD/VOLUME")                    
-                            # Update Market Rate DB
-                            if _symbol not in self._Market_Data_DB.keys():
-                                self._Market_Data_DB[_symbol] = {}
-                            self._Market_Data_DB[_symbol][_timestamp] = (int(_time), float(_open), float(_high), float(_low), float(_close), int(_tick_vol), int(_spread), int(_real_vol))
+            self._thread_data_output = _data
+            
+            # Wake up whoever is waiting on this response, once the
+            # order cache reflects it
+            _request = self._requests._resolve_(
+                _data, None if self._Orders_DB is None else self._Orders_DB._apply_)
+            
+            if _request is not None and self._latency is not None:
+                self._latency._record_command_(_request._action, _received_at - _request._pushed_at)
+            
+        except Exception as ex:
+            self._metrics._counts['pull_parse_errors'] += 1
+            _exstr = "Exception Type {0}. Args:\n{1!r}"
+            _msg = _exstr.format(type(ex).__name__, ex.args)
+            print(_msg)
+            return
+            
+        # invokes data handlers on pull port (responses stay in order)
+        for hnd in self._pulldata_handlers:
+            if self._dispatcher is not None:
+                self._dispatcher._submit_(hnd.onPullData, 'PULL', _data)
+            else:
+                self._DWX_ZMQ_Call_Handler_(hnd.onPullData, _data)
+        
+        if self._verbose:
+            print(_data) # default logic
+    
+    ##########################################################################
+    
+    def _DWX_ZMQ_Call_Handler_(self, _handler, _data):
+        
+        # A failing handler is counted and reported, and doesn't stop the others
+        try:
+            _handler(_data)
+        except Exception as ex:
+            self._metrics._counts['handler_errors'] += 1
+            _exstr = "Exception Type {0}. Args:\n{1!r}"
+            _msg = _exstr.format(type(ex).__name__, ex.args)
+            print(_msg)
+    
+    ##########################################################################
+    
+    """
+    Function to read and process one SUB message, raising zmq.error.Again if 
+    there is none. Binary messages (TOPIC, NUL, RECORD) are decoded in place; 
+    text messages never contain a NUL.
+    """
+    def _DWX_ZMQ_Recv_Sub_(self, string_delimiter=';'):
+        
+        msg = self._SUB_SOCKET.recv(zmq.DONTWAIT)
+        _end = msg.find(0)
+        
+        self._metrics._counts['sub_messages'] += 1
+        self._metrics._counts['sub_bytes'] += len(msg)
+        
+        if _end < 0:
+            self._DWX_ZMQ_Process_Sub_Data_(msg.decode(), string_delimiter)
+        else:
+            self._DWX_ZMQ_Process_Sub_Binary_(msg, _end)
+    
+    ##########################################################################
+    
+    """
+    Function to process a single market data message (SUB) from MetaTrader
+    """
+    def _DWX_ZMQ_Process_Sub_Data_(self, msg, string_delimiter=';'):
+        
+        try:
+            if msg != "":
 
-                        # invokes data handlers on sub port
-                        for hnd in self._subdata_handlers:
-                            hnd.onSubData(msg)
+                # Parsed once, then shared by the stores and all handlers
+                _item = _DWX_ZMQ_PARSE_SUB_(msg, self._main_string_delimiter, string_delimiter)
+                
+                self._DWX_ZMQ_Route_Sub_Item_(_item, msg)
 
-                except zmq.error.Again:
-                    pass # resource temporarily unavailable, nothing to print
-                except ValueError:
-                    pass # No data returned, passing iteration.
-                except UnboundLocalError:
-                    pass # _symbol may sometimes get referenced before being assigned.
-                    
-        print("\n++ [KERNEL] _DWX_ZMQ_Poll_Data_() Signing Out ++")
+        except (ValueError, UnboundLocalError):
+            self._metrics._counts['sub_parse_errors'] += 1 # malformed message, skipped
+    
+    ##########################################################################
+    
+    """
+    Function to process a single binary market data message (SUB) from 
+    MetaTrader, _end being the position of the NUL after the topic 
+    (see DWX_ZMQ_Binary_Feed)
+    """
+    def _DWX_ZMQ_Process_Sub_Binary_(self, msg, _end=None):
+        
+        try:
+            _item, _seq = _DWX_ZMQ_DECODE_SUB_BINARY_(msg, _end)
+        
+        except ValueError as ex:
+            self._metrics._counts['sub_parse_errors'] += 1
+            if self._verbose:
+                print(ex)
+            return
+        
+        # Records skipped since the last one of this topic (lost to the HWM). 
+        # A lower number means the EA restarted its sequence (new TRACK_*).
+        _last = self._sub_sequence.get(_item[0])
+        self._sub_sequence[_item[0]] = _seq
+        self._sub_sequence_stats['records'] += 1
+        
+        if _last is not None and _seq > _last + 1:
+            self._sub_sequence_stats['gaps'] += 1
+            self._sub_sequence_stats['missed'] += _seq - _last - 1
+        
+        # Binary ticks carry their server time, text ones don't
+        if self._latency is not None and type(_item) is DWX_ZMQ_Tick:
+            self._latency._record_tick_age_(_item.symbol, _DWX_ZMQ_SERVER_TIME_(msg, _end), _item.time)
+        
+        self._DWX_ZMQ_Route_Sub_Item_(_item)
+    
+    ##########################################################################
+    
+    """
+    Binary SUB records received, gaps in their sequence numbers and records 
+    missed in those gaps: {'records', 'gaps', 'missed'}
+    """
+    def _get_sub_sequence_stats_(self):
+        return dict(self._sub_sequence_stats)
+    
+    ##########################################################################
+    
+    """
+    Latency histograms, summarised in milliseconds as {'count', 'min', 
+    'mean', 'p50', 'p90', 'p99', 'p99.9', 'max'}:
+    
+        'commands':         {ACTION: ...} PUSH send to PULL response arrival
+        'tick_age':         {SYMBOL: ...} tick arrival minus its server time 
+                            (binary feed only, see DWX_ZMQ_Latency_Recorder)
+        'tick_handling':    {SYMBOL: ...} tick arrival to stores / handlers done
+        'server_offset':    broker server time minus UTC (seconds)
+    
+    A slow EA timer shows in 'tick_age' and 'commands', slow handlers in 
+    'tick_handling'. Empty if _latency_stats=False.
+    """
+    def _get_latency_stats_(self):
+        
+        if self._latency is None:
+            return {}
+        
+        return self._latency._snapshot_()
+    
+    def _reset_latency_stats_(self):
+        
+        if self._latency is not None:
+            self._latency._reset_()
+    
+    ##########################################################################
+    
+    """
+    Runtime metrics, without _verbose printing:
+    
+        'counters':     messages and bytes per socket (pull, sub, push), 
+                        parse errors (pull, sub), commands dropped on a busy 
+                        PUSH socket, handler exceptions (inline, routed and 
+                        pooled handlers), poll-loop iterations
+        'rates':        messages and bytes per second per socket, since the 
+                        previous call at least 1s before
+        'poll_time':    work done per poll-loop wakeup (ms, as in 
+                        _get_latency_stats_)
+        'stores':       {'market_data', 'rates', 'history', 'account_info'}: 
+                        {'keys', 'rows'} held in each
+        'requests_pending', 'uptime' (s), 'latency' (_get_latency_stats_())
+    
+    Also served in Prometheus text format with _metrics_port.
+    """
+    def _get_metrics_(self):
+        
+        _stats = self._metrics._snapshot_()
+        
+        # Handler errors caught by the router and the dispatcher pool too
+        _stats['counters']['handler_errors'] += self._router._errors + sum(
+            _s['errors'] for _s in self._get_dispatch_stats_().values())
+        
+        _stats['stores'] = {
+            'market_data': {'keys': len(self._Market_Data_DB),
+                            'rows': sum(len(self._Market_Data_DB[_s]) for _s in self._Market_Data_DB)},
+            'rates': {'keys': len(self._Rates_DB),
+                      'rows': sum(len(self._Rates_DB[_k]) for _k in self._Rates_DB)},
+            'history': {'keys': len(self._History_DB),
+                        'rows': sum(len(_v) for _v in list(self._History_DB.values()))},
+            'account_info': {'keys': len(self.account_info_DB),
+                             'rows': sum(len(_v) for _v in list(self.account_info_DB.values()))}}
+        
+        if self._Orders_DB is not None:
+            _stats['stores']['orders'] = {'keys': len(self._Orders_DB._by_symbol),
+                                          'rows': len(self._Orders_DB)}
+        
+        _stats['requests_pending'] = self._requests._pending_count_()
+        _stats['latency'] = self._get_latency_stats_()
+        
+        return _stats
+    
+    def _get_metrics_text_(self):
+        return _DWX_ZMQ_PROMETHEUS_TEXT_(self._get_metrics_(), self._ClientID)
+    
+    ##########################################################################
+    
+    def _DWX_ZMQ_Route_Sub_Item_(self, _item, msg=None):
+        
+        # Stores, conflator, shared ring and handlers of a parsed tick/bar.
+        # msg is the text message, rebuilt for raw handlers if binary (None)
+        try:
+            if type(_item) is DWX_ZMQ_Tick:
+            
+                if self._verbose:
+                    _timestamp = str(Timestamp.now('UTC'))[:-6]
+                    print("\n[" + _item.symbol + "] " + _timestamp + " (" + str(_item.bid) + "/" + str(_item.ask) + ") BID/ASK")                    
+            
+                # Update Market Data DB (stamped with receive time in ns)
+                self._Market_Data_DB._append_(_item.symbol, _item.bid, _item.ask, _item.time)
+                
+                if self._conflator is not None:
+                    self._conflator._update_(_item.symbol, _item)
+                
+                if self._shm_ring is not None:
+                    self._shm_ring._write_(_item)
+                
+                self._router._dispatch_(_item.symbol, _item)
+
+            elif type(_item) is DWX_ZMQ_Bar:
+                if self._verbose:
+                    _timestamp = str(Timestamp.now('UTC'))[:-6]
+                    print("\n[" + _item.instrument + "] " + _timestamp + " (" + "/".join(str(_field) for _field in _item[3:]) + ") TIME/OPEN/HIGH/LOW/CLOSE/TICKVOL/SPREAD/VOLUME")                    
+                # Update Market Rate DB (repeated bars replace the stored one)
+                self._Rates_DB._append_(_item.symbol, _item.timeframe, _item[3:])
+                
+                if self._conflator is not None:
+                    self._conflator._update_(_item.instrument, _item)
+                
+                if self._shm_ring is not None:
+                    self._shm_ring._write_(_item)
+                
+                self._router._dispatch_(_item.instrument, _item)
+
+            if self._journal is not None:
+                self._journal._write_item_(_item)
+            
+            # invokes raw data handlers on sub port
+            if msg is None and len(self._subdata_handlers) > 0:
+                msg = _to_text_(_item, self._string_delimiter, self._main_string_delimiter)
+            
+            for hnd in self._subdata_handlers:
+                if self._dispatcher is not None:
+                    self._dispatcher._submit_(hnd.onSubData, 
+                                              msg if _item is None else _item[0], msg)
+                else:
+                    self._DWX_ZMQ_Call_Handler_(hnd.onSubData, msg)
+            
+            # Arrival (stamped when parsed) to stores and handlers done
+            if self._latency is not None and type(_item) is DWX_ZMQ_Tick:
+                self._latency._record_tick_handling_(_item.symbol, time_ns() - _item.time)
+
+        except (ValueError, UnboundLocalError):
+            self._metrics._counts['sub_parse_errors'] += 1 # fields that don't convert, skipped
                 
     ##########################################################################
     
+    """
+    Function to register _handler(_item) for parsed SUB data of one topic 
+    ('EURUSD', 'EURUSD_M1') or topic pattern ('*', 'EUR*', '*_M1'). 
+    _item is a DWX_ZMQ_Tick or DWX_ZMQ_Bar. Handlers run on the poll thread.
+    This doesn't subscribe the SUB socket, see _DWX_MTX_SUBSCRIBE_MARKETDATA_()
+    """
+    def _DWX_ZMQ_ADD_SUB_HANDLER_(self, _topic, _handler):
+        self._router._register_(_topic, _handler)
+    
+    """
+    Function to remove _handler (or all handlers if None) from _topic
+    """
+    def _DWX_ZMQ_REMOVE_SUB_HANDLER_(self, _topic, _handler=None):
+        self._router._unregister_(_topic, _handler)
+    
+    ##########################################################################
+    
+    """
+    Function to get the SUB data received since _consumer's last call, 
+    conflated to the newest item per topic: {TOPIC: DWX_ZMQ_Tick / DWX_ZMQ_Bar}.
+    Each _consumer name keeps its own position. Waits up to _timeout seconds
+    for an update if there is none (returns at once if _timeout is None).
+    Requires DWX_ZeroMQ_Connector(_conflate=True).
+    """
+    def _DWX_ZMQ_GET_CHANGED_(self, _consumer='default', _timeout=None):
+        
+        if self._conflator is None:
+            raise RuntimeError('Conflation is off, see DWX_ZeroMQ_Connector(_conflate=True)')
+        
+        return self._conflator._changed_(_consumer, _timeout)
+    
+    """
+    Updates delivered vs. skipped per consumer of _DWX_ZMQ_GET_CHANGED_(): 
+    {CONSUMER: {'reads', 'delivered', 'conflated', 'pending'}}
+    """
+    def _get_conflation_stats_(self):
+        
+        if self._conflator is None:
+            return {}
+        
+        return self._conflator._get_stats_()
+    
+    ##########################################################################
+    
     """
     Function to subscribe to given Symbol's BID/ASK feed from MetaTrader
     """
@@ -636,7 +1542,7 @@ class DWX_ZeroMQ_Connector():
     def _DWX_MTX_UNSUBSCRIBE_ALL_MARKETDATA_REQUESTS_(self):
         
         # 31-07-2019 12:22 CEST
-        for _symbol in self._Market_Data_DB.keys():
+        for _symbol in list(self._Market_Data_DB.keys()) + self._Rates_DB._instruments_():
             self._DWX_MTX_UNSUBSCRIBE_MARKETDATA_(_symbol=_symbol)
         
     ##########################################################################
@@ -704,7 +1610,7 @@ class DWX_ZeroMQ_Connector():
     ##########################################################################
     
     def _DWX_ZMQ_HEARTBEAT_(self):
-        self.remote_send(self._PUSH_SOCKET, "HEARTBEAT;")
+        return self._DWX_ZMQ_SEND_REQUEST_("HEARTBEAT;", 'HEARTBEAT', _tagged=False)
         
     ##########################################################################
     ##########################################################################
@@ -713,10 +1619,11 @@ class DWX_ZeroMQ_Connector():
     def _DWX_MTX_GET_ACCOUNT_INFO_(self):
 
         try:
-            self.temp_order_dict['_action'] = 'GET_ACCOUNT_INFO'
+            _order = dict(self.temp_order_dict)
+            _order['_action'] = 'GET_ACCOUNT_INFO'
 
             # Execute
-            self._DWX_MTX_SEND_COMMAND_(**self.temp_order_dict)
+            return self._DWX_MTX_SEND_COMMAND_(**_order)
 
         except Exception as ex:
             _exstr = "Exception Type {0}. Args:\n{1!r}"
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    batch_orders_benchmark.py
+
+    Opens, modifies and closes 100 pending orders against the local EA
+    emulator (run in its own process, as MetaTrader would be), first with
+    one command per order (as performance_test.py does), then with one
+    _DWX_MTX_SEND_BATCH_() per step. The emulator handles one command per
+    16 ms timer event, about the resolution of EventSetMillisecondTimer()
+    on Windows.
+
+    Run from this folder:
+
+        python batch_orders_benchmark.py
+    --
+
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+# Append path for main project folder
+import sys
+sys.path.append('..')
+sys.path.append('../emulator')
+
+import zmq
+from multiprocessing import Process
+from time import perf_counter, sleep
+
+from api.DWX_ZeroMQ_Connector_v2_0_1_RC8 import DWX_ZeroMQ_Connector
+from DWX_ZeroMQ_Server_Emulator import DWX_ZeroMQ_Server_Emulator
+
+_PORTS = {'_PUSH_PORT': 42768, '_PULL_PORT': 42769}
+_N = 100
+_TIMER = 16
+
+##############################################################################
+
+def _run_emulator():
+
+    _emulator = DWX_ZeroMQ_Server_Emulator(_PUB_PORT=42770, _millisecond_timer=_TIMER,
+                                           **_PORTS)._start_()
+
+    while True:
+        sleep(1)
+
+def _pending(_zmq):
+
+    _order = _zmq._generate_default_order_dict()
+    _order.update({'_type': 2, '_price': 1.05, '_SL': 0, '_TP': 0})
+
+    return _order
+
+def _send(_zmq, _command):
+
+    # SNDHWM=1: wait until the PUSH socket can take the command, and for its
+    # response before the next one, as the EA reads one per timer event anyway
+    _zmq._PUSH_SOCKET.poll(10000, zmq.POLLOUT)
+    _response = _zmq._wait_response_(_command(), 10)
+    assert _response is not None
+
+    return _response
+
+##############################################################################
+
+def _one_by_one(_zmq):
+
+    _times = []
+
+    _t0 = perf_counter()
+    _tickets = [_send(_zmq, lambda: _zmq._DWX_MTX_NEW_TRADE_(_pending(_zmq)))['_ticket']
+                for _ in range(_N)]
+    _times.append(perf_counter() - _t0)
+
+    _t0 = perf_counter()
+    for _ticket in _tickets:
+        _send(_zmq, lambda: _zmq._DWX_MTX_MODIFY_TRADE_BY_TICKET_(_ticket, 100, 100))
+    _times.append(perf_counter() - _t0)
+
+    _t0 = perf_counter()
+    for _ticket in _tickets:
+        _send(_zmq, lambda: _zmq._DWX_MTX_CLOSE_TRADE_BY_TICKET_(_ticket))
+    _times.append(perf_counter() - _t0)
+
+    return _times
+
+def _batched(_zmq):
+
+    _times = []
+
+    _t0 = perf_counter()
+    _opened = _send(_zmq, lambda: _zmq._DWX_MTX_SEND_BATCH_([_pending(_zmq) for _ in range(_N)]))
+    _tickets = [_item['_ticket'] for _item in _opened['_responses']]
+    _times.append(perf_counter() - _t0)
+
+    _t0 = perf_counter()
+    _send(_zmq, lambda: _zmq._DWX_MTX_SEND_BATCH_([{'_action': 'MODIFY', '_ticket': _ticket,
+                                                    '_SL': 100, '_TP': 100}
+                                                   for _ticket in _tickets]))
+    _times.append(perf_counter() - _t0)
+
+    _t0 = perf_counter()
+    _closed = _send(_zmq, lambda: _zmq._DWX_MTX_SEND_BATCH_([{'_action': 'CLOSE', '_ticket': _ticket}
+                                                             for _ticket in _tickets]))
+    _times.append(perf_counter() - _t0)
+
+    assert all(_item['_response_value'] == 'SUCCESS' for _item in _closed['_responses'])
+
+    return _times
+
+##############################################################################
+
+if __name__ == "__main__":
+
+    _emulator = Process(target=_run_emulator, daemon=True)
+    _emulator.start()
+
+    _zmq = DWX_ZeroMQ_Connector(_SUB_PORT=42770, _verbose=False, _drain=True, **_PORTS)
+    sleep(1)
+
+    _single = _one_by_one(_zmq)
+    _batch = _batched(_zmq)
+
+    print('\n{} pending orders, EA timer {} ms (ms per order)'.format(_N, _TIMER))
+    print('{:>8} {:>12} {:>8} {:>8}'.format('', 'one by one', 'batch', 'speedup'))
+
+    for _step, _s, _b in zip(('open', 'modify', 'close'), _single, _batch):
+        print('{:>8} {:>12.2f} {:>8.2f} {:>7.0f}x'.format(_step, 1000 * _s / _N, 1000 * _b / _N, _s / _b))
+
+    _zmq._DWX_ZMQ_SHUTDOWN_()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    binary_feed_benchmark.py
+
+    Decoding 100k SUB ticks and bars for 50 symbols, published as text (the
+    default) and in the binary format of TRACK_PRICES_BIN / TRACK_RATES_BIN
+    (api/DWX_ZMQ_Binary_Feed.py):
+
+        text:       _DWX_ZMQ_PARSE_SUB_() on the received string
+        binary:     _DWX_ZMQ_DECODE_SUB_BINARY_() on the received bytes
+        numpy:      one np.frombuffer() over all tick records, for consumers
+                    working on arrays
+
+    then the same text / binary messages through a PUB -> SUB socket pair,
+    received and decoded as the connector's poll thread does. Binary
+    records also carry server time and a sequence number, which text
+    messages don't.
+
+    Run from this folder:
+
+        python binary_feed_benchmark.py
+    --
+
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+# Append path for main project folder
+import sys
+sys.path.append('..')
+
+import zmq
+from threading import Thread
+from time import perf_counter
+
+from api.DWX_ZMQ_Topic_Router import _DWX_ZMQ_PARSE_SUB_
+from api.DWX_ZMQ_Binary_Feed import (_encode_tick_, _encode_bar_, _DWX_ZMQ_DECODE_SUB_BINARY_,
+                                     _DWX_ZMQ_SPLIT_SUB_BINARY_, _DWX_ZMQ_DECODE_TICKS_)
+
+_N = 100000
+_SYMBOLS = ['SYM{:02d}'.format(i) for i in range(50)]
+
+_TICK_TEXT = ['{}:|:{:f};{:f}'.format(_SYMBOLS[i % 50], 1.1 + i * 1e-5, 1.1002 + i * 1e-5)
+              for i in range(_N)]
+_TICK_BIN = [_encode_tick_(_SYMBOLS[i % 50], i % 50, i // 50 + 1, 1700000000000 + i,
+                           1.1 + i * 1e-5, 1.1002 + i * 1e-5)
+             for i in range(_N)]
+
+_BAR_TEXT = ['{}_M1:|:{};{:f};{:f};{:f};{:f};{};{};{}'.format(_SYMBOLS[i % 50], 1700000000 + 60 * i,
+                                                               1.1, 1.2, 1.0, 1.15, 100, 2, 0)
+             for i in range(_N)]
+_BAR_BIN = [_encode_bar_(_SYMBOLS[i % 50] + '_M1', i % 50, i // 50 + 1, (1700000000 + 60 * i) * 1000,
+                         1.1, 1.2, 1.0, 1.15, 100, 2, 0)
+            for i in range(_N)]
+
+##############################################################################
+
+def _decode_only():
+
+    _rows = []
+
+    for _kind, _text, _binary in (('ticks', _TICK_TEXT, _TICK_BIN), ('bars', _BAR_TEXT, _BAR_BIN)):
+
+        _t0 = perf_counter()
+        for msg in _text:
+            _DWX_ZMQ_PARSE_SUB_(msg)
+        _text_time = perf_counter() - _t0
+
+        _t0 = perf_counter()
+        for msg in _binary:
+            _DWX_ZMQ_DECODE_SUB_BINARY_(msg)
+        _binary_time = perf_counter() - _t0
+
+        _rows.append((_kind, _text_time, _binary_time,
+                      sum(len(msg) for msg in _text) / _N,
+                      sum(len(msg) for msg in _binary) / _N))
+
+    _records = [_DWX_ZMQ_SPLIT_SUB_BINARY_(msg)[1] for msg in _TICK_BIN]
+
+    _t0 = perf_counter()
+    _ticks = _DWX_ZMQ_DECODE_TICKS_(_records)
+    _mid = ((_ticks['bid'] + _ticks['ask']) / 2).mean()
+    _numpy_time = perf_counter() - _t0
+
+    assert len(_ticks) == _N and _mid > 0
+
+    print('\nDecode only ({} messages, 50 symbols)'.format(_N))
+    print('{:>6} {:>12} {:>12} {:>8} {:>13} {:>13}'.format('', 'text msg/s', 'binary msg/s',
+                                                          'speedup', 'text bytes', 'binary bytes'))
+
+    for _kind, _text_time, _binary_time, _text_size, _binary_size in _rows:
+        print('{:>6} {:>12.0f} {:>12.0f} {:>7.1f}x {:>13.1f} {:>13.1f}'.format(
+            _kind, _N / _text_time, _N / _binary_time, _text_time / _binary_time,
+            _text_size, _binary_size))
+
+    print('numpy: {:.0f} ticks/s (join records, np.frombuffer, mean mid)'.format(_N / _numpy_time))
+
+##############################################################################
+
+def _publish(_pub, _messages):
+
+    for msg in _messages:
+        _pub.send(msg)
+
+def _over_sockets(_messages):
+
+    _context = zmq.Context()
+
+    _pub = _context.socket(zmq.PUB)
+    _pub.setsockopt(zmq.SNDHWM, 0)
+    _pub.bind('inproc://binary_feed_benchmark')
+
+    _sub = _context.socket(zmq.SUB)
+    _sub.setsockopt(zmq.RCVHWM, 0)
+    _sub.connect('inproc://binary_feed_benchmark')
+    _sub.setsockopt_string(zmq.SUBSCRIBE, '')
+
+    # Wait for the subscription to reach the publisher
+    while True:
+        _pub.send_string('ping')
+        if _sub.poll(10):
+            _sub.recv()
+            break
+
+    _publisher = Thread(target=_publish, args=(_pub, _messages))
+
+    _t0 = perf_counter()
+    _publisher.start()
+
+    # As DWX_ZeroMQ_Connector._DWX_ZMQ_Recv_Sub_()
+    for _ in range(len(_messages)):
+        msg = _sub.recv()
+        _end = msg.find(0)
+
+        if _end < 0:
+            _DWX_ZMQ_PARSE_SUB_(msg.decode())
+        else:
+            _DWX_ZMQ_DECODE_SUB_BINARY_(msg, _end)
+
+    _elapsed = perf_counter() - _t0
+
+    _publisher.join()
+    _context.destroy(0)
+
+    return len(_messages) / _elapsed
+
+##############################################################################
+
+if __name__ == "__main__":
+
+    _decode_only()
+
+    print('\nPUB -> SUB (inproc), receive and decode')
+    print('{:>6} {:>12} {:>12}'.format('', 'text msg/s', 'binary msg/s'))
+
+    for _kind, _text, _binary in (('ticks', _TICK_TEXT, _TICK_BIN), ('bars', _BAR_TEXT, _BAR_BIN)):
+        print('{:>6} {:>12.0f} {:>12.0f}'.format(_kind, _over_sockets([msg.encode() for msg in _text]),
+                                                _over_sockets(_binary)))
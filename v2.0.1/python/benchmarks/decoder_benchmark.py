@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    decoder_benchmark.py
+    
+    Compares decoding PULL responses with eval(), ast.literal_eval() and 
+    _DWX_ZMQ_DECODE_() on HIST responses of 1k, 10k and 100k M1 bars, plus 
+    a GET_OPEN_TRADES response with 500 orders (integer ticket keys).
+    
+    Run from this folder:
+        
+        python decoder_benchmark.py
+    --
+    
+    @author: Darwinex Labs (www.darwinex.com)
+    
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+    
+    Licensed under the BSD 3-Clause License, you may not use this file except 
+    in compliance with the License. 
+    
+    You may obtain a copy of the License at:    
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+# Append path for main project folder
+import sys
+sys.path.append('..')
+
+import ast
+from time import perf_counter
+
+from api.DWX_ZMQ_Decoder import _DWX_ZMQ_DECODE_
+from payloads import hist_response, open_trades_response
+
+##############################################################################
+
+_DECODERS = [('eval', eval),
+             ('ast.literal_eval', ast.literal_eval),
+             ('_DWX_ZMQ_DECODE_', _DWX_ZMQ_DECODE_)]
+
+def _best_of(_func, _msg, _repeat):
+    
+    _best = float('inf')
+    
+    for i in range(_repeat):
+        _t0 = perf_counter()
+        _func(_msg)
+        _best = min(_best, perf_counter() - _t0)
+        
+    return _best
+
+##############################################################################
+
+if __name__ == "__main__":
+    
+    _cases = [('HIST 1k bars', hist_response(1000), 20),
+              ('HIST 10k bars', hist_response(10000), 5),
+              ('HIST 100k bars', hist_response(100000), 3),
+              ('OPEN_TRADES 500', open_trades_response(500), 20)]
+    
+    print('{:<18}{:>10}  '.format('payload', 'size (MB)') 
+          + ''.join('{:>18}'.format(_name) for _name, _ in _DECODERS) 
+          + '{:>10}'.format('speedup'))
+    
+    for _label, _msg, _repeat in _cases:
+        
+        # All decoders must agree with eval()
+        _expected = eval(_msg)
+        assert _DWX_ZMQ_DECODE_(_msg) == _expected, _label
+        
+        _times = [_best_of(_func, _msg, _repeat) for _name, _func in _DECODERS]
+        
+        print('{:<18}{:>10.2f}  '.format(_label, len(_msg) / 1e6) 
+              + ''.join('{:>16.1f}ms'.format(1000 * _t) for _t in _times) 
+              + '{:>9.1f}x'.format(_times[0] / _times[-1]))
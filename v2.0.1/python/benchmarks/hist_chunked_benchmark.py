@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    hist_chunked_benchmark.py
+    
+    Downloads ~6 months of M1 bars from the local EA emulator (run in its own 
+    process, as MetaTrader would be) with one HIST request, then with 
+    _DWX_MTX_SEND_HIST_REQUEST_CHUNKED_() at several pipeline depths. Reports 
+    wall-clock time and peak Python memory allocated while downloading.
+    
+    Run from this folder:
+        
+        python hist_chunked_benchmark.py
+    --
+    
+    @author: Darwinex Labs (www.darwinex.com)
+    
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+    
+    Licensed under the BSD 3-Clause License, you may not use this file except 
+    in compliance with the License. 
+    
+    You may obtain a copy of the License at:    
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+# Append path for main project folder
+import sys
+sys.path.append('..')
+sys.path.append('../emulator')
+
+import tracemalloc
+from multiprocessing import Process
+from time import perf_counter, sleep
+
+from api.DWX_ZeroMQ_Connector_v2_0_1_RC8 import DWX_ZeroMQ_Connector
+from DWX_ZeroMQ_Server_Emulator import DWX_ZeroMQ_Server_Emulator
+
+_PORTS = {'_PUSH_PORT': 42768, '_PULL_PORT': 42769}
+_START, _END = '2019.01.01 00:00:00', '2019.07.01 00:00:00'
+
+##############################################################################
+
+def _run_emulator():
+    
+    _emulator = DWX_ZeroMQ_Server_Emulator(_PUB_PORT=42770, **_PORTS)._start_()
+    
+    while True:
+        sleep(1)
+
+def _measure(_download):
+    
+    # Timed without tracemalloc, which slows down every allocation
+    _t0 = perf_counter()
+    _bars = _download()
+    _elapsed = perf_counter() - _t0
+    
+    tracemalloc.start()
+    _download()
+    _peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    
+    return _bars, _elapsed, _peak
+
+##############################################################################
+
+if __name__ == "__main__":
+    
+    _emulator = Process(target=_run_emulator, daemon=True)
+    _emulator.start()
+    
+    _zmq = DWX_ZeroMQ_Connector(_SUB_PORT=42770, _verbose=False, _drain=True, **_PORTS)
+    sleep(1)
+    
+    def _single():
+        _future = _zmq._DWX_MTX_SEND_HIST_REQUEST_('EURUSD', 1, _START, _END)
+        return _zmq._wait_response_(_future, 120)['_data']
+    
+    _bars, _elapsed, _peak = _measure(_single)
+    
+    print('\n{:<28}{:>10}{:>12}{:>16}'.format('download', 'bars', 'time (s)', 'peak mem (MB)'))
+    print('{:<28}{:>10}{:>12.2f}{:>16.1f}'.format('single HIST', len(_bars), _elapsed, _peak / 1e6))
+    
+    for _chunk_bars in (5000, 20000):
+        for _max_in_flight in (1, 2, 4):
+            
+            _bars, _elapsed, _peak = _measure(
+                lambda: _zmq._DWX_MTX_SEND_HIST_REQUEST_CHUNKED_('EURUSD', 'M1', _START, _END,
+                                                                 _chunk_bars=_chunk_bars,
+                                                                 _max_in_flight=_max_in_flight))
+            
+            print('{:<28}{:>10}{:>12.2f}{:>16.1f}'.format(
+                'chunks of {}, {} in flight'.format(_chunk_bars, _max_in_flight),
+                len(_bars), _elapsed, _peak / 1e6))
+    
+    _zmq._DWX_ZMQ_SHUTDOWN_()
+    _emulator.terminate()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    hot_paths_benchmark.py
+
+    Microbenchmarks of the connector's hot paths, each over payloads in the
+    EA's exact format (payloads.py):
+
+        sub_tick            _DWX_ZMQ_Process_Sub_Data_(): parse + store a tick
+        sub_bar             _DWX_ZMQ_Process_Sub_Data_(): parse + store a bar
+        sub_tick_binary     _DWX_ZMQ_Process_Sub_Binary_(): decode + store a tick
+        pull_execution      _DWX_ZMQ_DECODE_() of an OPEN response
+        pull_open_trades    _DWX_ZMQ_DECODE_() of GET_OPEN_TRADES, 500 orders
+        hist_ingest         _DWX_ZMQ_Process_Pull_Data_() of HIST, 10k bars
+                            (decode + _History_DB)
+        send_command        _DWX_MTX_SEND_COMMAND_(): formatting + request
+                            tracking (the socket send is left out)
+        reporting_trades    DWX_ZMQ_Reporting._get_open_trades_(): DataFrame
+                            of 500 orders, filtered by trader
+
+    Every call is timed on its own. Reported: ops/s (calls / total time),
+    p50 and p99 per call. Results can be saved as JSON and compared with a
+    previous run:
+
+        python hot_paths_benchmark.py --save before.json
+        ... change something ...
+        python hot_paths_benchmark.py --compare before.json
+
+    Run from this folder. --only sub_tick,hist_ingest runs a subset.
+    --
+
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+# Append path for main project folder
+import sys
+sys.path.append('..')
+sys.path.append('../examples/template')
+
+import argparse
+import json
+import platform
+import subprocess
+import numpy as np
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from time import perf_counter
+
+from api.DWX_ZeroMQ_Connector_v2_0_1_RC8 import DWX_ZeroMQ_Connector
+from api.DWX_ZMQ_Decoder import _DWX_ZMQ_DECODE_
+from api.DWX_ZMQ_Binary_Feed import _encode_tick_
+from modules.DWX_ZMQ_Reporting import DWX_ZMQ_Reporting
+from payloads import (tick_messages, bar_messages, hist_response, open_trades_response,
+                      execution_response)
+
+_PORTS = {'_PUSH_PORT': 42768, '_PULL_PORT': 42769, '_SUB_PORT': 42770}
+
+##############################################################################
+
+def _time_calls_(_func, _args, _warmup=100):
+
+    """
+    Call _func(_arg) for each _arg in _args, timing each call:
+    {'ops_per_sec', 'p50_us', 'p99_us', 'calls'}
+    """
+    for _arg in _args[:_warmup]:
+        _func(_arg)
+
+    _times = np.empty(len(_args))
+
+    for _i, _arg in enumerate(_args):
+        _t0 = perf_counter()
+        _func(_arg)
+        _times[_i] = perf_counter() - _t0
+
+    return {'ops_per_sec': len(_times) / _times.sum(),
+            'p50_us': float(np.percentile(_times, 50)) * 1e6,
+            'p99_us': float(np.percentile(_times, 99)) * 1e6,
+            'calls': len(_times)}
+
+##############################################################################
+
+def _connector_():
+
+    # No EA needed: nothing is received, and nothing is sent but by send_command
+    return DWX_ZeroMQ_Connector(_verbose=False, _poll_thread=False, **_PORTS)
+
+class _Replay_Connector():
+
+    # Stands in for the connector in DWX_ZMQ_Reporting, answering with one decoded
+    # response. Without an order cache, every call builds the DataFrame from it.
+    _Orders_DB = None
+
+    def __init__(self, _response):
+        self._response = _response
+
+    def _DWX_MTX_SYNC_OPEN_TRADES_(self, _max_age=None):
+        return self._DWX_MTX_GET_ALL_OPEN_TRADES_()
+
+    def _DWX_MTX_GET_ALL_OPEN_TRADES_(self):
+        return Future()
+
+    def _get_open_orders_(self, _magic=None, _symbol=None, _comment=None):
+        return {}
+
+    def _wait_response_(self, _future, _timeout=1.0):
+        return self._response
+
+    def _valid_response_(self, _input='zmq'):
+        return isinstance(_input, dict)
+
+##############################################################################
+
+def _sub_tick(_zmq):
+    return _time_calls_(_zmq._DWX_ZMQ_Process_Sub_Data_, tick_messages(100000))
+
+def _sub_bar(_zmq):
+    return _time_calls_(_zmq._DWX_ZMQ_Process_Sub_Data_, bar_messages(100000))
+
+def _sub_tick_binary(_zmq):
+
+    _msgs = [_encode_tick_(msg.split(':|:')[0], _i % 50, _i // 50 + 1, 1546387200000,
+                           *map(float, msg.split(':|:')[1].split(';')))
+             for _i, msg in enumerate(tick_messages(100000))]
+
+    return _time_calls_(_zmq._DWX_ZMQ_Process_Sub_Binary_, _msgs)
+
+def _pull_execution(_zmq):
+    return _time_calls_(_DWX_ZMQ_DECODE_, [execution_response(85051741 + _i) for _i in range(20000)])
+
+def _pull_open_trades(_zmq):
+    return _time_calls_(_DWX_ZMQ_DECODE_, [open_trades_response(500)] * 200, _warmup=5)
+
+def _hist_ingest(_zmq):
+    return _time_calls_(_zmq._DWX_ZMQ_Process_Pull_Data_, [hist_response(10000)] * 30, _warmup=2)
+
+def _send_command(_zmq):
+
+    # Formatting and request tracking only: the socket send always succeeds
+    _zmq.remote_send = lambda _socket, _data: True
+
+    _orders = [dict(_zmq._generate_default_order_dict(), _price=1.1 + _i * 1e-5, _magic=_i)
+               for _i in range(20000)]
+
+    return _time_calls_(lambda _order: _zmq._DWX_MTX_SEND_COMMAND_(**_order), _orders)
+
+def _reporting_trades(_zmq):
+
+    _reporting = DWX_ZMQ_Reporting(_Replay_Connector(_DWX_ZMQ_DECODE_(open_trades_response(500))))
+
+    return _time_calls_(_reporting._get_open_trades_, ['EURUSD_Trader'] * 500, _warmup=20)
+
+_BENCHMARKS = {'sub_tick': _sub_tick,
+               'sub_bar': _sub_bar,
+               'sub_tick_binary': _sub_tick_binary,
+               'pull_execution': _pull_execution,
+               'pull_open_trades': _pull_open_trades,
+               'hist_ingest': _hist_ingest,
+               'send_command': _send_command,
+               'reporting_trades': _reporting_trades}
+
+##############################################################################
+
+def _run_(_names):
+
+    _results = {}
+
+    for _name in _names:
+
+        # A fresh connector each, so stores and pending requests start empty
+        _zmq = _connector_()
+
+        try:
+            _results[_name] = _BENCHMARKS[_name](_zmq)
+        finally:
+            _zmq._DWX_ZMQ_SHUTDOWN_()
+
+    return _results
+
+def _environment_():
+
+    try:
+        _commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                 text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        _commit = None
+
+    return {'time': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': _commit,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor()}
+
+def _print_(_results, _baseline=None):
+
+    print('\n{:<18} {:>12} {:>10} {:>10}'.format('benchmark', 'ops/s', 'p50 (us)', 'p99 (us)')
+          + ('{:>12}'.format('vs baseline') if _baseline is not None else ''))
+
+    for _name, _r in _results.items():
+
+        _line = '{:<18} {:>12.0f} {:>10.2f} {:>10.2f}'.format(_name, _r['ops_per_sec'],
+                                                              _r['p50_us'], _r['p99_us'])
+
+        # Throughput ratio: above 1.00x is faster than the baseline
+        if _baseline is not None:
+            _old = _baseline['results'].get(_name)
+            _line += ('{:>11.2f}x'.format(_r['ops_per_sec'] / _old['ops_per_sec'])
+                      if _old is not None else '{:>12}'.format('new'))
+
+        print(_line)
+
+##############################################################################
+
+if __name__ == "__main__":
+
+    _parser = argparse.ArgumentParser(description='Microbenchmarks of the connector hot paths')
+    _parser.add_argument('--only', help='comma separated benchmark names')
+    _parser.add_argument('--save', metavar='FILE', help='write results as JSON')
+    _parser.add_argument('--compare', metavar='FILE', help='JSON of a previous run to compare with')
+    _args = _parser.parse_args()
+
+    _names = _args.only.split(',') if _args.only else list(_BENCHMARKS)
+
+    for _name in _names:
+        if _name not in _BENCHMARKS:
+            _parser.error('unknown benchmark {!r}, one of: {}'.format(_name, ', '.join(_BENCHMARKS)))
+
+    _baseline = None
+
+    if _args.compare:
+        with open(_args.compare) as _file:
+            _baseline = json.load(_file)
+
+    _results = _run_(_names)
+
+    _print_(_results, _baseline)
+
+    if _baseline is not None:
+        print('\nbaseline: {} ({})'.format(_baseline['environment']['time'],
+                                          _baseline['environment']['commit']))
+
+    if _args.save:
+        with open(_args.save, 'w') as _file:
+            json.dump({'environment': _environment_(), 'results': _results}, _file, indent=2)
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+    payloads.py
+    
+    Generators for realistic messages in the exact text format produced by
+    DWX_ZeroMQ_Server_v2.0.1_RC8.mq4, used by the benchmarks.
+    --
+    
+    @author: Darwinex Labs (www.darwinex.com)
+    
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+    
+    Licensed under the BSD 3-Clause License, you may not use this file except 
+    in compliance with the License. 
+    
+    You may obtain a copy of the License at:    
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+import random
+from datetime import datetime, timedelta
+
+##############################################################################
+
+def hist_response(n_bars, _symbol='EURUSD', _timeframe='M1', _seed=42,
+                  _request_id=None):
+    
+    """
+    HIST response with n_bars M1 bars, as built by DWX_GetHist().
+    """
+    _rng = random.Random(_seed)
+    _time = datetime(2019, 1, 2)
+    _step = timedelta(minutes=1)
+    _close = 1.14000
+    
+    _bars = []
+    
+    for i in range(n_bars):
+        
+        _open = _close
+        _close = round(_open + _rng.gauss(0, 0.0002), 5)
+        _high = round(max(_open, _close) + abs(_rng.gauss(0, 0.0001)), 5)
+        _low = round(min(_open, _close) - abs(_rng.gauss(0, 0.0001)), 5)
+        
+        _bars.append("{'time':'" + _time.strftime('%Y.%m.%d %H:%M') 
+                     + "', 'open':" + '%.8f' % _open 
+                     + ", 'high':" + '%.8f' % _high
+                     + ", 'low':" + '%.8f' % _low
+                     + ", 'close':" + '%.8f' % _close
+                     + ", 'tick_volume':" + str(_rng.randint(1, 500))
+                     + ", 'spread':" + str(_rng.randint(0, 20))
+                     + ", 'real_volume':0}")
+        
+        _time += _step
+    
+    _msg = "{'_action': 'HIST', '_symbol': '" + _symbol + "_" + _timeframe + "'"
+    _msg += ", '_data': [" + ", ".join(_bars) + "]"
+    
+    if _request_id is not None:
+        _msg += ", '_request_id': '" + _request_id + "'"
+    
+    return _msg + "}"
+
+##############################################################################
+
+def open_trades_response(n_trades, _seed=42):
+    
+    """
+    GET_OPEN_TRADES response with n_trades orders, as built by DWX_GetOpenOrders().
+    """
+    _rng = random.Random(_seed)
+    _symbols = ['EURUSD', 'GBPUSD', 'USDJPY', 'AUDNZD', 'XAUUSD']
+    
+    _trades = []
+    
+    for i in range(n_trades):
+        
+        _symbol = _symbols[i % len(_symbols)]
+        
+        _trades.append(str(85051741 + i) + ": {"
+                       + "'_magic': " + str(123456 + (i % 3))
+                       + ", '_symbol': '" + _symbol + "'"
+                       + ", '_lots': " + '%.8f' % 0.01
+                       + ", '_type': " + str(_rng.getrandbits(1))
+                       + ", '_open_price': " + '%.8f' % (1.1 + _rng.random() / 100)
+                       + ", '_open_time': '2019.01.08 13:46:52'"
+                       + ", '_SL': " + '%.8f' % 0.0
+                       + ", '_TP': " + '%.8f' % 0.0
+                       + ", '_pnl': " + '%.8f' % round(_rng.gauss(0, 5), 2)
+                       + ", '_comment': '" + _symbol + "_Trader'}")
+    
+    return "{'_action': 'OPEN_TRADES', '_trades': {" + ", ".join(_trades) + "}}"
+
+##############################################################################
+
+def tick_messages(n, _symbols=50, _seed=42):
+    
+    """
+    n SUB tick messages over _symbols symbols, as published by OnTick().
+    """
+    _rng = random.Random(_seed)
+    _bids = [1.0 + i / 100 for i in range(_symbols)]
+    
+    _msgs = []
+    
+    for i in range(n):
+        _s = i % _symbols
+        _bids[_s] = round(_bids[_s] + _rng.choice((-1, 1)) * 0.00001, 5)
+        _msgs.append('SYM{:02d}:|:{:f};{:f}'.format(_s, _bids[_s], _bids[_s] + 0.0002))
+    
+    return _msgs
+
+##############################################################################
+
+def bar_messages(n, _symbols=50, _seed=42):
+    
+    """
+    n SUB M1 rate messages over _symbols instruments, as published by OnTick().
+    """
+    _rng = random.Random(_seed)
+    _time = 1546387200     # 2019.01.02 00:00
+    
+    _msgs = []
+    
+    for i in range(n):
+        _s = i % _symbols
+        _open = round(1.0 + _s / 100 + _rng.gauss(0, 0.0005), 5)
+        _msgs.append('SYM{:02d}_M1:|:{};{:f};{:f};{:f};{:f};{};{};{}'.format(
+            _s, _time + 60 * (i // _symbols), _open, _open + 0.0003, _open - 0.0002, _open + 0.0001,
+            _rng.randint(1, 500), _rng.randint(0, 20), 0))
+    
+    return _msgs
+
+##############################################################################
+
+def execution_response(_ticket=85051741, _request_id='dwx-zeromq-1'):
+    
+    """
+    Response to an OPEN command (DMA_MODE=true), as built by DWX_OpenOrder().
+    """
+    return ("{'_action': 'EXECUTION', '_magic': 123456, '_ticket': " + str(_ticket)
+            + ", '_open_time': '2019.01.08 13:46:52', '_open_price': 1.14523000"
+            + ", '_sl': 1.14473000, '_tp': 1.14573000, '_request_id': '" + _request_id + "'}")
+
+##############################################################################
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    shm_fanout_benchmark.py
+
+    Consumer lag of DWX_ZMQ_Shared_Ring with 1, 4 and 16 reader processes.
+    The writer (standing in for a connector with _shm_ring set) publishes
+    ticks for 50 symbols at a steady rate; every reader polls the ring and
+    records, per tick, the time from entering the ring to being read.
+    Lag depends on the reader poll interval and on available cores: with
+    fewer cores than readers they take turns.
+
+    Run from this folder:
+
+        python shm_fanout_benchmark.py
+    --
+
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+# Append path for main project folder
+import sys
+sys.path.append('..')
+
+import os
+import numpy as np
+from multiprocessing import Event, Process, Queue
+from time import perf_counter, sleep, time_ns
+
+from api.DWX_ZMQ_Shared_Ring import DWX_ZMQ_Shared_Ring, DWX_ZMQ_Shared_Ring_Reader
+from api.DWX_ZMQ_Topic_Router import DWX_ZMQ_Tick
+
+_RING = 'dwx_fanout_benchmark'
+_SYMBOLS = ['SYM{:02d}'.format(i) for i in range(50)]
+_RATE = 20000           # ticks/s
+_SECONDS = 2
+_POLL = 0.0005          # reader sleep between empty polls (s)
+
+##############################################################################
+
+def _reader(_total, _ready, _results):
+
+    _ring = DWX_ZMQ_Shared_Ring_Reader(_RING)
+    _ready.set()
+
+    _lags = []
+    _read = 0
+
+    while _read + _ring._lost < _total:
+
+        _new = _ring._read_(_timeout=1, _sleep=_POLL)
+
+        if len(_new) == 0:
+            break
+
+        # ns from entering the ring to being seen here
+        _lags.append(time_ns() - _new['written'])
+        _read += len(_new)
+
+    _lags = np.concatenate(_lags) / 1000 if _lags else np.zeros(1)
+    _results.put((_read, _ring._lost, np.percentile(_lags, 50),
+                  np.percentile(_lags, 99), _lags.max()))
+
+    _ring._close_()
+
+##############################################################################
+
+def _run(_readers):
+
+    _writer = DWX_ZMQ_Shared_Ring(_RING, _capacity=65536)
+    _total = _RATE * _SECONDS
+
+    _results = Queue()
+    _ready = [Event() for _ in range(_readers)]
+    _processes = [Process(target=_reader, args=(_total, _event, _results))
+                  for _event in _ready]
+
+    for _p in _processes:
+        _p.start()
+    for _event in _ready:
+        _event.wait()
+
+    # Paced in 1 ms batches
+    _batch = _RATE // 1000
+    _t0 = perf_counter()
+
+    for _i in range(0, _total, _batch):
+        for _k in range(_i, _i + _batch):
+            _writer._write_(DWX_ZMQ_Tick(_SYMBOLS[_k % 50], time_ns(), 1.1, 1.1002))
+
+        _sleep = _t0 + (_i + _batch) / _RATE - perf_counter()
+        if _sleep > 0:
+            sleep(_sleep)
+
+    _stats = [_results.get() for _ in _processes]
+
+    for _p in _processes:
+        _p.join()
+
+    _writer._close_()
+
+    _stats = np.array(_stats)
+
+    print('{:>7d} {:>10.0f} {:>6.0f} {:>10.0f} {:>10.0f} {:>10.0f}'.format(
+        _readers, _stats[:, 0].mean(), _stats[:, 1].sum(),
+        np.median(_stats[:, 2]), _stats[:, 3].max(), _stats[:, 4].max()))
+
+##############################################################################
+
+if __name__ == "__main__":
+
+    print('{} ticks/s for {} s, {} cores, reader poll {} ms'.format(
+        _RATE, _SECONDS, os.cpu_count(), _POLL * 1000))
+    print('{:>7} {:>10} {:>6} {:>10} {:>10} {:>10}'.format(
+        'readers', 'read/each', 'lost', 'p50 (us)', 'p99 (us)', 'max (us)'))
+
+    for _readers in (1, 4, 16):
+        _run(_readers)
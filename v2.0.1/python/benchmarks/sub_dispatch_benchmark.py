@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    sub_dispatch_benchmark.py
+    
+    Cost of delivering SUB ticks for 50 symbols to 50 strategies, each only 
+    interested in one symbol:
+        
+        raw:    every message goes to every _subdata_handlers entry, which 
+                re-splits it and drops what it doesn't trade (as the example 
+                strategies did)
+        router: the message is parsed once and routed to the handlers 
+                registered for its topic (DWX_ZMQ_Topic_Router)
+    
+    Run from this folder:
+        
+        python sub_dispatch_benchmark.py
+    --
+    
+    @author: Darwinex Labs (www.darwinex.com)
+    
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+    
+    Licensed under the BSD 3-Clause License, you may not use this file except 
+    in compliance with the License. 
+    
+    You may obtain a copy of the License at:    
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+# Append path for main project folder
+import sys
+sys.path.append('..')
+
+from time import perf_counter
+
+from api.DWX_ZMQ_Topic_Router import DWX_ZMQ_Topic_Router, _DWX_ZMQ_PARSE_SUB_
+
+_SYMBOLS = ['SYM{:02d}'.format(i) for i in range(50)]
+_MESSAGES = ['{}:|:{:f};{:f}'.format(_SYMBOLS[i % 50], 1.1 + i * 1e-5, 1.1002 + i * 1e-5)
+             for i in range(100000)]
+
+##############################################################################
+
+class _Raw_Strategy():
+    
+    def __init__(self, _symbol):
+        self._symbol = _symbol
+        self._count = 0
+    
+    def onSubData(self, msg):
+        _topic, _data = msg.split(':|:')
+        if _topic == self._symbol:
+            _bid, _ask = _data.split(';')
+            self._count += float(_bid) > 0
+
+class _Routed_Strategy():
+    
+    def __init__(self):
+        self._count = 0
+    
+    def onTick(self, tick):
+        self._count += tick.bid > 0
+
+##############################################################################
+
+if __name__ == "__main__":
+    
+    _raw = [_Raw_Strategy(_symbol) for _symbol in _SYMBOLS]
+    
+    _t0 = perf_counter()
+    for msg in _MESSAGES:
+        for hnd in _raw:
+            hnd.onSubData(msg)
+    _raw_time = perf_counter() - _t0
+    
+    _router = DWX_ZMQ_Topic_Router()
+    _routed = [_Routed_Strategy() for _symbol in _SYMBOLS]
+    for _symbol, _strategy in zip(_SYMBOLS, _routed):
+        _router._register_(_symbol, _strategy.onTick)
+    
+    _t0 = perf_counter()
+    for msg in _MESSAGES:
+        _item = _DWX_ZMQ_PARSE_SUB_(msg)
+        _router._dispatch_(_item.symbol, _item)
+    _routed_time = perf_counter() - _t0
+    
+    assert sum(_s._count for _s in _raw) == sum(_s._count for _s in _routed) == len(_MESSAGES)
+    
+    print('{} messages, {} symbols, {} handlers'.format(len(_MESSAGES), len(_SYMBOLS), len(_raw)))
+    print('raw broadcast: {:8.0f} msg/s'.format(len(_MESSAGES) / _raw_time))
+    print('topic router:  {:8.0f} msg/s ({:.1f}x)'.format(len(_MESSAGES) / _routed_time,
+                                                         _raw_time / _routed_time))
@@ -0,0 +1,542 @@
+# -*- coding: utf-8 -*-
+"""
+    DWX_ZMQ_Replay.py
+
+    Replays recorded market data through DWX_ZMQ_Strategy subclasses (or any
+    onSubData / onPullData handlers) without a MetaTrader terminal:
+
+        - the ticks and bars of DWX_ZMQ_Journal files, or
+        - the bars of _History_DB ({SYMBOL_TF: HIST '_data' list}).
+
+    Handlers get the same calls, in the same formats, as from a live
+    DWX_ZeroMQ_Connector: raw onSubData text, parsed DWX_ZMQ_Tick /
+    DWX_ZMQ_Bar items for per-topic handlers and onPullData dicts. Data goes
+    into the connector's stores (_Market_Data_DB, _Rates_DB) as well.
+
+    _DWX_MTX_* commands never leave the process: DWX_ZMQ_Replay_Broker, the
+    emulator's order book and command grammar, answers them at the replayed
+    prices before the command returns. Market orders fill at the bid / ask
+    (DWX_ZMQ_Fill_Model adds slippage), SL, TP and pending orders trigger on
+    the first price that reaches them and fill at that price. History bars
+    are replayed as OPEN, LOW, HIGH, CLOSE prices (OPEN, HIGH, LOW, CLOSE if
+    the bar fell), and handed to handlers when they close.
+
+        _replay = DWX_ZMQ_Replay(_history=_zmq._History_DB, _speed=None)
+
+        _strategy = _replay._load_(my_strategy, _symbols=[('EURUSD', 0.01)])
+        _strategy._run_()
+
+        _replay._run_()
+        _replay._get_closed_trades_()
+
+    _speed=None replays as fast as possible, 1.0 in real time and N at N
+    times real time. Handlers run on the thread calling _run_(); commands
+    from other threads wait for the current tick or bar to be handled.
+    --
+
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+# Append path for main project folder
+import sys
+sys.path.append('..')
+
+import heapq
+import numpy as np
+from pandas import DataFrame
+from threading import RLock
+from time import perf_counter, sleep
+
+from api.DWX_ZeroMQ_Connector_v2_0_1_RC8 import DWX_ZeroMQ_Connector
+from api.DWX_ZMQ_Journal import DWX_ZMQ_Journal_Reader
+from api.DWX_ZMQ_Topic_Router import DWX_ZMQ_Tick, DWX_ZMQ_Bar
+from api.DWX_ZMQ_Bar_Store import TIMEFRAMES, _hist_to_bars_, _split_instrument_
+
+try:
+    from emulator.DWX_ZeroMQ_Server_Emulator import DWX_ZeroMQ_Server_Emulator, _BUY_TYPES
+except ImportError:
+    from DWX_ZeroMQ_Server_Emulator import DWX_ZeroMQ_Server_Emulator, _BUY_TYPES
+
+##############################################################################
+
+class DWX_ZMQ_Fill_Model():
+
+    """
+    Price a market fill: _price is the bid or ask it executes against,
+    _buying whether it buys (opening a buy or closing a sell). Fills are
+    _slippage points worse. Subclass to model e.g. random or size-dependent
+    slippage.
+    """
+    def __init__(self, _slippage=0):
+        self._slippage = _slippage
+
+    def _fill_price_(self, _symbol, _price, _buying, _point):
+
+        if _buying:
+            return _price + self._slippage * _point
+
+        return _price - self._slippage * _point
+
+##############################################################################
+
+class DWX_ZMQ_Replay_Broker(DWX_ZeroMQ_Server_Emulator):
+
+    """
+    The emulator's command handling and order book, driven by replayed
+    prices and clock instead of its random walk and sockets. Responses are
+    collected and returned by _command_().
+
+    _points: {SYMBOL: POINT} where it isn't _default_point (SL / TP are in
+    points, and bar spreads too).
+    """
+    def __init__(self,
+                 _fill_model=None,
+                 _points=None,
+                 _default_point=0.00001,
+                 _balance=10000.0,
+                 _leverage=100,
+                 _max_orders=1000,
+                 _max_lot_size=100.0):
+
+        # inproc only: nothing is bound to a TCP port
+        super().__init__(_host='dwx-replay-{}'.format(id(self)),
+                         _protocol='inproc',
+                         _max_orders=_max_orders,
+                         _max_lot_size=_max_lot_size,
+                         _balance=_balance,
+                         _leverage=_leverage)
+
+        self._fill_model = DWX_ZMQ_Fill_Model() if _fill_model is None else _fill_model
+        self._points = {} if _points is None else dict(_points)
+        self._default_point = _default_point
+
+        # Replayed state: {SYMBOL: (BID, ASK)} and the clock (s)
+        self._quotes = {}
+        self._time = 0
+
+        # Bars served to HIST commands: {(SYMBOL, TIMEFRAME): BAR_DTYPE array}
+        self._bars = {}
+
+        # Responses to the command being handled
+        self._responses = []
+
+        # Closed trades, and why the close in progress happens
+        self._closed = []
+        self._close_reason = 'CLOSE'
+
+    ##########################################################################
+
+    def _command_(self, _request):
+
+        self._MessageHandler_(_request)
+
+        _responses, self._responses = self._responses, []
+
+        return _responses
+
+    def _InformPullClient_(self, _message):
+        self._responses.append(self._WithRequestID_(_message))
+
+    ##########################################################################
+
+    def _TimeCurrent_(self):
+        return self._time
+
+    def _TimeLocal_(self):
+        return self._time
+
+    def _GetBidAsk_(self, _symbol):
+        return self._quotes.get(_symbol, (0.0, 0.0))
+
+    def _Point_(self, _symbol):
+        return self._points.get(_symbol, self._default_point)
+
+    def _FillPrice_(self, _symbol, _type, _closing=False):
+
+        return self._fill_model._fill_price_(_symbol,
+                                             super()._FillPrice_(_symbol, _type, _closing),
+                                             (_type == 0) != _closing,
+                                             self._Point_(_symbol))
+
+    ##########################################################################
+
+    def _DWX_OpenOrder_(self, _symbol, _type, _lots, _price, _SL, _TP, _comment, _magic):
+
+        # No price replayed yet: OrderSend() fails with ERR_UNKNOWN_SYMBOL
+        if _symbol not in self._quotes:
+            return "'_action': 'EXECUTION', '_response': '4106', 'response_value': 'unknown symbol'"
+
+        return super()._DWX_OpenOrder_(_symbol, _type, _lots, _price, _SL, _TP, _comment, _magic)
+
+    def _DWX_CloseAtMarket_(self, _order, _size=None, _price=None):
+
+        _size = _order['_lots'] if _size is None else _size
+
+        if _price is None:
+            _price = self._FillPrice_(_order['_symbol'], _order['_type'], _closing=True)
+
+        self._closed.append({'_ticket': _order['_ticket'],
+                             '_magic': _order['_magic'],
+                             '_symbol': _order['_symbol'],
+                             '_type': _order['_type'],
+                             '_lots': _size,
+                             '_open_time': _order['_open_time'],
+                             '_open_price': _order['_open_price'],
+                             '_close_time': self._time,
+                             '_close_price': _price,
+                             '_pnl': self._OrderProfit_(_order, _size, _price),
+                             '_reason': self._close_reason,
+                             '_comment': _order['_comment']})
+
+        return super()._DWX_CloseAtMarket_(_order, _size, _price)
+
+    ##########################################################################
+
+    def _CopyRates_(self, _symbol, _timeframe, _start, _end):
+
+        # Replayed bars only, and only those already closed
+        _bars = self._bars.get((_symbol, _timeframe))
+
+        if _bars is None:
+            return []
+
+        _end = min(_end, self._time - _timeframe * 60)
+        _bars = _bars[(_bars['time'] >= _start) & (_bars['time'] <= _end)]
+
+        return list(zip(_bars['time'].tolist(), _bars['open'].tolist(), _bars['high'].tolist(),
+                        _bars['low'].tolist(), _bars['close'].tolist(),
+                        _bars['tick_volume'].tolist(), _bars['spread'].tolist()))
+
+    ##########################################################################
+
+    def _update_(self, _symbol, _bid, _ask, _time):
+
+        self._quotes[_symbol] = (_bid, _ask)
+        self._time = _time
+
+        # Market orders close at SL / TP, pending orders open, at this price
+        for _ticket, _order in list(self._orders.items()):
+
+            if _order['_symbol'] != _symbol:
+                continue
+
+            _type = _order['_type']
+
+            if _type in (0, 1):
+
+                _dir = 1 if _type == 0 else -1
+                _price = _bid if _type == 0 else _ask
+
+                if _order['_SL'] != 0 and (_price - _order['_SL']) * _dir <= 0:
+                    self._close_reason = 'SL'
+                elif _order['_TP'] != 0 and (_price - _order['_TP']) * _dir >= 0:
+                    self._close_reason = 'TP'
+                else:
+                    continue
+
+                del self._orders[_ticket]
+                self._DWX_CloseAtMarket_(_order)
+                self._close_reason = 'CLOSE'
+
+            else:
+                # Limits trigger when the price comes down (sells: up) to
+                # them, stops when it goes through them
+                _dir = 1 if _type in _BUY_TYPES else -1
+                _diff = ((_ask if _dir == 1 else _bid) - _order['_open_price']) * _dir
+
+                if (_diff <= 0) if _type in (2, 3) else (_diff >= 0):
+                    _order['_type'] = 0 if _dir == 1 else 1
+                    _order['_open_price'] = self._FillPrice_(_symbol, _order['_type'])
+                    _order['_open_time'] = _time
+
+    ##########################################################################
+
+    def _close_(self):
+        self._ZMQ_CONTEXT.destroy(0)
+
+##############################################################################
+
+class DWX_ZMQ_Replay_Connector(DWX_ZeroMQ_Connector):
+
+    """
+    DWX_ZeroMQ_Connector whose commands are handled by a
+    DWX_ZMQ_Replay_Broker instead of being sent to MetaTrader. Responses are
+    processed (Futures resolved, onPullData called) before the command
+    returns. It has no poll thread; DWX_ZMQ_Replay feeds it SUB data.
+    """
+    def __init__(self, _broker, _lock, **kwargs):
+
+        self._broker = _broker
+        self._replay_lock = _lock
+
+        # Replayed ticks carry their recorded receive time, so latencies
+        # would be meaningless
+        kwargs.update(_host='dwx-replay-{}'.format(id(self)), _protocol='inproc',
+                      _poll_thread=False, _monitor=False, _latency_stats=False)
+
+        super().__init__(**kwargs)
+
+    ##########################################################################
+
+    def remote_send(self, _socket, _data):
+
+        with self._replay_lock:
+
+            self._metrics._counts['push_messages'] += 1
+            self._metrics._counts['push_bytes'] += len(_data)
+
+            for _msg in self._broker._command_(_data):
+                self._DWX_ZMQ_Process_Pull_Data_(_msg)
+
+        return True
+
+    def _DWX_ZMQ_Push_(self, _msg, _timeout=100):
+        return self.remote_send(self._PUSH_SOCKET, _msg)
+
+##############################################################################
+
+class DWX_ZMQ_Replay():
+
+    """
+    Replay driver. Give it _journal (a journal file path, or a list of them
+    in order) or _history ({SYMBOL_TF: HIST '_data' list or BAR_DTYPE
+    array}), then create strategies with _load_() or connectors with
+    _connector_() and call _run_().
+
+    The replay clock is the recorded receive time (UTC) for journals and
+    the bar close time (server time) for history. Journal bars move prices
+    only for symbols without ticks. _topics limits the replay to these
+    symbols / instruments (None = all).
+    """
+    def __init__(self,
+                 _journal=None,
+                 _history=None,
+                 _speed=None,               # None = as fast as possible, else times real time
+                 _topics=None,
+                 _fill_model=None,
+                 _points=None,
+                 _default_point=0.00001,
+                 _balance=10000.0,
+                 _leverage=100):
+
+        if (_journal is None) == (_history is None):
+            raise ValueError('Replay either _journal or _history')
+
+        self._journal = [_journal] if isinstance(_journal, str) else _journal
+        self._history = _history
+        self._speed = _speed
+        self._topics = None if _topics is None else set(_topics)
+
+        self._broker = DWX_ZMQ_Replay_Broker(_fill_model=_fill_model,
+                                             _points=_points,
+                                             _default_point=_default_point,
+                                             _balance=_balance,
+                                             _leverage=_leverage)
+
+        # Commands may come from strategy threads while a tick is handled
+        self._lock = RLock()
+
+        self._connectors = []
+        self._ACTIVE = False
+
+        # Symbols with replayed ticks (their bars don't move prices)
+        self._tick_symbols = set()
+
+        self._stats = {'ticks': 0, 'bars': 0, 'elapsed': 0.0, 'start': None, 'end': None}
+
+    ##########################################################################
+
+    def _connector_(self, **kwargs):
+
+        """
+        A DWX_ZMQ_Replay_Connector taking DWX_ZeroMQ_Connector arguments
+        """
+        _zmq = DWX_ZMQ_Replay_Connector(self._broker, self._lock, **kwargs)
+        self._connectors.append(_zmq)
+
+        return _zmq
+
+    def _load_(self, _strategy_class, *args, **kwargs):
+
+        """
+        Create a _strategy_class (DWX_ZMQ_Strategy subclass) instance that
+        uses a replay connector
+        """
+        _replayed = type(_strategy_class.__name__, (_strategy_class,),
+                         {'_connector_class': staticmethod(self._connector_)})
+
+        return _replayed(*args, **kwargs)
+
+    ##########################################################################
+
+    def _journal_events_(self):
+
+        for _path in self._journal:
+
+            _reader = DWX_ZMQ_Journal_Reader(_path)
+            _names = _reader._topics
+
+            for _batch in _reader._batches_():
+
+                _ticks = ((_recv_ns / 1e9, DWX_ZMQ_Tick(_names[_topic], _recv_ns, _bid, _ask))
+                          for _length, _kind, _topic, _recv_ns, _bid, _ask
+                          in _batch['ticks'].tolist())
+
+                _bars = ((_bar[3] / 1e9, DWX_ZMQ_Bar(_names[_bar[2]], *_split_instrument_(_names[_bar[2]]),
+                                                     *_bar[4:11], _bar[12]))
+                         for _bar in _batch['bars'].tolist())
+
+                yield from heapq.merge(_ticks, _bars, key=lambda _event: _event[0])
+
+            _reader._close_()
+
+    def _history_events_(self):
+
+        _instruments = []
+
+        for _instrument, _data in self._history.items():
+
+            _bars = _data if isinstance(_data, np.ndarray) else _hist_to_bars_(_data)
+            _symbol, _timeframe = _split_instrument_(_instrument)
+
+            self._broker._bars[(_symbol, TIMEFRAMES[_timeframe])] = _bars
+            _instruments.append(self._bar_events_(_instrument, _symbol, _timeframe, _bars))
+
+        # In close time order; ties in _history order
+        return heapq.merge(*_instruments, key=lambda _event: _event[0])
+
+    def _bar_events_(self, _instrument, _symbol, _timeframe, _bars):
+
+        _length = TIMEFRAMES[_timeframe] * 60
+
+        for _bar in _bars.tolist():
+            yield _bar[0] + _length, DWX_ZMQ_Bar(_instrument, _symbol, _timeframe, *_bar)
+
+    ##########################################################################
+
+    def _replay_item_(self, _time, _item):
+
+        _broker = self._broker
+
+        if type(_item) is DWX_ZMQ_Tick:
+
+            self._tick_symbols.add(_item.symbol)
+            _broker._update_(_item.symbol, _item.bid, _item.ask, _time)
+            self._stats['ticks'] += 1
+
+        else:
+            _spread = _item.spread * _broker._Point_(_item.symbol)
+
+            # A history bar's prices in the order they most likely came
+            if self._history is not None:
+                _path = ((_item.open, _item.low, _item.high, _item.close) if _item.close >= _item.open
+                         else (_item.open, _item.high, _item.low, _item.close))
+
+                for _price in _path:
+                    _broker._update_(_item.symbol, _price, _price + _spread, _time)
+
+            elif _item.symbol not in self._tick_symbols:
+                _broker._update_(_item.symbol, _item.close, _item.close + _spread, _time)
+
+            else:
+                _broker._time = _time
+
+            self._stats['bars'] += 1
+
+        for _zmq in self._connectors:
+            _zmq._DWX_ZMQ_Route_Sub_Item_(_item)
+
+    ##########################################################################
+
+    def _run_(self):
+
+        """
+        Replay everything (or until _stop_()). Returns _get_stats_().
+        """
+        self._ACTIVE = True
+
+        _events = self._journal_events_() if self._journal is not None else self._history_events_()
+        _started = perf_counter()
+        _first = None
+
+        for _time, _item in _events:
+
+            if not self._ACTIVE:
+                break
+
+            if self._topics is not None and _item[0] not in self._topics:
+                continue
+
+            if _first is None:
+                _first = self._stats['start'] = _time
+
+            # Wait for the recorded time, scaled by _speed
+            if self._speed is not None:
+                _wait = _started + (_time - _first) / self._speed - perf_counter()
+
+                if _wait > 0:
+                    sleep(_wait)
+
+            with self._lock:
+                self._replay_item_(_time, _item)
+
+            self._stats['end'] = _time
+
+        self._stats['elapsed'] += perf_counter() - _started
+        self._ACTIVE = False
+
+        return self._get_stats_()
+
+    def _stop_(self):
+        self._ACTIVE = False
+
+    ##########################################################################
+
+    """
+    {'ticks', 'bars'} replayed, recorded time from 'start' to 'end' (s),
+    'elapsed' wall time (s), 'commands' handled by first field, 'balance',
+    'open_orders' and 'closed_trades'
+    """
+    def _get_stats_(self):
+
+        _broker = self._broker
+
+        return dict(self._stats,
+                    commands=dict(_broker._commands),
+                    balance=round(_broker._balance, 2),
+                    open_orders=len(_broker._orders),
+                    closed_trades=len(_broker._closed))
+
+    def _get_closed_trades_(self):
+
+        """
+        Trades closed so far (by command, SL or TP), indexed by ticket
+        """
+        if len(self._broker._closed) == 0:
+            return DataFrame()
+
+        return DataFrame(self._broker._closed).set_index('_ticket')
+
+    def _get_open_trades_(self):
+        return {_ticket: dict(_order) for _ticket, _order in self._broker._orders.items()}
+
+    ##########################################################################
+
+    def _close_(self):
+
+        self._ACTIVE = False
+
+        for _zmq in self._connectors:
+            _zmq._DWX_ZMQ_SHUTDOWN_()
+
+        self._broker._close_()
+
+##############################################################################
@@ -0,0 +1,883 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    DWX_ZeroMQ_Server_Emulator.py
+
+    Local stand-in for DWX_ZeroMQ_Server_v2.0.1_RC8.mq4, for testing and
+    benchmarking the Python side without a MetaTrader terminal. It binds the
+    same three sockets and answers commands in the EA's wire format:
+
+        PULL (_PUSH_PORT)   <- commands from DWX_ZeroMQ_Connector
+        PUSH (_PULL_PORT)   -> responses
+        PUB  (_PUB_PORT)    -> market data
+
+    It implements the EA's command grammar: TRADE (OPEN, MODIFY, CLOSE,
+    CLOSE_PARTIAL, CLOSE_MAGIC, CLOSE_ALL, GET_OPEN_TRADES,
+    GET_OPEN_TRADES_DELTA, GET_ACCOUNT_INFO), BATCH, HIST, TRACK_PRICES / TRACK_RATES (text or _BIN) and HEARTBEAT.
+
+    Like the EA, one command is handled per timer event (_millisecond_timer)
+    and every command is followed by an empty reply message. Historic bars
+    are synthetic but deterministic: the same (symbol, timeframe, time)
+    always gives the same bar, so overlapping requests agree. Trades are
+    filled at once (after _trade_latency) at synthetic prices and kept in
+    an in-memory order book, as with DMA_MODE=true.
+
+    Prices of tracked symbols follow a random walk, one point per OnTick()
+    event: _tick_rate events per second (as chart ticks), or every
+    _millisecond_timer_prices ms when there are none, as in OnTimer().
+    _time_scale speeds up the server clock, so that e.g. M1 bars are
+    published every second with _time_scale=60.
+
+    Run from this folder:
+
+        python DWX_ZeroMQ_Server_Emulator.py
+    --
+
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+# Append path for main project folder
+import sys
+sys.path.append('..')
+
+import random
+import zlib
+import zmq
+from datetime import datetime, timezone
+from math import sin
+from threading import Thread
+from time import perf_counter, sleep, time
+
+from api.DWX_ZMQ_Binary_Feed import _encode_tick_, _encode_bar_
+
+##############################################################################
+
+# ENUM_TIMEFRAMES (minutes) -> GetTimeframeText()
+_TIMEFRAME_TEXT = {1: 'M1', 5: 'M5', 15: 'M15', 30: 'M30', 60: 'H1', 240: 'H4',
+                   1440: 'D1', 10080: 'W1', 43200: 'MN1'}
+
+# Synthetic symbols: 5 digits, 2 point spread
+_POINT = 0.00001
+_SPREAD = 20 * _POINT
+
+# OP_BUY, OP_SELL, OP_BUYLIMIT, OP_SELLLIMIT, OP_BUYSTOP, OP_SELLSTOP
+_BUY_TYPES = (0, 2, 4)
+
+# Units per lot, for profit and loss
+_CONTRACT_SIZE = 100000
+
+##############################################################################
+
+class DWX_ZeroMQ_Server_Emulator():
+
+    """
+    Emulated DWX ZeroMQ Server (EA side).
+    """
+    def __init__(self,
+                 _host='*',                 # Interface to bind
+                 _protocol='tcp',           # Connection protocol
+                 _PUSH_PORT=32768,          # Port the client sends commands to
+                 _PULL_PORT=32769,          # Port the client receives responses from
+                 _PUB_PORT=32770,           # Port the client subscribes to
+                 _millisecond_timer=1,      # OnTimer() period (ms): one command per event
+                 _millisecond_timer_prices=500, # OnTick() from OnTimer() after this many ms without one
+                 _tick_rate=0,              # OnTick() events per second (0 = only the timer's)
+                 _time_scale=1.0,           # Server clock speed (60 = one M1 bar per second)
+                 _max_hist_bars=None,       # Max bars returned per HIST (like 'Max bars in chart')
+                 _closed_days=((1, 1), (12, 25)), # (MONTH, DAY) without bars every year, besides weekends
+                 _max_orders=1000,          # MaximumOrders
+                 _max_lot_size=100.0,       # MaximumLotSize
+                 _trade_latency=0.0,        # Seconds each OrderSend/OrderModify/OrderClose takes
+                 _account_number=1234567,   # AccountNumber()
+                 _balance=10000.0,          # AccountBalance() at start
+                 _leverage=100,             # AccountLeverage()
+                 _seed=42,                  # Seed of the price random walk
+                 _pub_hwm=1,                # PUB send high water mark (the EA's is 1; 0 = unlimited)
+                 _max_sync_removed=1000,    # MAX_SYNC_REMOVED: removed tickets kept for GET_OPEN_TRADES_DELTA
+                 _verbose=False):
+
+        self._ACTIVE = False
+        self._verbose = _verbose
+        self._millisecond_timer = _millisecond_timer
+        self._max_hist_bars = _max_hist_bars
+        self._closed_days = set(_closed_days)
+        self._max_orders = _max_orders
+        self._max_lot_size = _max_lot_size
+        self._trade_latency = _trade_latency
+        self._millisecond_timer_prices = _millisecond_timer_prices
+        self._tick_rate = _tick_rate
+        self._time_scale = _time_scale
+
+        # Account
+        self._account_number = _account_number
+        self._balance = _balance
+        self._leverage = _leverage
+
+        # Server clock: starts at the local time, runs _time_scale times faster
+        self._start_time = time()
+
+        # Tracked symbols and instruments (TRACK_PRICES / TRACK_RATES), as in the EA
+        self._Publish_Symbols = []
+        self._Publish_Symbols_LastTick = []
+        self._Publish_Instruments = []      # [[SYMBOL, TIMEFRAME, NAME, LAST_PUBLISHED_BAR_TIME]]
+        self._Publish_Prices_Binary = False
+        self._Publish_Rates_Binary = False
+        self._Publish_Symbols_Seq = []
+        self._Publish_Instruments_Seq = []
+
+        # Current bid by symbol (random walk once tracked)
+        self._prices = {}
+        self._random = random.Random(_seed)
+
+        # Ticks and bars published so far
+        self._published = {'ticks': 0, 'bars': 0}
+
+        # Open orders: {TICKET: {'_symbol', '_type', '_lots', '_open_price', ...}}
+        self._orders = {}
+        self._next_ticket = 1
+
+        # GET_OPEN_TRADES_DELTA state, as in the EA: {TICKET: (STATE, VERSION)}
+        # as of the last scan, and [(TICKET, VERSION)] of removed tickets
+        self._sync_epoch = int(time() * 1000)
+        self._sync_version = 0
+        self._sync_oldest = 0
+        self._sync_orders = {}
+        self._sync_removed = []
+        self._max_sync_removed = _max_sync_removed
+
+        self._ZMQ_CONTEXT = zmq.Context()
+
+        _url = _protocol + "://" + _host + ":"
+
+        self._PULL_SOCKET = self._ZMQ_CONTEXT.socket(zmq.PULL)
+        self._PULL_SOCKET.bind(_url + str(_PUSH_PORT))
+
+        self._PUSH_SOCKET = self._ZMQ_CONTEXT.socket(zmq.PUSH)
+        self._PUSH_SOCKET.bind(_url + str(_PULL_PORT))
+
+        self._PUB_SOCKET = self._ZMQ_CONTEXT.socket(zmq.PUB)
+        self._PUB_SOCKET.setsockopt(zmq.SNDHWM, _pub_hwm)
+        self._PUB_SOCKET.bind(_url + str(_PUB_PORT))
+
+        # Echoed as '_request_id' in every response to the current command
+        self._Request_ID = ''
+
+        # Command handlers by first field, i.e. InterpretZmqMessage()
+        self._handlers = {'HIST': self._DWX_GetHist_,
+                          'HEARTBEAT': self._DWX_Heartbeat_,
+                          'TRADE': self._DWX_Trade_,
+                          'BATCH': self._DWX_Batch_,
+                          'TRACK_PRICES': self._DWX_SetSymbolList_,
+                          'TRACK_PRICES_BIN': self._DWX_SetSymbolList_,
+                          'TRACK_RATES': self._DWX_SetInstrumentList_,
+                          'TRACK_RATES_BIN': self._DWX_SetInstrumentList_}
+
+        # Commands handled so far, by first field
+        self._commands = {}
+
+        self._Timer_Thread = None
+
+    ##########################################################################
+
+    def _start_(self):
+
+        self._ACTIVE = True
+        self._Timer_Thread = Thread(target=self._OnTimer_Loop_, daemon=True)
+        self._Timer_Thread.start()
+
+        print("[EMULATOR] Listening for commands on PULL: {}".format(
+            self._PULL_SOCKET.getsockopt_string(zmq.LAST_ENDPOINT)))
+
+        return self
+
+    def _stop_(self):
+
+        self._ACTIVE = False
+
+        if self._Timer_Thread is not None:
+            self._Timer_Thread.join()
+
+        self._ZMQ_CONTEXT.destroy(0)
+
+        print("[EMULATOR] Stopped.")
+
+    ##########################################################################
+
+    def _OnTimer_Loop_(self):
+
+        # Sockets are only used from this thread, as the EA is single threaded
+        _next_tick = perf_counter()
+        _last_update = perf_counter()
+
+        while self._ACTIVE:
+
+            # Get client's command, but don't block (one per timer event)
+            try:
+                _request = self._PULL_SOCKET.recv_string(zmq.DONTWAIT)
+
+                self._MessageHandler_(_request)
+
+                # MessageHandler() returns an empty reply, sent after the response
+                self._PUSH_SOCKET.send_string('', zmq.DONTWAIT)
+
+            except zmq.error.Again:
+                pass
+
+            _now = perf_counter()
+
+            # Chart ticks due since the last timer event (more than one if the
+            # timer is slower than _tick_rate; at most 1 s is caught up)
+            if self._tick_rate > 0:
+
+                _next_tick = max(_next_tick, _now - 1.0)
+
+                while _next_tick <= _now:
+                    self._OnTick_()
+                    _next_tick += 1.0 / self._tick_rate
+                    _last_update = _now
+
+            # Update prices regularly in case there was no tick
+            if _now >= _last_update + self._millisecond_timer_prices / 1000:
+                self._OnTick_()
+                _last_update = _now
+
+            sleep(self._millisecond_timer / 1000)
+
+    ##########################################################################
+
+    def _TimeCurrent_(self):
+        return self._start_time + (time() - self._start_time) * self._time_scale
+
+    def _TimeLocal_(self):
+        return time()
+
+    ##########################################################################
+
+    def _OnTick_(self):
+
+        # Tracked symbols move one point each; published if bid or ask changed
+        for _s, _symbol in enumerate(self._Publish_Symbols):
+
+            _bid = self._GetBidAsk_(_symbol)[0] + self._random.choice((-1, 1)) * _POINT
+            self._prices[_symbol] = round(_bid, 5)
+
+            _bid, _ask = self._GetBidAsk_(_symbol)
+            _tick = '%f;%f' % (_bid, _ask)
+
+            if _tick == self._Publish_Symbols_LastTick[_s]:
+                continue
+
+            self._Publish_Symbols_LastTick[_s] = _tick
+
+            if self._Publish_Prices_Binary:
+                self._Publish_Symbols_Seq[_s] += 1
+                self._PUB_SOCKET.send(_encode_tick_(_symbol, _s, self._Publish_Symbols_Seq[_s],
+                                                    int(self._TimeCurrent_()) * 1000, _bid, _ask),
+                                      zmq.DONTWAIT)
+            else:
+                self._PUB_SOCKET.send_string(_symbol + ':|:' + _tick, zmq.DONTWAIT)
+
+            self._published['ticks'] += 1
+
+        # A new bar is published when the current one opens
+        for _s, _instrument in enumerate(self._Publish_Instruments):
+
+            _symbol, _timeframe, _name, _last = _instrument
+            _step = _timeframe * 60
+            _time = int(self._TimeCurrent_()) // _step * _step
+
+            if _time <= _last:
+                continue
+
+            _instrument[3] = _time
+            _bid = self._GetBidAsk_(_symbol)[0]
+
+            if self._Publish_Rates_Binary:
+                self._Publish_Instruments_Seq[_s] += 1
+                self._PUB_SOCKET.send(_encode_bar_(_name, _s, self._Publish_Instruments_Seq[_s],
+                                                   _time * 1000, _bid, _bid, _bid, _bid, 1, 20, 0),
+                                      zmq.DONTWAIT)
+            else:
+                self._PUB_SOCKET.send_string('%s:|:%u;%f;%f;%f;%f;%d;%d;%d' % (
+                    _name, _time, _bid, _bid, _bid, _bid, 1, 20, 0), zmq.DONTWAIT)
+
+            self._published['bars'] += 1
+
+    ##########################################################################
+
+    def _MessageHandler_(self, _request):
+
+        if self._verbose:
+            print("[EMULATOR] " + _request[:200])
+
+        _components = _request.split(';')
+
+        self._commands[_components[0]] = self._commands.get(_components[0], 0) + 1
+        self._Request_ID = self._GetRequestID_(_components)
+
+        try:
+            _handler = self._handlers.get(_components[0])
+
+            if _handler is not None:
+                _handler(_components)
+
+        except (IndexError, ValueError) as ex:
+            print("[EMULATOR] Malformed command {!r}: {}".format(_request[:200], ex))
+
+        self._Request_ID = ''
+
+    ##########################################################################
+
+    def _GetRequestID_(self, _components):
+
+        # TRADE commands carry it as field 11, HIST as field 5, BATCH after the last item
+        _index = {'TRADE': 11, 'HIST': 5}.get(_components[0])
+
+        if _components[0] == 'BATCH' and len(_components) > 1:
+            _index = 2 + 10 * int(_components[1])
+
+        if _index is not None and len(_components) > _index:
+            return _components[_index]
+
+        return ''
+
+    ##########################################################################
+
+    def _InformPullClient_(self, _message):
+        self._PUSH_SOCKET.send_string(self._WithRequestID_(_message), zmq.DONTWAIT)
+
+    def _WithRequestID_(self, _message):
+
+        # Echo the client's request id so it can match this response
+        if self._Request_ID != '' and _message.endswith('}'):
+            _message = (_message[:-1] + ("" if _message.endswith('{}') else ", ")
+                        + "'_request_id': '" + self._Request_ID + "'}")
+
+        return _message
+
+    ##########################################################################
+
+    def _DWX_Heartbeat_(self, _components):
+        self._InformPullClient_("{'_action': 'heartbeat', '_response': 'loud and clear!'}")
+
+    ##########################################################################
+
+    def _DWX_GetHist_(self, _components):
+
+        # Format: HIST|SYMBOL|TIMEFRAME|START_DATETIME|END_DATETIME
+        _symbol = _components[1]
+        _timeframe = int(_components[2])
+
+        _bars = self._CopyRates_(_symbol, _timeframe,
+                                 _StrToTime_(_components[3]),
+                                 _StrToTime_(_components[4]))
+
+        _ret = "{'_action': 'HIST', '_symbol': '" + _symbol + "_" + _TIMEFRAME_TEXT.get(_timeframe, str(_timeframe)) + "'"
+
+        if len(_bars) > 0:
+            _ret += ", '_data': [" + ", ".join(
+                "{'time':'" + _TimeToString_(_time) + "', 'open':" + '%.8f' % _open
+                + ", 'high':" + '%.8f' % _high + ", 'low':" + '%.8f' % _low
+                + ", 'close':" + '%.8f' % _close + ", 'tick_volume':" + str(_tick_volume)
+                + ", 'spread':" + str(_spread) + ", 'real_volume':0}"
+                for _time, _open, _high, _low, _close, _tick_volume, _spread in _bars) + "]"
+        else:
+            _ret += ", '_response': 'NOT_AVAILABLE'"
+
+        self._InformPullClient_(_ret + "}")
+
+    ##########################################################################
+
+    def _DWX_Trade_(self, _components):
+
+        # Format: TRADE|ACTION|TYPE|SYMBOL|PRICE|SL|TP|COMMENT|LOTS|MAGIC|TICKET
+        _action = _components[1]
+
+        if _action == 'CLOSE_MAGIC':
+            _ret = "{" + self._DWX_CloseOrders_(int(_components[9])) + "}"
+        elif _action == 'CLOSE_ALL':
+            _ret = "{" + self._DWX_CloseOrders_() + "}"
+        elif _action == 'GET_OPEN_TRADES':
+            _ret = "{" + self._DWX_GetOpenOrders_() + "}"
+        elif _action == 'GET_OPEN_TRADES_DELTA':
+            _ret = "{" + self._DWX_GetOpenOrdersDelta_(int(_components[7]), int(_components[10])) + "}"
+        elif _action == 'GET_ACCOUNT_INFO':
+            _ret = "{" + self._DWX_GetAccountInformation_() + "}"
+        else:
+            _ret = self._DWX_TradeItem_(_components[1:11])
+
+        if _ret is not None:
+            self._InformPullClient_(_ret)
+
+    ##########################################################################
+
+    def _DWX_Batch_(self, _components):
+
+        # Format: BATCH|N|ACTION|TYPE|SYMBOL|PRICE|SL|TP|COMMENT|LOTS|MAGIC|TICKET|...
+        _n = int(_components[1])
+
+        if _n < 1 or len(_components) < 2 + 10 * _n:
+            self._InformPullClient_("{'_action': 'BATCH', '_response': 'MALFORMED_BATCH'}")
+            return
+
+        _responses = []
+
+        for _i in range(_n):
+            _item = _components[2 + 10 * _i:12 + 10 * _i]
+
+            if _item[0] in ('OPEN', 'MODIFY', 'CLOSE', 'CLOSE_PARTIAL'):
+                _responses.append(self._DWX_TradeItem_(_item, _batch=True))
+            else:
+                _responses.append("{'_action': '" + _item[0] + "', '_response': 'UNSUPPORTED_BATCH_ACTION'}")
+
+        self._InformPullClient_("{'_action': 'BATCH', '_responses': [" + ", ".join(_responses) + "]}")
+
+    ##########################################################################
+
+    def _DWX_TradeItem_(self, _item, _batch=False):
+
+        # _item: ACTION|TYPE|SYMBOL|PRICE|SL|TP|COMMENT|LOTS|MAGIC|TICKET
+        _action = _item[0]
+
+        if _action == 'OPEN':
+            return "{" + self._DWX_OpenOrder_(_item[2], int(_item[1]), float(_item[7]), float(_item[3]),
+                                              float(_item[4]), float(_item[5]), _item[6], int(_item[8])) + "}"
+
+        if _action == 'MODIFY':
+            # Batch items also echo the ticket
+            _ret = "'_action': 'MODIFY'" + (", '_ticket': " + _item[9] if _batch else "")
+            return "{" + _ret + self._DWX_ModifyOrder_(int(_item[9]), float(_item[3]),
+                                                       float(_item[4]), float(_item[5])) + "}"
+
+        if _action == 'CLOSE':
+            return "{" + self._DWX_CloseOrder_Ticket_(int(_item[9])) + "}"
+
+        if _action == 'CLOSE_PARTIAL':
+            return "{" + self._DWX_ClosePartial_(int(_item[9]), float(_item[7])) + "}"
+
+        # Other TRADE actions aren't emulated (no response, like an unknown command)
+        return None
+
+    ##########################################################################
+
+    def _GetBidAsk_(self, _symbol):
+
+        # Random walk of tracked symbols, else the synthetic bars' close curve
+        _bid = self._prices.get(_symbol)
+
+        if _bid is None:
+            _base = 1.0 + (zlib.crc32(_symbol.encode()) % 1000) / 1000
+            _bid = round(_base + 0.05 * sin(self._TimeCurrent_() / 864000.0), 5)
+
+        return _bid, round(_bid + _SPREAD, 5)
+
+    def _Point_(self, _symbol):
+        return _POINT
+
+    def _FillPrice_(self, _symbol, _type, _closing=False):
+
+        # Market orders buy at the ask and sell at the bid (closing a buy sells)
+        _bid, _ask = self._GetBidAsk_(_symbol)
+
+        return _ask if (_type == 0) != _closing else _bid
+
+    ##########################################################################
+
+    def _OrderProfit_(self, _order, _lots=None, _price=None):
+
+        # Market orders only, at _price or else the current close price
+        if _order['_type'] not in (0, 1):
+            return 0.0
+
+        if _price is None:
+            _bid, _ask = self._GetBidAsk_(_order['_symbol'])
+            _price = _bid if _order['_type'] == 0 else _ask
+
+        _diff = _price - _order['_open_price'] if _order['_type'] == 0 else _order['_open_price'] - _price
+
+        return round(_diff * _CONTRACT_SIZE * (_order['_lots'] if _lots is None else _lots), 2)
+
+    ##########################################################################
+
+    def _DWX_OpenOrder_(self, _symbol, _type, _lots, _price, _SL, _TP, _comment, _magic):
+
+        _ret = "'_action': 'EXECUTION'"
+
+        if _lots > self._max_lot_size:
+            return _ret + ", '_response': 'LOT_SIZE_ERROR', 'response_value': 'MAX_LOT_SIZE_EXCEEDED'"
+
+        if len(self._orders) >= self._max_orders:
+            return _ret + ", '_response': 'NUM_ORDERS_ERROR', 'response_value': 'MAX_NUMBER_OF_ORDERS_EXCEEDED'"
+
+        if _type in (0, 1):
+            _price = self._FillPrice_(_symbol, _type)
+
+        sleep(self._trade_latency)
+
+        _ticket = self._next_ticket
+        self._next_ticket += 1
+
+        self._orders[_ticket] = {'_ticket': _ticket, '_magic': _magic, '_symbol': _symbol, '_lots': _lots,
+                                 '_type': _type, '_open_price': _price, '_open_time': self._TimeLocal_(),
+                                 '_SL': 0.0, '_TP': 0.0, '_comment': _comment}
+
+        _ret += (", '_symbol': '" + _symbol + "', '_magic': " + str(_magic) + ", '_ticket': " + str(_ticket)
+                 + ", '_open_time': '" + _TimeToString_(int(self._TimeLocal_()), True) + "', '_open_price': " + '%.8f' % _price)
+
+        # DMA_MODE: SL/TP (in points) are set with a separate OrderModify()
+        if _SL != 0 or _TP != 0:
+            _ret += self._DWX_ModifyOrder_(_ticket, _price, _SL, _TP)
+
+        return _ret
+
+    ##########################################################################
+
+    def _DWX_ModifyOrder_(self, _ticket, _price, _SL, _TP):
+
+        _order = self._orders.get(_ticket)
+
+        if _order is None:
+            return ", '_response': 'NOT_FOUND'"
+
+        if _order['_type'] in (0, 1) or _price == 0.0:
+            _price = _order['_open_price']
+
+        _dir = 1 if _order['_type'] in _BUY_TYPES else -1
+        _point = self._Point_(_order['_symbol'])
+
+        sleep(self._trade_latency)
+
+        _order['_open_price'] = _price
+        _order['_SL'] = round(_price - _SL * _dir * _point, 5)
+        _order['_TP'] = round(_price + _TP * _dir * _point, 5)
+
+        return ", '_sl': " + '%.8f' % _order['_SL'] + ", '_tp': " + '%.8f' % _order['_TP']
+
+    ##########################################################################
+
+    def _DWX_CloseOrder_Ticket_(self, _ticket):
+
+        _ret = "'_action': 'CLOSE', '_ticket': " + str(_ticket)
+
+        _order = self._orders.get(_ticket)
+
+        if _order is None:
+            return _ret + ", '_response': 'NOT_FOUND'"
+
+        sleep(self._trade_latency)
+
+        del self._orders[_ticket]
+
+        if _order['_type'] in (0, 1):
+            _ret += self._DWX_CloseAtMarket_(_order) + ", '_response': 'CLOSE_MARKET'"
+        else:
+            _ret += ", '_response': 'CLOSE_PENDING'"
+
+        return _ret + ", '_response_value': 'SUCCESS'"
+
+    ##########################################################################
+
+    def _DWX_CloseAtMarket_(self, _order, _size=None, _price=None):
+
+        # OrderClose() of a market order (already removed or reduced by the caller)
+        _size = _order['_lots'] if _size is None else _size
+
+        if _price is None:
+            _price = self._FillPrice_(_order['_symbol'], _order['_type'], _closing=True)
+
+        self._balance += self._OrderProfit_(_order, _size, _price)
+
+        return (", '_close_price': " + '%.8f' % _price
+                + ", '_close_lots': " + '%.8f' % _size)
+
+    ##########################################################################
+
+    def _DWX_CloseOrders_(self, _magic=None):
+
+        # CLOSE_MAGIC (_magic given) or CLOSE_ALL, newest order first
+        if _magic is None:
+            _ret = "'_action': 'CLOSE_ALL'"
+        else:
+            _ret = "'_action': 'CLOSE_ALL_MAGIC', '_magic': " + str(_magic)
+
+        _responses = []
+
+        for _ticket, _order in reversed(list(self._orders.items())):
+
+            if _magic is not None and _order['_magic'] != _magic:
+                continue
+
+            _response = str(_ticket) + ": {'_symbol':'" + _order['_symbol'] + "'"
+
+            if _magic is None:
+                _response += ", '_magic': " + str(_order['_magic'])
+
+            sleep(self._trade_latency)
+
+            del self._orders[_ticket]
+
+            if _order['_type'] in (0, 1):
+                _response += self._DWX_CloseAtMarket_(_order) + ", '_response': 'CLOSE_MARKET'"
+            else:
+                _response += ", '_response': 'CLOSE_PENDING'"
+
+            _responses.append(_response + "}")
+
+        _ret += ", '_responses': {" + ", ".join(_responses) + "}"
+
+        if len(_responses) == 0:
+            return _ret + ", '_response': 'NOT_FOUND'"
+
+        return _ret + ", '_response_value': 'SUCCESS'"
+
+    ##########################################################################
+
+    def _DWX_GetOpenOrders_(self):
+
+        return "'_action': 'OPEN_TRADES', '_trades': {" + ", ".join(
+            str(_ticket) + ": {" + self._OrderToString_(_order) + "}"
+            for _ticket, _order in reversed(list(self._orders.items()))) + "}"
+
+    def _OrderToString_(self, _order):
+
+        return ("'_magic': " + str(_order['_magic']) + ", '_symbol': '" + _order['_symbol']
+                + "', '_lots': " + '%.8f' % _order['_lots'] + ", '_type': " + str(_order['_type'])
+                + ", '_open_price': " + '%.8f' % _order['_open_price']
+                + ", '_open_time': '" + _TimeToString_(int(_order['_open_time']), True)
+                + "', '_SL': " + '%.8f' % _order['_SL'] + ", '_TP': " + '%.8f' % _order['_TP']
+                + ", '_pnl': " + '%.8f' % self._OrderProfit_(_order) + ", '_comment': '" + _order['_comment'] + "'")
+
+    ##########################################################################
+
+    def _DWX_SyncOrders_(self):
+
+        # New and changed orders (P&L aside) get the next version, and so
+        # does each ticket no longer open
+        _orders = {}
+
+        for _ticket, _order in self._orders.items():
+
+            _state = (_order['_type'], _order['_lots'], _order['_open_price'], _order['_SL'], _order['_TP'])
+            _known = self._sync_orders.get(_ticket)
+
+            if _known is not None and _known[0] == _state:
+                _orders[_ticket] = _known
+            else:
+                self._sync_version += 1
+                _orders[_ticket] = (_state, self._sync_version)
+
+        for _ticket in self._sync_orders.keys() - _orders.keys():
+            self._sync_version += 1
+            self._sync_removed.append((_ticket, self._sync_version))
+
+        # Forget the oldest removals: clients that haven't seen them get all orders
+        _excess = len(self._sync_removed) - self._max_sync_removed
+
+        if _excess > 0:
+            self._sync_oldest = self._sync_removed[_excess - 1][1]
+            del self._sync_removed[:_excess]
+
+        self._sync_orders = _orders
+
+    def _DWX_GetOpenOrdersDelta_(self, _epoch, _version):
+
+        self._DWX_SyncOrders_()
+
+        _full = (_epoch != self._sync_epoch or _version < self._sync_oldest
+                 or _version > self._sync_version)
+
+        if _full:
+            _version = 0
+
+        return ("'_action': 'OPEN_TRADES_DELTA', '_epoch': " + str(self._sync_epoch)
+                + ", '_version': " + str(self._sync_version) + ", '_full': " + ('1' if _full else '0')
+                + ", '_trades': {" + ", ".join(
+                    str(_ticket) + ": {" + self._OrderToString_(self._orders[_ticket]) + "}"
+                    for _ticket, (_state, _changed) in self._sync_orders.items() if _changed > _version)
+                + "}, '_removed': [" + ", ".join(
+                    str(_ticket) for _ticket, _removed in self._sync_removed
+                    if _removed > _version and not _full) + "]")
+
+    ##########################################################################
+
+    def _DWX_GetAccountInformation_(self):
+
+        _profit = sum(self._OrderProfit_(_order) for _order in self._orders.values())
+        _margin = sum(_order['_lots'] * _CONTRACT_SIZE / self._leverage
+                      for _order in self._orders.values() if _order['_type'] in (0, 1))
+
+        return ("'_action': 'GET_ACCOUNT_INFORMATION', 'account_number':" + str(self._account_number)
+                + ", '_data': [{'currenttime': '" + _TimeToString_(int(self._TimeCurrent_())) + "'"
+                + ", 'account_name':'DWX Emulator'"
+                + ", 'account_balance':" + '%.8f' % self._balance
+                + ", 'account_equity':" + '%.8f' % (self._balance + _profit)
+                + ", 'account_profit':" + '%.8f' % _profit
+                + ", 'account_free_margin':" + '%.8f' % (self._balance + _profit - _margin)
+                + ", 'account_leverage' :" + str(self._leverage) + "}]")
+
+    ##########################################################################
+
+    def _DWX_SetSymbolList_(self, _components):
+
+        # Format: TRACK_PRICES|SYMBOL_1|SYMBOL_2|...|SYMBOL_N
+        _symbols = _components[1:]
+        _format = 'binary' if _components[0] == 'TRACK_PRICES_BIN' else 'text'
+
+        _ret = "{'_action': 'TRACK_PRICES'"
+
+        if len(_symbols) > 0:
+            self._Publish_Symbols = list(_symbols)
+            self._Publish_Symbols_LastTick = [''] * len(_symbols)
+            self._Publish_Symbols_Seq = [0] * len(_symbols)
+            self._Publish_Prices_Binary = _format == 'binary'
+
+            _ret += (", '_data': {'symbol_count':" + str(len(_symbols))
+                     + ", 'error_symbols':[], 'format': '" + _format + "'}")
+        else:
+            self._Publish_Symbols = []
+            _ret += ", '_data': {'symbol_count': 0}"
+
+        self._InformPullClient_(_ret + "}")
+
+    ##########################################################################
+
+    def _DWX_SetInstrumentList_(self, _components):
+
+        # Format: TRACK_RATES|SYMBOL_1|TIMEFRAME_1|SYMBOL_2|TIMEFRAME_2|...
+        _count = (len(_components) - 1) // 2
+        _format = 'binary' if _components[0] == 'TRACK_RATES_BIN' else 'text'
+
+        _ret = "{'_action': 'TRACK_RATES'"
+
+        if _count > 0:
+            self._Publish_Instruments = []
+
+            for _i in range(_count):
+                _symbol, _timeframe = _components[2 * _i + 1], int(_components[2 * _i + 2])
+                self._Publish_Instruments.append(
+                    [_symbol, _timeframe, _symbol + '_' + _TIMEFRAME_TEXT.get(_timeframe, str(_timeframe)), 0])
+
+            self._Publish_Instruments_Seq = [0] * _count
+            self._Publish_Rates_Binary = _format == 'binary'
+
+            _ret += (", '_data': {'instrument_count':" + str(_count)
+                     + ", 'error_symbols':[], 'format': '" + _format + "'}")
+        else:
+            self._Publish_Instruments = []
+            _ret += ", '_data': {'instrument_count': 0}"
+
+        self._InformPullClient_(_ret + "}")
+
+    ##########################################################################
+
+    def _DWX_ClosePartial_(self, _ticket, _size):
+
+        _ret = "'_action': 'CLOSE', '_ticket': " + str(_ticket)
+
+        _order = self._orders.get(_ticket)
+
+        if _order is None:
+            return _ret + ", '_response': 'CLOSE_PARTIAL_FAILED'"
+
+        # Pending orders can't be partially closed: DWX_ClosePartial() returns
+        # before writing anything, so the EA answers {}
+        if _order['_type'] not in (0, 1):
+            return ''
+
+        _ret += ", '_response': 'CLOSE_PARTIAL'"
+
+        if _size < 0.01 or _size > _order['_lots']:
+            _size = _order['_lots']
+
+        sleep(self._trade_latency)
+
+        # MetaTrader gives the remainder a new ticket
+        del self._orders[_ticket]
+
+        if round(_order['_lots'] - _size, 2) > 0:
+            self._orders[self._next_ticket] = dict(_order, _ticket=self._next_ticket,
+                                                   _lots=round(_order['_lots'] - _size, 2))
+            self._next_ticket += 1
+
+        return _ret + self._DWX_CloseAtMarket_(_order, _size)
+
+    ##########################################################################
+
+    def _CopyRates_(self, _symbol, _timeframe, _start, _end):
+
+        """
+        Synthetic bars with open time in [_start, _end], none while the
+        market is closed (weekends and _closed_days, below W1):
+        [(TIME, OPEN, HIGH, LOW, CLOSE, TICKVOL, SPREAD)]
+        """
+        _step = _timeframe * 60
+        _seed = zlib.crc32(_symbol.encode())
+        _base = 1.0 + (_seed % 1000) / 1000
+
+        _bars = []
+        _time = -(-_start // _step) * _step
+
+        while _time <= _end:
+
+            if _timeframe >= 10080 or self._market_open_(_time):
+
+                _open = _base + 0.05 * sin((_time - _step) / 864000.0)
+                _close = _base + 0.05 * sin(_time / 864000.0)
+                _noise = ((_time * 2654435761 + _seed) % 1000) / 1e6
+
+                _bars.append((_time, round(_open, 5), round(max(_open, _close) + _noise, 5),
+                              round(min(_open, _close) - _noise, 5), round(_close, 5),
+                              1 + (_time // _step + _seed) % 500, (_time // _step) % 20))
+
+            _time += _step
+
+        if self._max_hist_bars is not None:
+            _bars = _bars[-self._max_hist_bars:]
+
+        return _bars
+
+    def _market_open_(self, _time):
+
+        # 1970-01-01 was a Thursday: 2, 3 are Saturday, Sunday
+        if (_time // 86400) % 7 in (2, 3):
+            return False
+
+        _date = datetime.fromtimestamp(_time, timezone.utc)
+
+        return (_date.month, _date.day) not in self._closed_days
+
+##############################################################################
+
+def _StrToTime_(_str):
+
+    # 'YYYY.MM.DD HH:MI[:SS]' (server time) -> seconds since epoch
+    _str = _str.strip()
+    _format = '%Y.%m.%d %H:%M:%S' if _str.count(':') == 2 else '%Y.%m.%d %H:%M'
+
+    return int(datetime.strptime(_str, _format).replace(tzinfo=timezone.utc).timestamp())
+
+def _TimeToString_(_time, _seconds=False):
+
+    # TimeToString() default: 'YYYY.MM.DD HH:MI', or with TIME_SECONDS
+    return datetime.fromtimestamp(_time, timezone.utc).strftime(
+        '%Y.%m.%d %H:%M:%S' if _seconds else '%Y.%m.%d %H:%M')
+
+##############################################################################
+
+if __name__ == "__main__":
+
+    _emulator = DWX_ZeroMQ_Server_Emulator(_verbose=True)._start_()
+
+    try:
+        while True:
+            sleep(1)
+    except KeyboardInterrupt:
+        _emulator._stop_()
@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+"""
+    DWX_ZMQ_Backtest.py
+    --
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import numpy as np
+from pandas import DataFrame, concat, to_datetime
+
+from api.DWX_ZMQ_Bar_Store import BAR_DTYPE, _hist_to_bars_
+
+# _run_() options that _sweep_() grids may vary, besides signal parameters
+_RUN_OPTIONS = ('_SL', '_TP', '_lots', '_max_bars', '_slippage', '_single_position')
+
+# Elements compared at once per symbol (entries x _max_bars)
+_CHUNK_ELEMENTS = 1 << 20
+
+class DWX_ZMQ_Backtest():
+
+    """
+    Vectorized backtest of a signal function over bars of many symbols.
+
+    _bars is {SYMBOL: bars}, bars being a BAR_DTYPE array (e.g. from
+    DWX_ZMQ_History_Cache._get_history_(_as_array=True)) or a HIST '_data'
+    list. Times are MetaTrader server time, prices bids; the ask is the bid
+    plus the bar's spread in points.
+
+    _signal(_panel, **_params) is called once per run with the bars aligned
+    on one time axis:
+
+        _panel['symbols']                   [SYMBOL, ...] (rows)
+        _panel['time']                      bar open times (columns)
+        _panel['open'], ['high'], ['low'],
+        ['close'], ['tick_volume'],
+        ['spread']                          read-only (symbols x times)
+                                            arrays, NaN where a symbol
+                                            has no bar
+
+    and returns a (symbols x times) array: 1 to buy, -1 to sell, 0 to do
+    nothing. A signal at a bar's close is filled at the next bar's open.
+
+    As with _DWX_MTX_SEND_COMMAND_(), _SL and _TP are in points from the
+    fill price (0 = none). Positions close at SL or TP when a bar's low or
+    high reaches them (at the bar's open if it gapped through, SL first if
+    a bar reaches both), else at the close of their _max_bars-th bar.
+    """
+    def __init__(self, _bars, _points=None, _default_point=0.00001,
+                 _contract_size=100000):
+
+        self._bars = {_symbol: (_data if isinstance(_data, np.ndarray)
+                                else _hist_to_bars_(_data))
+                      for _symbol, _data in _bars.items()}
+
+        self._symbols = list(self._bars)
+        self._points = {} if _points is None else dict(_points)
+        self._default_point = _default_point
+        self._contract_size = _contract_size
+
+        self._panel, self._index = self._align_()
+
+    ##########################################################################
+
+    """
+    Backtest over the cached bars of _symbols, e.g.
+    DWX_ZMQ_Backtest._from_cache_(_cache, ['EURUSD', 'GBPUSD'], 'H1', '2018.01.01', '2019.01.01')
+    """
+    @classmethod
+    def _from_cache_(cls, _cache, _symbols, _timeframe='M1',
+                     _start='2020.01.01 00:00:00', _end=None, **kwargs):
+
+        return cls({_symbol: _cache._get_history_(_symbol, _timeframe, _start, _end,
+                                                  _as_array=True)
+                    for _symbol in _symbols}, **kwargs)
+
+    ##########################################################################
+
+    def _align_(self):
+
+        # Union of all bar times; _index maps each symbol's bars to columns
+        _times = [self._bars[_symbol]['time'] for _symbol in self._symbols]
+        _time = np.unique(np.concatenate(_times)) if len(_times) > 0 else np.zeros(0, np.int64)
+
+        _index = [np.searchsorted(_time, _t) for _t in _times]
+        _panel = {'symbols': list(self._symbols), 'time': _time}
+
+        for _name in BAR_DTYPE.names[1:]:
+
+            _column = np.full((len(self._symbols), len(_time)), np.nan)
+
+            for _row, _symbol in enumerate(self._symbols):
+                _column[_row, _index[_row]] = self._bars[_symbol][_name]
+
+            _column.setflags(write=False)
+            _panel[_name] = _column
+
+        _time.setflags(write=False)
+
+        return _panel, _index
+
+    def _point_(self, _symbol):
+        return self._points.get(_symbol, self._default_point)
+
+    ##########################################################################
+
+    """
+    Run _signal with _params. Returns a DataFrame of trades: '_symbol',
+    '_type' (OP_BUY = 0, OP_SELL = 1), '_lots', '_open_time', '_open_price',
+    '_close_time', '_close_price', '_SL', '_TP', '_points', '_pnl' and
+    '_reason' ('SL', 'TP', 'TIME', or 'END' when the bars ran out).
+
+    _lots is one size or {SYMBOL: LOTS}. _slippage (points) worsens market
+    fills: entries, SL and time exits. With _single_position, signals are
+    ignored while the symbol has a position open.
+    """
+    def _run_(self, _signal, _params=None, _SL=50, _TP=50, _lots=0.01,
+              _max_bars=1440, _slippage=0, _single_position=True):
+
+        _signals = np.asarray(_signal(self._panel, **({} if _params is None else _params)))
+
+        if _signals.shape != self._panel['close'].shape:
+            raise ValueError('Signal shape {} is not (symbols x times) {}'.format(
+                _signals.shape, self._panel['close'].shape))
+
+        _trades = []
+
+        for _row, _symbol in enumerate(self._symbols):
+
+            # Signals on this symbol's own bars, entered on the next one
+            _own = _signals[_row, self._index[_row]]
+
+            # NaN (e.g. indicator warm-up) or inf means no signal
+            _own = np.where(np.isfinite(_own), _own, 0)
+            _entries = np.flatnonzero(_own[:-1]) + 1
+
+            if len(_entries) == 0:
+                continue
+
+            _trades.append(self._simulate_(
+                _symbol, _entries, np.sign(_own[_entries - 1]).astype(np.int64),
+                _SL, _TP, _lots[_symbol] if isinstance(_lots, dict) else _lots,
+                _max_bars, _slippage, _single_position))
+
+        if len(_trades) == 0:
+            return DataFrame(columns=['_symbol', '_type', '_lots', '_open_time', '_open_price',
+                                      '_close_time', '_close_price', '_SL', '_TP',
+                                      '_points', '_pnl', '_reason'])
+
+        return concat(_trades, ignore_index=True)
+
+    ##########################################################################
+
+    def _simulate_(self, _symbol, _entries, _dirs, _SL, _TP, _lots,
+                   _max_bars, _slippage, _single_position):
+
+        _bars = self._bars[_symbol]
+        _point = self._point_(_symbol)
+        _n = len(_bars)
+
+        # (BID, ASK) per price: buys open and sells close at the ask
+        _spread = _bars['spread'] * _point
+        _prices = {_name: (_bars[_name], _bars[_name] + _spread)
+                   for _name in ('open', 'high', 'low', 'close')}
+
+        _exits = np.empty(len(_entries), np.int64)
+        _closes = np.empty(len(_entries))
+        _reasons = np.empty(len(_entries), dtype='<U4')
+        _opens = np.empty(len(_entries))
+        _sls = np.empty(len(_entries))
+        _tps = np.empty(len(_entries))
+
+        _chunk = max(1, _CHUNK_ELEMENTS // _max_bars)
+        _offsets = np.arange(_max_bars)
+
+        for _i in range(0, len(_entries), _chunk):
+
+            _e = _entries[_i:_i + _chunk]
+            _d = _dirs[_i:_i + _chunk]
+            _buy = _d > 0
+            _s = slice(_i, _i + len(_e))
+
+            # Fill at the next open: ask to buy, bid to sell
+            _open = np.where(_buy, _prices['open'][1][_e], _prices['open'][0][_e]) + _d * _slippage * _point
+            _sl = np.where(_SL > 0, _open - _d * _SL * _point, np.nan)
+            _tp = np.where(_TP > 0, _open + _d * _TP * _point, np.nan)
+
+            # (entries x _max_bars) windows of the prices each position closes at
+            _cols = _e[:, None] + _offsets[None, :]
+            _valid = _cols < _n
+            _cols = np.minimum(_cols, _n - 1)
+
+            _side = lambda _name: np.where(_buy[:, None], _prices[_name][0][_cols], _prices[_name][1][_cols])
+            _lo, _hi, _op = _side('low'), _side('high'), _side('open')
+
+            _sl_hit = _valid & np.where(_buy[:, None], _lo <= _sl[:, None], _hi >= _sl[:, None])
+            _tp_hit = _valid & np.where(_buy[:, None], _hi >= _tp[:, None], _lo <= _tp[:, None])
+
+            _first_sl = np.where(_sl_hit.any(1), _sl_hit.argmax(1), _max_bars)
+            _first_tp = np.where(_tp_hit.any(1), _tp_hit.argmax(1), _max_bars)
+            _last = np.minimum(_max_bars, _n - _e) - 1
+
+            _by_sl = (_first_sl <= _first_tp) & (_first_sl < _max_bars)
+            _by_tp = ~_by_sl & (_first_tp < _max_bars)
+            _col = np.where(_by_sl, _first_sl, np.where(_by_tp, _first_tp, _last))
+            _at_open = _op[np.arange(len(_e)), _col]
+
+            # Gaps through SL / TP fill at the open
+            _sl_price = np.where(_d * (_at_open - _sl) < 0, _at_open, _sl) - _d * _slippage * _point
+            _tp_price = np.where(_d * (_at_open - _tp) > 0, _at_open, _tp)
+            _time_price = np.where(_buy, _prices['close'][0][_e + _last],
+                                   _prices['close'][1][_e + _last]) - _d * _slippage * _point
+
+            _exits[_s] = _e + _col
+            _closes[_s] = np.where(_by_sl, _sl_price, np.where(_by_tp, _tp_price, _time_price))
+            _reasons[_s] = np.where(_by_sl, 'SL', np.where(_by_tp, 'TP',
+                                    np.where(_e + _max_bars > _n, 'END', 'TIME')))
+            _opens[_s], _sls[_s], _tps[_s] = _open, _sl, _tp
+
+        _keep = np.arange(len(_entries))
+
+        # One position at a time: next entry after the previous exit
+        if _single_position:
+            _kept = []
+            _free = -1
+
+            for _k, (_entry, _exit) in enumerate(zip(_entries.tolist(), _exits.tolist())):
+                if _entry > _free:
+                    _kept.append(_k)
+                    _free = _exit
+
+            _keep = np.array(_kept, np.int64)
+
+        _d = _dirs[_keep]
+        _diff = _d * (_closes[_keep] - _opens[_keep])
+
+        return DataFrame({'_symbol': _symbol,
+                          '_type': np.where(_d > 0, 0, 1),
+                          '_lots': _lots,
+                          '_open_time': to_datetime(_bars['time'][_entries[_keep]], unit='s'),
+                          '_open_price': _opens[_keep],
+                          '_close_time': to_datetime(_bars['time'][_exits[_keep]], unit='s'),
+                          '_close_price': _closes[_keep],
+                          '_SL': _sls[_keep],
+                          '_TP': _tps[_keep],
+                          '_points': np.round(_diff / _point, 1),
+                          '_pnl': np.round(_diff * self._contract_size * _lots, 2),
+                          '_reason': _reasons[_keep]})
+
+    ##########################################################################
+
+    """
+    Run _signal for every combination of _grid ({NAME: [VALUES]}) on a
+    process pool. Names in _RUN_OPTIONS set _run_() options, others are
+    passed to _signal, which must be picklable (defined at module level).
+    Returns a DataFrame of the parameters and _summary_() of each run.
+    _workers=0 runs them in this process.
+    """
+    def _sweep_(self, _signal, _grid, _workers=None, **kwargs):
+
+        _names = list(_grid)
+        _runs = [(_signal, dict(zip(_names, _values)), kwargs)
+                 for _values in product(*_grid.values())]
+
+        if _workers == 0:
+            _set_backtest_(self)
+            _results = [_sweep_run_(_run) for _run in _runs]
+
+        # The bars are sent once per worker, not once per run
+        else:
+            _workers = os.cpu_count() if _workers is None else _workers
+
+            with ProcessPoolExecutor(_workers, initializer=_set_backtest_,
+                                     initargs=(self,)) as _pool:
+                _results = list(_pool.map(_sweep_run_, _runs,
+                                          chunksize=max(1, len(_runs) // (4 * _workers))))
+
+        return DataFrame([dict(_run[1], **_result) for _run, _result in zip(_runs, _results)])
+
+##############################################################################
+
+def _summary_(_trades):
+
+    """
+    {'trades', 'win_rate', 'points', 'pnl', 'profit_factor', 'max_drawdown'}
+    of a _run_() result, drawdown on the P&L of trades in closing order
+    """
+    if len(_trades) == 0:
+        return {'trades': 0, 'win_rate': np.nan, 'points': 0.0, 'pnl': 0.0,
+                'profit_factor': np.nan, 'max_drawdown': 0.0}
+
+    _pnl = _trades.sort_values('_close_time', kind='stable')['_pnl'].values
+    _equity = np.cumsum(_pnl)
+    _loss = -_pnl[_pnl < 0].sum()
+
+    return {'trades': len(_pnl),
+            'win_rate': float((_pnl > 0).mean()),
+            'points': float(_trades['_points'].sum()),
+            'pnl': float(_equity[-1]),
+            'profit_factor': float(_pnl[_pnl > 0].sum() / _loss) if _loss > 0 else np.inf,
+            'max_drawdown': float((np.maximum.accumulate(np.maximum(_equity, 0)) - _equity).max())}
+
+##############################################################################
+
+# The backtest of this (worker) process, see DWX_ZMQ_Backtest._sweep_()
+_BACKTEST = None
+
+def _set_backtest_(_backtest):
+    global _BACKTEST
+    _BACKTEST = _backtest
+
+def _sweep_run_(_run):
+
+    _signal, _values, kwargs = _run
+
+    _options = dict(kwargs)
+    _options.update((_k, _v) for _k, _v in _values.items() if _k in _RUN_OPTIONS)
+    _params = {_k: _v for _k, _v in _values.items() if _k not in _RUN_OPTIONS}
+
+    return _summary_(_BACKTEST._run_(_signal, _params, **_options))
+
+##############################################################################
@@ -13,8 +13,7 @@
     https://opensource.org/licenses/BSD-3-Clause
 """
 
-from pandas import DataFrame, to_datetime
-from time import sleep
+from pandas import DataFrame
 
 class DWX_ZMQ_Reporting():
     
@@ -26,37 +25,33 @@ class DWX_ZMQ_Reporting():
     def _get_open_trades_(self, _trader='Trader_SYMBOL', 
                           _delay=0.1, _wbreak=10):
         
-        # Reset data output
-        self._zmq._set_response_(None)
+        # Ask MetaTrader only when the connector's order cache is due a 
+        # sync, the response refreshing it
+        _future = self._zmq._DWX_MTX_SYNC_OPEN_TRADES_()
         
-        # Get open trades from MetaTrader
-        self._zmq._DWX_MTX_GET_ALL_OPEN_TRADES_()
-
-        # While loop start time reference            
-        _ws = to_datetime('now')
-        
-        # While data not received, sleep until timeout
-        while self._zmq._valid_response_('zmq') == False:
-            
-            sleep(_delay)
+        if _future is not None:
             
-            if (to_datetime('now') - _ws).total_seconds() > (_delay * _wbreak):
-                break
-        
-        # If data received, return DataFrame
-        if self._zmq._valid_response_('zmq'):
-            
-            _response = self._zmq._get_response_()
+            # Wait for the response to this request, up to (_delay * _wbreak) seconds
+            _response = self._zmq._wait_response_(_future, _delay * _wbreak)
             
-            if ('_trades' in _response.keys()
-                and len(_response['_trades']) > 0):
-                
-                _df = DataFrame(data=_response['_trades'].values(),
-                                index=_response['_trades'].keys())
-                return _df[_df['_comment'] == _trader]
+            if not self._zmq._valid_response_(_response):
+                return DataFrame()
             
-        # Default
-        return DataFrame()
+            # Without an order cache, from the response itself
+            if self._zmq._Orders_DB is None:
+                return self._to_dataframe_({_ticket: _trade for _ticket, _trade 
+                                            in _response.get('_trades', {}).items()
+                                            if _trade['_comment'] == _trader})
+        
+        return self._to_dataframe_(self._zmq._get_open_orders_(_comment=_trader))
+    
+    ##########################################################################
+    
+    def _to_dataframe_(self, _trades):
+        
+        if len(_trades) == 0:
+            return DataFrame()
+        
+        return DataFrame(data=_trades.values(), index=_trades.keys())
     
     ##########################################################################
-    
\ No newline at end of file
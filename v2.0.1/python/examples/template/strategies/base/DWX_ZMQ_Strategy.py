@@ -16,9 +16,15 @@
 from api.DWX_ZeroMQ_Connector_v2_0_1_RC8 import DWX_ZeroMQ_Connector
 from examples.template.modules.DWX_ZMQ_Execution import DWX_ZMQ_Execution
 from examples.template.modules.DWX_ZMQ_Reporting import DWX_ZMQ_Reporting
+from examples.template.modules.DWX_ZMQ_Backtest import DWX_ZMQ_Backtest
+from api.DWX_ZMQ_History_Cache import DWX_ZMQ_History_Cache
 
 class DWX_ZMQ_Strategy(object):
     
+    # Called with the connector arguments below, e.g. replaced by 
+    # DWX_ZMQ_Replay._load_() to run on recorded data
+    _connector_class = DWX_ZeroMQ_Connector
+    
     def __init__(self, _name="DEFAULT_STRATEGY",    # Name 
                  _symbols=[('EURUSD',0.01),     # List of (Symbol,Lotsize) tuples
                            ('AUDNZD',0.01),
@@ -39,9 +45,9 @@ class DWX_ZMQ_Strategy(object):
         self._broker_gmt = _broker_gmt
         
         # Not entirely necessary here.
-        self._zmq = DWX_ZeroMQ_Connector(_pulldata_handlers=_pulldata_handlers,
-                                         _subdata_handlers=_subdata_handlers,
-                                         _verbose=_verbose)
+        self._zmq = self._connector_class(_pulldata_handlers=_pulldata_handlers,
+                                          _subdata_handlers=_subdata_handlers,
+                                          _verbose=_verbose)
         
         # Modules
         self._execution = DWX_ZMQ_Execution(self._zmq)
@@ -56,3 +62,22 @@ class DWX_ZMQ_Strategy(object):
         """
          
     ##########################################################################
+    
+    def _backtest_(self, _signal, _timeframe='M1',
+                   _start='2020.01.01 00:00:00', _end=None,
+                   _cache_dir='dwx_history', **kwargs):
+        
+        """
+        Vectorized backtest of _signal over self._symbols' history, with 
+        their lot sizes (see DWX_ZMQ_Backtest._run_ for kwargs). Bars come 
+        from the on-disk cache; only missing ones are fetched from MetaTrader.
+        """
+        _cache = DWX_ZMQ_History_Cache(self._zmq, _cache_dir)
+        
+        _backtest = DWX_ZMQ_Backtest._from_cache_(_cache,
+                                                  [_symbol for _symbol, _lots in self._symbols],
+                                                  _timeframe, _start, _end)
+        
+        return _backtest._run_(_signal, _lots=dict(self._symbols), **kwargs)
+         
+    ##########################################################################
@@ -85,10 +85,14 @@ class prices_subscriptions(DWX_ZMQ_Strategy):
                          _broker_gmt,
                          # Registers itself as handler of pull data via self.onPullData()
                          [self],
-                         # Registers itself as handler of sub data via self.onSubData()
-                         [self],
+                         # No raw sub data handlers: ticks are routed per symbol below
+                         [],
                          _verbose)
 
+        # Registers self.onTick() as handler of the parsed ticks of each symbol
+        for _symbol in _symbols:
+            self._zmq._DWX_ZMQ_ADD_SUB_HANDLER_(_symbol, self.onTick)
+
         # This strategy's variables
         self._symbols = _symbols
         self._delay = _delay
@@ -116,18 +120,16 @@ class prices_subscriptions(DWX_ZMQ_Strategy):
         print('Response from ExpertAdvisor={}'.format(data))
 
     ##########################################################################
-    def onSubData(self, data):
+    def onTick(self, tick):
         """
-        Callback to process new data received through the SUB port
+        Callback to process a new tick (DWX_ZMQ_Tick) of a subscribed symbol
         """
-        # split msg to get topic and message
-        _topic, _msg = data.split(":|:")
-        print('Data on Topic={} with Message={}'.format(_topic, _msg))
+        print('Tick on Topic={} with Bid={} Ask={}'.format(tick.symbol, tick.bid, tick.ask))
 
         # increment counters
-        if _topic == 'EURUSD':
+        if tick.symbol == 'EURUSD':
             self._eurusd_cnt += 1
-        if _topic == 'GDAXI':
+        if tick.symbol == 'GDAXI':
             self._gdaxi_cnt += 1
 
         # check if received at least 10 prices from each and then cancel GDAXI feed
@@ -10,7 +10,7 @@
     
     After receiving 5 rates from EURUSD_M1 it cancels its feed 
     and waits 3 rates from GDAXI. At this point it cancels all rate feeds. Then it prints 
-    _zmq._Market_Data_DB dictionary and finishes. 
+    the bars stored in _zmq._Rates_DB and finishes. 
 
     
     -------------------
@@ -86,10 +86,13 @@ class rates_subscriptions(DWX_ZMQ_Strategy):
                          _broker_gmt,
                          # Registers itself as handler of pull data via self.onPullData()
                          [self],
-                         # Registers itself as handler of sub data via self.onSubData()
-                         [self],
+                         # No raw sub data handlers: bars are routed per instrument below
+                         [],
                          _verbose)
 
+        # Registers self.onBar() as handler of the parsed bars of every instrument
+        self._zmq._DWX_ZMQ_ADD_SUB_HANDLER_('*_*', self.onBar)
+
         # This strategy's variables
         self._instruments = _instruments
         self._delay = _delay
@@ -117,18 +120,16 @@ class rates_subscriptions(DWX_ZMQ_Strategy):
         print('Response from ExpertAdvisor={}'.format(data))
 
     ##########################################################################
-    def onSubData(self, data):
+    def onBar(self, bar):
         """
-        Callback to process new data received through the SUB port
+        Callback to process a new bar (DWX_ZMQ_Bar) of a subscribed instrument
         """
-        # split msg to get topic and message
-        _topic, _msg = data.split(":|:")
-        print('Data on Topic={} with Message={}'.format(_topic, _msg))
+        print('Bar on Topic={} with Time={} Close={}'.format(bar.instrument, bar.time, bar.close))
 
         # increment counters
-        if _topic == 'EURUSD_M1':
+        if bar.instrument == 'EURUSD_M1':
             self._eurusd_cnt += 1
-        if _topic == 'GDAXI_M5':
+        if bar.instrument == 'GDAXI_M5':
             self._gdaxi_cnt += 1
 
         # check if received at least 5 prices from EURUSD to cancel its feed
@@ -143,8 +144,9 @@ class rates_subscriptions(DWX_ZMQ_Strategy):
         if self._gdaxi_cnt >= 3:
             # finishes (removes all subscriptions)
             self.stop()
-            # prints dictionary
-            print(self._zmq._Market_Data_DB)
+            # prints received bars, one DataFrame per (symbol, timeframe)
+            for _symbol, _timeframe in self._zmq._Rates_DB.keys():
+                print(self._zmq._Rates_DB._to_dataframe_(_symbol, _timeframe))
 
     ##########################################################################
 
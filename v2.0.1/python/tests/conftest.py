@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+    conftest.py
+
+    Fixtures shared by the tests. Run from v2.0.1/python: python -m pytest tests
+    --
+
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+import pytest
+
+from api.DWX_ZeroMQ_Connector_v2_0_1_RC8 import DWX_ZeroMQ_Connector
+from emulator.DWX_ZeroMQ_Server_Emulator import DWX_ZeroMQ_Server_Emulator
+
+_PORTS = {'_PUSH_PORT': 42778, '_PULL_PORT': 42779}
+
+##############################################################################
+
+@pytest.fixture(scope='session')
+def _zmq():
+
+    # Connector to a DWX_ZeroMQ_Server_Emulator
+    _emulator = DWX_ZeroMQ_Server_Emulator(_PUB_PORT=42780, **_PORTS)._start_()
+    _zmq = DWX_ZeroMQ_Connector(_SUB_PORT=42780, _verbose=False, **_PORTS)
+
+    yield _zmq
+
+    _zmq._DWX_ZMQ_SHUTDOWN_()
+    _emulator._stop_()
+
+##############################################################################
+
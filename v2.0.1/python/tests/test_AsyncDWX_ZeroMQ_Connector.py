@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+    test_AsyncDWX_ZeroMQ_Connector.py
+
+    Run from v2.0.1/python: python -m pytest tests
+    --
+
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+import asyncio
+
+import pytest
+import zmq
+
+from api.AsyncDWX_ZeroMQ_Connector_v2_0_1_RC8 import AsyncDWX_ZeroMQ_Connector
+
+_PORTS = {'_PUSH_PORT': 42788, '_PULL_PORT': 42789, '_SUB_PORT': 42790}
+
+##############################################################################
+
+@pytest.fixture
+def _ea():
+
+    # Stands in for the EA: takes commands without answering, publishes on demand
+    _context = zmq.Context()
+
+    _pull = _context.socket(zmq.PULL)
+    _pull.bind('tcp://*:{}'.format(_PORTS['_PUSH_PORT']))
+
+    _pub = _context.socket(zmq.PUB)
+    _pub.bind('tcp://*:{}'.format(_PORTS['_SUB_PORT']))
+
+    yield _pull, _pub
+
+    _context.destroy(0)
+
+##############################################################################
+
+def test_cancelled_request_is_abandoned(_ea):
+
+    async def _run():
+
+        async with AsyncDWX_ZeroMQ_Connector(_verbose=False, **_PORTS) as _zmq:
+
+            _task = asyncio.ensure_future(_zmq._DWX_MTX_GET_ALL_OPEN_TRADES_())
+
+            while len(_zmq._requests._pending) == 0:
+                await asyncio.sleep(0.01)
+
+            await asyncio.sleep(0.1)
+            _task.cancel()
+
+            with pytest.raises(asyncio.CancelledError):
+                await _task
+
+            return len(_zmq._requests._pending)
+
+    assert asyncio.run(_run()) == 0
+    assert _ea[0].poll(1000)
+
+def test_sub_messages(_ea):
+
+    async def _run():
+
+        async with AsyncDWX_ZeroMQ_Connector(_verbose=False, **_PORTS) as _zmq:
+
+            _zmq._DWX_MTX_SUBSCRIBE_MARKETDATA_('EURUSD')
+
+            _ticks = _zmq._DWX_ZMQ_TICKS_()
+            _rates = _zmq._DWX_ZMQ_RATES_()
+
+            # Published until the subscription reaches the PUB socket
+            async def _first(_iterator, _msg):
+
+                _next = asyncio.ensure_future(_iterator.__anext__())
+
+                while not _next.done():
+                    _ea[1].send_string(_msg)
+                    await asyncio.wait([_next], timeout=0.1)
+
+                return _next.result()
+
+            _tick = await _first(_ticks, 'EURUSD:|:1.11385;1.11387')
+            _rate = await _first(_rates, 'EURUSD_M1:|:1569931200;1.0982;1.0985;1.0981;1.0983;120;2;0')
+
+            return _tick, _rate, _zmq
+
+    _tick, _rate, _zmq = asyncio.run(_run())
+
+    assert (_tick[0], _tick[2], _tick[3]) == ('EURUSD', 1.11385, 1.11387)
+    assert _rate == ('EURUSD_M1', 1569931200, 1.0982, 1.0985, 1.0981, 1.0983, 120, 2, 0)
+
+    assert _zmq._Market_Data_DB['EURUSD']._count > 0
+    assert len(_zmq._Rates_DB[('EURUSD', 'M1')]) == 1
+
+##############################################################################
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+    test_DWX_ZMQ_Backtest.py
+
+    Run from v2.0.1/python: python -m pytest tests
+    --
+
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+import numpy as np
+from pandas import to_datetime
+
+from api.DWX_ZMQ_Bar_Store import BAR_DTYPE
+from examples.template.modules.DWX_ZMQ_Backtest import DWX_ZMQ_Backtest
+
+##############################################################################
+
+def _bars_(_n=200):
+
+    # M1 bars of a slow sine wave, 1 point spread
+    _bars = np.zeros(_n, dtype=BAR_DTYPE)
+    _close = 1.1 + 0.001 * np.sin(np.arange(_n) / 10.0)
+
+    _bars['time'] = 1577836800 + 60 * np.arange(_n)
+    _bars['open'] = np.concatenate([[_close[0]], _close[:-1]])
+    _bars['high'] = np.maximum(_bars['open'], _close) + 0.00005
+    _bars['low'] = np.minimum(_bars['open'], _close) - 0.00005
+    _bars['close'] = _close
+    _bars['spread'] = 1
+
+    return _bars
+
+def _crossing_(_panel, _fast=5, _slow=20):
+
+    # Moving average crossing: NaN until _slow bars are available
+    _close = _panel['close']
+    _signals = np.full(_close.shape, np.nan)
+
+    for _i in range(_slow - 1, _close.shape[1]):
+        _signals[:, _i] = np.sign(_close[:, _i - _fast + 1:_i + 1].mean(1)
+                                  - _close[:, _i - _slow + 1:_i + 1].mean(1))
+
+    return _signals
+
+##############################################################################
+
+def test_nan_warm_up_is_no_signal():
+
+    _backtest = DWX_ZMQ_Backtest({'EURUSD': _bars_()})
+
+    # First signal at the close of bar 19, entered at the open of bar 20
+    _first = to_datetime(_backtest._panel['time'][20], unit='s')
+
+    for _single_position in (True, False):
+
+        _trades = _backtest._run_(_crossing_, _SL=20, _TP=20, _max_bars=10,
+                                  _single_position=_single_position)
+
+        assert len(_trades) > 0
+        assert set(_trades['_type']) <= {0, 1}
+
+        # Not blocked by trades opened on warm-up NaNs
+        assert _trades['_open_time'].iloc[0] == _first
+
+def test_inf_signal_is_no_signal():
+
+    _backtest = DWX_ZMQ_Backtest({'EURUSD': _bars_(50)})
+
+    _signals = np.full((1, 50), np.inf)
+    _signals[0, 0] = -np.inf
+
+    assert len(_backtest._run_(lambda _panel: _signals)) == 0
+
+##############################################################################
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+    test_DWX_ZMQ_Decoder.py
+
+    Run from v2.0.1/python: python -m pytest tests
+    --
+
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+import pytest
+
+from api.DWX_ZMQ_Decoder import _DWX_ZMQ_DECODE_
+
+##############################################################################
+
+def test_fast_path():
+
+    _msg = "{'_action': 'EXECUTION', '_magic': 123456, '_open_price': 1.10125, '_sl': 0.0}"
+
+    assert _DWX_ZMQ_DECODE_(_msg) == eval(_msg)
+
+def test_int_keys():
+
+    _msg = ("{'_action': 'OPEN_TRADES', '_trades': {85051741: {'_magic': 123456, "
+            "'_symbol': 'EURUSD', '_lots': 0.01000000, '_type': 0, "
+            "'_open_time': '2019.01.01 12:30:00', '_comment': 'a, 5: b'}, "
+            "-1: {'_magic': 0}}}")
+
+    _data = _DWX_ZMQ_DECODE_(_msg)
+
+    assert _data == eval(_msg)
+    assert list(_data['_trades']) == [85051741, -1]
+    assert _data['_trades'][85051741]['_comment'] == 'a, 5: b'
+
+def test_quotes_and_backslashes_in_comments():
+
+    # MetaTrader doesn't escape comments: backslashes are literal
+    _msg = ("{'_action': 'OPEN_TRADES', '_trades': {85051741: {'_magic': 1, "
+            "'_comment': 'say \"hi\"'}, 85051742: {'_magic': 2, "
+            "'_comment': 'C:\\new\\path\\'}}}")
+
+    _trades = _DWX_ZMQ_DECODE_(_msg)['_trades']
+
+    assert _trades[85051741]['_comment'] == 'say "hi"'
+    assert _trades[85051742]['_comment'] == 'C:\\new\\path\\'
+
+    _msg = "{'_action': 'EXECUTION', '_comment': 'x\\y \"z\"'}"
+
+    assert _DWX_ZMQ_DECODE_(_msg) == {'_action': 'EXECUTION', '_comment': 'x\\y "z"'}
+
+def test_nested_lists():
+
+    _msg = ("{'_action': 'BATCH', '_responses': [{'_action': 'EXECUTION', "
+            "'_ticket': 85051741, '_open_price': 1.1}, {'_action': 'CLOSE', "
+            "'_ticket': 85051740, '_response': 'NOT_FOUND'}, {}], "
+            "'_data': [[1, 2.5, -3], [], [[0]]]}")
+
+    assert _DWX_ZMQ_DECODE_(_msg) == eval(_msg)
+
+def test_close_magic_trailing_comma():
+
+    # As sent by DWX_CloseOrder_Magic when the order at position 0 has
+    # another magic number: the separator after the last response stays
+    _msg = ("{'_action': 'CLOSE_ALL_MAGIC', '_magic': 123456, '_responses': "
+            "{85051742: {'_symbol':'EURUSD', '_action': 'CLOSE', '_ticket': 85051742, "
+            "'_close_price': 1.10150000, '_close_lots': 0.01000000, "
+            "'_response': 'CLOSE_PARTIAL', '_response_value': 'SUCCESS', "
+            "'_response': 'CLOSE_MARKET'}, 85051741: {'_symbol':'GBPUSD', "
+            "'_response': 'CLOSE_PENDING'}, }, '_response_value': 'SUCCESS', "
+            "'_request_id': '7'}")
+
+    _data = _DWX_ZMQ_DECODE_(_msg)
+
+    assert _data == eval(_msg)
+    assert list(_data['_responses']) == [85051742, 85051741]
+
+    # Commas inside strings are left alone
+    _msg = "{'_action': 'CLOSE_ALL', '_responses': {}, '_comment': 'a, }', 'b': [1, 2, ]}"
+
+    assert _DWX_ZMQ_DECODE_(_msg) == eval(_msg)
+
+def test_invalid_message():
+
+    with pytest.raises(ValueError):
+        _DWX_ZMQ_DECODE_("{'_action': 'OPEN_TRADES', '_trades': {")
+
+    with pytest.raises(ValueError):
+        _DWX_ZMQ_DECODE_("__import__('os')")
+
+##############################################################################
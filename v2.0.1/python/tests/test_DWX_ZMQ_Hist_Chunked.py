@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+    test_DWX_ZMQ_Hist_Chunked.py
+
+    _DWX_MTX_SEND_HIST_REQUEST_CHUNKED_() against DWX_ZeroMQ_Server_Emulator,
+    which has no bars on weekends, 1 January and 25 December.
+
+    Run from v2.0.1/python: python -m pytest tests
+    --
+
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+import numpy as np
+import pytest
+
+##############################################################################
+
+def test_closed_market_chunks_are_empty(_zmq):
+
+    # Fri 20 Dec 2019 - Thu 2 Jan 2020: 10h chunks, many of them inside two
+    # weekends, Christmas and New Year. 8 trading days are left.
+    _gaps = []
+    _bars = _zmq._DWX_MTX_SEND_HIST_REQUEST_CHUNKED_('EURUSD', 1,
+                                                     '2019.12.20 00:00:00',
+                                                     '2020.01.02 23:59:00',
+                                                     _chunk_bars=600, _timeout=5,
+                                                     _gaps=_gaps)
+    assert _gaps == []
+    assert len(_bars) == 8 * 1440
+    assert (np.diff(_bars['time']) > 0).all()
+
+def test_closed_market_at_either_end(_zmq):
+
+    # Starts on a Saturday, ends on Christmas Day
+    _bars = _zmq._DWX_MTX_SEND_HIST_REQUEST_CHUNKED_('EURUSD', 1,
+                                                     '2019.12.21 00:00:00',
+                                                     '2019.12.25 23:59:00',
+                                                     _chunk_bars=600, _timeout=5)
+    assert len(_bars) == 2 * 1440
+
+def test_no_data_at_all(_zmq):
+
+    _args = ('EURUSD', 1, '2019.12.28 00:00:00', '2019.12.29 23:59:00')
+
+    _gaps = []
+    _bars = _zmq._DWX_MTX_SEND_HIST_REQUEST_CHUNKED_(*_args, _chunk_bars=600,
+                                                     _timeout=5, _retries=1,
+                                                     _gaps=_gaps)
+    assert len(_bars) == 0
+    assert _gaps[0][0] == 1577491200 and _gaps[-1][1] == 1577663940
+
+    with pytest.raises(TimeoutError):
+        _zmq._DWX_MTX_SEND_HIST_REQUEST_CHUNKED_(*_args, _chunk_bars=600,
+                                                 _timeout=5, _retries=1)
+
+##############################################################################
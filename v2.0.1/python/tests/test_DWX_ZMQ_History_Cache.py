@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+    test_DWX_ZMQ_History_Cache.py
+
+    Run from v2.0.1/python: python -m pytest tests
+    --
+
+    @author: Darwinex Labs (www.darwinex.com)
+
+    Copyright (c) 2019 onwards, Darwinex. All rights reserved.
+
+    Licensed under the BSD 3-Clause License, you may not use this file except
+    in compliance with the License.
+
+    You may obtain a copy of the License at:
+    https://opensource.org/licenses/BSD-3-Clause
+"""
+
+from pandas import Timestamp
+
+from api.DWX_ZMQ_History_Cache import DWX_ZMQ_History_Cache
+
+##############################################################################
+
+def _fetches_(_cache):
+
+    # [(START, END)] of the downloads _cache asks for
+    _fetches = []
+    _fetch = _cache._fetch_
+
+    def _counted(_symbol, _timeframe, _start, _end):
+        _fetches.append((_start, _end))
+        return _fetch(_symbol, _timeframe, _start, _end)
+
+    _cache._fetch_ = _counted
+
+    return _fetches
+
+##############################################################################
+
+def test_start_on_a_weekend_is_covered(_zmq, tmp_path):
+
+    _cache = DWX_ZMQ_History_Cache(_zmq, str(tmp_path), _timeout=5, _chunk_bars=600)
+    _fetches = _fetches_(_cache)
+
+    # Sat 21 Dec 2019: the first bar is on Monday
+    _df = _cache._get_history_('EURUSD', 'M1', '2019.12.21 00:00:00', '2019.12.24 00:00:00')
+
+    assert len(_df) == 1440 + 1
+    assert _cache._get_coverage_('EURUSD', 'M1') == (Timestamp('2019-12-21'),
+                                                      Timestamp('2019-12-24'))
+
+    _cache._get_history_('EURUSD', 'M1', '2019.12.21 00:00:00', '2019.12.24 00:00:00')
+    assert len(_fetches) == 1
+
+    # Grown at the head, from another Saturday
+    _df = _cache._get_history_('EURUSD', 'M1', '2019.12.14 00:00:00', '2019.12.24 00:00:00')
+
+    assert len(_df) == 6 * 1440 + 1
+    assert _cache._get_coverage_('EURUSD', 'M1')[0] == Timestamp('2019-12-14')
+
+    _cache._get_history_('EURUSD', 'M1', '2019.12.14 00:00:00', '2019.12.24 00:00:00')
+    assert len(_fetches) == 2
+
+##############################################################################